@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: call_policy
+
+Este módulo define a política comum das chamadas à API: cada etapa (transcrição,
+resposta do modelo, síntese de voz, palavra-chave) tem um prazo total; as falhas
+transitórias são repetidas com espera aleatória (jitter) apenas enquanto houver prazo,
+respeitando o cabeçalho Retry-After; e um disjuntor (circuit breaker) por etapa passa
+a falhar imediatamente quando o serviço se degrada, para que quem chamou use a sua
+alternativa (áudio em cache, transcrição local). As falhas são informadas por tipos
+de erro estruturados, em vez de textos-sentinela.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 22:30 (horário de Zurique)
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+
+# Prazo total de cada etapa em segundos (variáveis API_DEADLINE_<ETAPA>)
+STAGE_DEADLINES = {
+    "stt": 10.0,
+    "llm": 20.0,
+    "tts": 8.0,
+    "wake_word": 5.0,
+    "image": 60.0,
+    "embeddings": 5.0,
+}
+MAX_ATTEMPTS = 3
+BASE_DELAY = 0.25
+MAX_DELAY = 2.0
+# Disjuntor: falhas consecutivas para abrir e tempo aberto antes de uma nova tentativa
+FAILURE_THRESHOLD = 5
+RESET_SECONDS = 30.0
+
+# Códigos HTTP que indicam falha transitória do serviço
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+class APICallError(Exception):
+    """
+    Falha de uma chamada à API após a política ser aplicada.
+
+    Attributes:
+        stage (str): Etapa da chamada ("stt", "llm", "tts", ...).
+        retryable (bool): Se a falha é transitória (serviço, rede, limite de taxa).
+        status_code (int): Código HTTP da última resposta, se houver.
+        attempts (int): Número de tentativas feitas.
+    """
+
+    def __init__(self, stage, message, retryable=False, status_code=None, attempts=0):
+        super().__init__(message)
+        self.stage = stage
+        self.retryable = retryable
+        self.status_code = status_code
+        self.attempts = attempts
+
+
+class DeadlineExceeded(APICallError):
+    """O prazo da etapa terminou antes de uma resposta bem-sucedida."""
+
+
+class CircuitOpenError(APICallError):
+    """O disjuntor da etapa está aberto: a chamada nem foi tentada."""
+
+
+class CircuitBreaker:
+    """
+    Disjuntor: abre após ``failure_threshold`` falhas consecutivas e, depois de
+    ``reset_seconds``, deixa passar uma chamada de teste (meio-aberto); o sucesso fecha
+    o disjuntor e a falha o reabre.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_seconds=RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Estado atual do disjuntor."""
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Indica se uma chamada pode ser feita agora (no meio-aberto, apenas uma por vez)."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_neutral(self):
+        """
+        Registra uma chamada que não diz nada sobre a saúde do serviço (erro do próprio
+        pedido): o estado não muda, apenas a chamada de teste do meio-aberto é liberada.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logging.warning("Disjuntor aberto: o serviço está instável.")
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+
+def _retry_after(error):
+    """Retorna a espera pedida pelo servidor (Retry-After / retry-after-ms), em segundos, ou None."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    milliseconds = headers.get("retry-after-ms")
+    if milliseconds:
+        try:
+            return float(milliseconds) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify(error):
+    """
+    Classifica uma exceção de chamada à API.
+
+    Args:
+        error (Exception): Exceção levantada pela chamada.
+
+    Returns:
+        tuple[bool, int | None]: Se a falha é transitória e o código HTTP, se houver.
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS, status_code
+    # Falhas de rede e de tempo (openai.APITimeoutError, APIConnectionError, httpx)
+    name = type(error).__name__
+    transient = isinstance(error, (TimeoutError, ConnectionError)) or "Timeout" in name or "Connect" in name
+    return transient, None
+
+
+class CallPolicy:
+    """
+    Prazo, repetição e disjuntor de uma etapa.
+    """
+
+    def __init__(self, stage, deadline, max_attempts=MAX_ATTEMPTS, base_delay=BASE_DELAY,
+                 max_delay=MAX_DELAY, breaker=None, sleep=time.sleep):
+        """
+        Inicializa a política.
+
+        Args:
+            stage (str): Nome da etapa.
+            deadline (float): Prazo total da etapa em segundos.
+            max_attempts (int, optional): Número máximo de tentativas. Padrão é 3.
+            base_delay (float, optional): Espera máxima antes da segunda tentativa. Padrão é 0.25.
+            max_delay (float, optional): Limite da espera entre tentativas. Padrão é 2.0.
+            breaker (CircuitBreaker, optional): Disjuntor; padrão é um novo CircuitBreaker.
+            sleep (callable, optional): Função de espera (substituível nos testes).
+        """
+        self.stage = stage
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+        self.sleep = sleep
+
+    def call(self, fn, fallback=None):
+        """
+        Executa uma chamada com a política da etapa.
+
+        Args:
+            fn (callable): Função ``fn(timeout)`` que faz a chamada; ``timeout`` é o prazo
+                restante em segundos e deve ser repassado ao cliente.
+            fallback (callable, optional): Função ``fallback(error)`` chamada com o
+                APICallError quando a chamada falha ou o disjuntor está aberto; o seu
+                retorno substitui o da chamada.
+
+        Returns:
+            O retorno de ``fn`` (ou de ``fallback``).
+
+        Raises:
+            APICallError: Se a chamada falhar e não houver alternativa.
+        """
+        return self._call(fn, fallback, time.monotonic() + self.deadline)
+
+    def stream(self, fn, body=None):
+        """
+        Executa uma chamada em streaming e entrega os itens do corpo da resposta.
+
+        A abertura segue ``call`` (as repetições só acontecem antes do primeiro item), e
+        o prazo da etapa também vale para a leitura do corpo: um item que chega depois do
+        prazo encerra o stream com DeadlineExceeded. Uma leitura bloqueada é limitada pelo
+        timeout repassado ao cliente, e o seu erro também é convertido. As falhas durante
+        a leitura contam para o disjuntor como as da abertura.
+
+        Args:
+            fn (callable): Função ``fn(timeout)`` que abre o stream.
+            body (callable, optional): Função ``body(result)`` que retorna o iterável dos
+                itens; padrão é iterar o próprio retorno de ``fn``.
+
+        Yields:
+            Os itens do corpo da resposta.
+
+        Raises:
+            APICallError: Se a abertura ou a leitura falhar (DeadlineExceeded se o prazo terminar).
+        """
+        expires = time.monotonic() + self.deadline
+        result = self._call(fn, None, expires)
+        items = iter(body(result) if body is not None else result)
+        try:
+            while True:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    retryable, status_code = classify(e)
+                    if retryable:
+                        self.breaker.record_failure()
+                    error_type = DeadlineExceeded if time.monotonic() >= expires else APICallError
+                    error = error_type(self.stage, f"Falha na leitura do stream ({self.stage}): {e}",
+                                       retryable=retryable, status_code=status_code, attempts=1)
+                    error.__cause__ = e
+                    self._fail(error, None)
+                if time.monotonic() > expires:
+                    self.breaker.record_failure()
+                    self._fail(DeadlineExceeded(self.stage, f"Prazo da etapa esgotado durante o stream "
+                                                            f"({self.stage}).", retryable=True, attempts=1), None)
+                yield item
+        finally:
+            # Libera a conexão mesmo quando o stream é abandonado antes do fim
+            for resource in (items, result):
+                if hasattr(resource, "close"):
+                    resource.close()
+
+    def _call(self, fn, fallback, expires):
+        if not self.breaker.allow():
+            return self._fail(CircuitOpenError(self.stage, f"Serviço indisponível ({self.stage}): "
+                                                           "disjuntor aberto.", retryable=True), fallback)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = fn(max(0.001, expires - time.monotonic()))
+            except Exception as e:
+                retryable, status_code = classify(e)
+                if retryable:
+                    delay = _retry_after(e)
+                    if delay is None:
+                        # Espera aleatória com crescimento exponencial ("full jitter")
+                        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+                    remaining = expires - time.monotonic()
+                    if attempt < self.max_attempts and delay < remaining:
+                        logging.info(f"Falha transitória em {self.stage} ({e}); nova tentativa em {delay:.2f} s.")
+                        self.sleep(delay)
+                        continue
+                    self.breaker.record_failure()
+                    error_type = DeadlineExceeded if remaining <= delay else APICallError
+                else:
+                    # Erros do pedido (autenticação, parâmetros) não indicam nem degradação nem
+                    # recuperação do serviço: um 400 no meio-aberto não fecha o disjuntor
+                    self.breaker.record_neutral()
+                    error_type = APICallError
+                error = error_type(self.stage, f"Falha na chamada à API ({self.stage}): {e}",
+                                   retryable=retryable, status_code=status_code, attempts=attempt)
+                error.__cause__ = e
+                return self._fail(error, fallback)
+            self.breaker.record_success()
+            return result
+
+    def _fail(self, error, fallback):
+        logging.error(str(error))
+        if fallback is not None:
+            return fallback(error)
+        raise error
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def get_policy(stage):
+    """
+    Retorna a política compartilhada de uma etapa (um disjuntor por etapa).
+
+    O prazo vem de API_DEADLINE_<ETAPA> (por exemplo, API_DEADLINE_STT) e o número de
+    tentativas de API_MAX_ATTEMPTS.
+
+    Args:
+        stage (str): "stt", "llm", "tts", "wake_word", "image" ou "embeddings".
+
+    Returns:
+        CallPolicy: Política da etapa.
+    """
+    with _policies_lock:
+        if stage not in _policies:
+            deadline = float(os.getenv(f'API_DEADLINE_{stage.upper()}', STAGE_DEADLINES.get(stage, 10.0)))
+            _policies[stage] = CallPolicy(stage, deadline,
+                                          max_attempts=int(os.getenv('API_MAX_ATTEMPTS', MAX_ATTEMPTS)))
+        return _policies[stage]
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: client_registry
+
+Este módulo fornece o cliente da API OpenAI compartilhado por todo o processo (chat,
+transcrição, síntese e palavra-chave). Todas as chamadas usam o mesmo pool de conexões
+httpx, com limites e keep-alive ajustados (e HTTP/2 opcional), de modo que as sessões
+TLS são reaproveitadas entre os módulos. Uma requisição de aquecimento abre a conexão
+antes do primeiro uso (ao detectar a palavra-chave ou quando o usuário começa a
+digitar), e as estatísticas do pool informam a taxa de reaproveitamento e o tempo de
+conexão. O cliente (e os pacotes openai e httpx) só é criado no primeiro uso.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 21:55 (horário de Zurique)
+"""
+
+import os
+import time
+import logging
+import threading
+from utils.env import load_environment
+
+# Configuração do pool de conexões
+MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '20'))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE', '10'))
+# O padrão do httpx (5 s) fecha a conexão entre dois turnos de conversa
+KEEPALIVE_SECONDS = float(os.getenv('OPENAI_KEEPALIVE_SECONDS', '90'))
+WARM_UP_TIMEOUT = 5.0
+
+
+class PoolStats:
+    """
+    Estatísticas do pool de conexões: requisições, conexões novas e tempo de conexão.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.connect_seconds = 0.0
+        self.warm_ups = 0
+        self._lock = threading.Lock()
+
+    def record(self, connect_seconds=None):
+        """
+        Registra uma requisição.
+
+        Args:
+            connect_seconds (float, optional): Tempo de conexão (TCP + TLS), se a
+                requisição abriu uma conexão nova; None se reaproveitou uma existente.
+        """
+        with self._lock:
+            self.requests += 1
+            if connect_seconds is not None:
+                self.new_connections += 1
+                self.connect_seconds += connect_seconds
+
+    def record_warm_up(self):
+        """Registra um aquecimento concluído."""
+        with self._lock:
+            self.warm_ups += 1
+
+    def snapshot(self):
+        """
+        Retorna as estatísticas.
+
+        Returns:
+            dict: Requisições, conexões novas, requisições com conexão reaproveitada,
+            taxa de reaproveitamento, tempo médio de conexão (ms) e aquecimentos.
+        """
+        with self._lock:
+            reused = self.requests - self.new_connections
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+                "mean_connect_ms": (1000 * self.connect_seconds / self.new_connections
+                                    if self.new_connections else 0.0),
+                "warm_ups": self.warm_ups,
+            }
+
+
+def _tracing_transport(transport, stats, on_request=None):
+    """
+    Envolve um transporte httpx para registrar, pela extensão ``trace`` do httpcore, se
+    cada requisição abriu uma conexão nova e quanto tempo a conexão levou.
+    """
+    import httpx
+
+    class TracingTransport(httpx.BaseTransport):
+
+        def handle_request(self, request):
+            events = {}
+            previous = request.extensions.get("trace")
+
+            def trace(name, info):
+                events.setdefault(name, time.perf_counter())
+                if previous is not None:
+                    previous(name, info)
+
+            request.extensions["trace"] = trace
+            try:
+                return transport.handle_request(request)
+            finally:
+                started = events.get("connection.connect_tcp.started")
+                finished = events.get("connection.start_tls.complete", events.get("connection.connect_tcp.complete"))
+                stats.record(finished - started if started is not None and finished is not None else None)
+                if on_request is not None:
+                    on_request()
+
+        def close(self):
+            transport.close()
+
+    return TracingTransport()
+
+
+class ClientRegistry:
+    """
+    Registro do cliente OpenAI compartilhado e do seu pool de conexões.
+    """
+
+    def __init__(self, api_key=None, base_url=None, max_connections=MAX_CONNECTIONS,
+                 max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS, keepalive_seconds=KEEPALIVE_SECONDS,
+                 http2=None):
+        """
+        Inicializa o registro (o cliente é criado no primeiro uso).
+
+        Args:
+            api_key (str, optional): Chave da API; padrão é OPENAI_API_KEY.
+            base_url (str, optional): URL da API; padrão é a do pacote openai (ou OPENAI_BASE_URL).
+            max_connections (int, optional): Conexões simultâneas. Padrão é 20.
+            max_keepalive_connections (int, optional): Conexões ociosas mantidas. Padrão é 10.
+            keepalive_seconds (float, optional): Tempo em que uma conexão ociosa é mantida. Padrão é 90.
+            http2 (bool, optional): Usa HTTP/2 (requer o pacote h2); padrão é OPENAI_HTTP2=1.
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_seconds = keepalive_seconds
+        self.http2 = http2
+        self.stats = PoolStats()
+        self.last_activity = None
+        self._client = None
+        self._http_client = None
+        self._lock = threading.Lock()
+        # Lock próprio do aquecimento: ``_lock`` fica retido durante a importação do openai,
+        # e o aquecimento é pedido pela thread da interface
+        self._warm_up_lock = threading.Lock()
+        self._warming_up = False
+
+    @property
+    def client(self):
+        """Cliente OpenAI compartilhado, criado na primeira chamada."""
+        return self._ensure_client()
+
+    @property
+    def http_client(self):
+        """Cliente httpx do pool compartilhado (criado junto com o cliente OpenAI)."""
+        self._ensure_client()
+        return self._http_client
+
+    def _ensure_client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
+        from openai import OpenAI, DefaultHttpxClient
+        import httpx
+        load_environment()
+        http2 = self.http2 if self.http2 is not None else os.getenv('OPENAI_HTTP2') == '1'
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logging.warning("HTTP/2 indisponível (pacote h2 não instalado); usando HTTP/1.1.")
+                http2 = False
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_keepalive_connections,
+                              keepalive_expiry=self.keepalive_seconds)
+        transport = _tracing_transport(httpx.HTTPTransport(limits=limits, http2=http2), self.stats,
+                                       on_request=self._touch)
+        self._http_client = DefaultHttpxClient(transport=transport)
+        # As repetições são feitas pela política de chamadas (api.call_policy), dentro do prazo da etapa
+        return OpenAI(api_key=self.api_key or os.getenv('OPENAI_API_KEY'), base_url=self.base_url,
+                      http_client=self._http_client, max_retries=0)
+
+    def _touch(self):
+        self.last_activity = time.monotonic()
+
+    def warm_up(self, background=True):
+        """
+        Abre (ou mantém aberta) uma conexão com a API antes da próxima chamada.
+
+        Não faz nada se já houver um aquecimento em andamento ou se o pool foi usado há
+        menos da metade do tempo de keep-alive (a conexão ainda está aberta). Em segundo
+        plano, nunca espera pela criação do cliente: pode ser chamado pela interface.
+
+        Args:
+            background (bool, optional): Se verdadeiro, não bloqueia. Padrão é True.
+
+        Returns:
+            bool: True se o aquecimento foi iniciado.
+        """
+        with self._warm_up_lock:
+            recent = (self.last_activity is not None
+                      and time.monotonic() - self.last_activity < self.keepalive_seconds / 2)
+            if self._warming_up or recent:
+                return False
+            self._warming_up = True
+        if background:
+            threading.Thread(target=self._warm_up, daemon=True).start()
+        else:
+            self._warm_up()
+        return True
+
+    def _warm_up(self):
+        """Requisição leve à URL base: a resposta é descartada, a conexão fica no pool."""
+        try:
+            self.http_client.head(str(self.client.base_url), timeout=WARM_UP_TIMEOUT)
+            self.stats.record_warm_up()
+        except Exception as e:
+            logging.debug(f"Falha no aquecimento da conexão com a API: {e}")
+        finally:
+            self._warming_up = False
+
+    def close(self):
+        """Fecha as conexões do pool e registra as estatísticas."""
+        with self._lock:
+            client, self._client = self._client, None
+            self._http_client = None
+        if client is not None:
+            logging.info(f"Pool de conexões da API: {self.stats.snapshot()}")
+            client.close()
+
+
+# Registro compartilhado pelo processo
+client_registry = ClientRegistry()
+
+
+def get_client():
+    """
+    Retorna o cliente compartilhado, criando-o na primeira chamada.
+
+    Returns:
+        OpenAI: Cliente da API OpenAI.
+    """
+    return client_registry.client
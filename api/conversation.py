@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: conversation
+
+Este módulo implementa a memória de conversa do OpenAIClient. O histórico de turnos
+é mantido dentro de um orçamento de tokens: a contagem de cada mensagem é feita uma
+única vez, na inserção, e os turnos mais antigos são removidos ou resumidos quando o
+orçamento é excedido, preservando o prompt de sistema como prefixo fixo.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 14:30 (horário de Zurique)
+"""
+
+import re
+import math
+import threading
+from collections import deque
+
+try:
+    import tiktoken
+except ImportError:  # Dependência opcional: sem ela, usa-se a estimativa local
+    tiktoken = None
+
+# Tokens adicionados pela API a cada mensagem (papel e delimitadores)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_WORD_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text):
+    """
+    Estima o número de tokens de um texto sem dependências externas.
+
+    Cada palavra conta como um token a cada quatro caracteres, e cada sinal de
+    pontuação como um token, o que aproxima o tokenizador BPE dos modelos GPT.
+
+    Args:
+        text (str): Texto a ser medido.
+
+    Returns:
+        int: Número estimado de tokens.
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in _WORD_PATTERN.findall(text))
+
+
+def default_token_counter(model="gpt-4"):
+    """
+    Retorna a função de contagem de tokens: tiktoken, se instalado, ou a estimativa local.
+
+    Args:
+        model (str, optional): Modelo cujo tokenizador deve ser usado. Padrão é "gpt-4".
+
+    Returns:
+        callable: Função que recebe um texto e retorna o número de tokens.
+    """
+    if tiktoken is not None:
+        encoding = tiktoken.encoding_for_model(model)
+        return lambda text: len(encoding.encode(text))
+    return estimate_tokens
+
+
+def extractive_summary(previous_summary, messages, max_chars=160):
+    """
+    Resume turnos antigos de forma extrativa (sem chamadas à API).
+
+    Cada mensagem é reduzida à sua primeira frase, limitada a ``max_chars`` caracteres.
+
+    Args:
+        previous_summary (str): Resumo anterior ou None.
+        messages (list[dict]): Mensagens removidas do histórico, na ordem.
+        max_chars (int, optional): Tamanho máximo de cada linha do resumo.
+
+    Returns:
+        str: Novo resumo.
+    """
+    speakers = {"user": "Usuário", "assistant": "Gysin IA"}
+    lines = previous_summary.splitlines() if previous_summary else []
+    for message in messages:
+        first_sentence = re.split(r"(?<=[.!?])\s", message["content"].strip(), maxsplit=1)[0]
+        if len(first_sentence) > max_chars:
+            first_sentence = first_sentence[:max_chars].rsplit(" ", 1)[0] + "..."
+        lines.append(f"{speakers.get(message['role'], message['role'])}: {first_sentence}")
+    return "\n".join(lines)
+
+
+class ConversationMemory:
+    """
+    Histórico de conversa limitado por um orçamento de tokens.
+
+    As mensagens são enviadas na ordem: prompt de sistema (sempre igual), resumo dos
+    turnos antigos (se houver) e turnos recentes.
+    """
+
+    SUMMARY_PREFIX = "Resumo da conversa anterior:\n"
+
+    def __init__(self, system_prompt, max_tokens=2000, token_counter=None, summarizer=extractive_summary,
+                 summary_max_tokens=300):
+        """
+        Inicializa a memória de conversa.
+
+        Args:
+            system_prompt (str): Prompt de sistema, mantido como prefixo fixo.
+            max_tokens (int, optional): Orçamento de tokens do prompt enviado. Padrão é 2000.
+            token_counter (callable, optional): Função de contagem de tokens.
+            summarizer (callable, optional): Função ``(resumo_anterior, mensagens) -> resumo``
+                para os turnos removidos; None descarta os turnos sem resumo.
+            summary_max_tokens (int, optional): Tamanho máximo do resumo. Padrão é 300.
+        """
+        self.max_tokens = max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.count_tokens = token_counter or default_token_counter()
+        self.summarizer = summarizer
+        self._system_message = {"role": "system", "content": system_prompt}
+        self._system_tokens = self._message_tokens(system_prompt)
+        self._turns = deque()
+        self._turn_tokens = 0
+        self._summary = None
+        self._summary_tokens = 0
+        # Linhas do resumo com a contagem de tokens de cada uma
+        self._summary_lines = []
+        self._summary_prefix_tokens = None  # Contado no primeiro resumo
+        self._lock = threading.Lock()
+
+    @property
+    def token_count(self):
+        """Total de tokens do prompt (sistema, resumo e turnos), sem a próxima mensagem."""
+        with self._lock:
+            return self._system_tokens + self._summary_tokens + self._turn_tokens
+
+    @property
+    def summary(self):
+        """Resumo atual dos turnos antigos, ou None."""
+        return self._summary
+
+    def __len__(self):
+        return len(self._turns)
+
+    def add(self, role, content):
+        """
+        Acrescenta uma mensagem ao histórico e aplica o orçamento de tokens.
+
+        Args:
+            role (str): Papel da mensagem ("user" ou "assistant").
+            content (str): Conteúdo da mensagem.
+        """
+        tokens = self._message_tokens(content)
+        with self._lock:
+            self._turns.append(({"role": role, "content": content}, tokens))
+            self._turn_tokens += tokens
+            self._enforce_budget()
+
+    def add_exchange(self, user_content, assistant_content):
+        """Acrescenta um turno completo (pergunta do usuário e resposta)."""
+        self.add("user", user_content)
+        self.add("assistant", assistant_content)
+
+    def messages(self, pending_user=None):
+        """
+        Monta a lista de mensagens para a API.
+
+        Args:
+            pending_user (str, optional): Mensagem do usuário ainda não registrada no histórico.
+
+        Returns:
+            list[dict]: Mensagens no formato da API de chat.
+        """
+        with self._lock:
+            result = [self._system_message]
+            if self._summary:
+                result.append({"role": "system", "content": self.SUMMARY_PREFIX + self._summary})
+            result.extend(message for message, _ in self._turns)
+        if pending_user is not None:
+            result.append({"role": "user", "content": pending_user})
+        return result
+
+    def context(self, turns=1):
+        """
+        Descreve o contexto atual da conversa: o resumo e as últimas mensagens.
+
+        Args:
+            turns (int, optional): Número de turnos recentes (pergunta e resposta). Padrão é 1.
+
+        Returns:
+            str: Texto do contexto; vazio se a conversa ainda não começou.
+        """
+        with self._lock:
+            recent = [message for message, _ in self._turns][-2 * turns:] if turns > 0 else []
+            lines = [self.SUMMARY_PREFIX + self._summary] if self._summary else []
+        lines.extend(f"{message['role']}: {message['content']}" for message in recent)
+        return "\n".join(lines)
+
+    def clear(self):
+        """Apaga o histórico e o resumo, mantendo o prompt de sistema."""
+        with self._lock:
+            self._turns.clear()
+            self._turn_tokens = 0
+            self._summary = None
+            self._summary_tokens = 0
+            self._summary_lines = []
+
+    def _message_tokens(self, content):
+        """Número de tokens de uma mensagem, incluindo o custo fixo por mensagem."""
+        return self.count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+    def _enforce_budget(self):
+        """Remove (e resume) os turnos mais antigos até respeitar o orçamento."""
+        evicted = []
+        while (len(self._turns) > 1
+               and self._system_tokens + self._summary_tokens + self._turn_tokens > self.max_tokens):
+            # Remove turnos inteiros: a mensagem mais antiga e as respostas que a seguem
+            message, tokens = self._turns.popleft()
+            evicted.append(message)
+            self._turn_tokens -= tokens
+            while len(self._turns) > 1 and self._turns[0][0]["role"] != "user":
+                message, tokens = self._turns.popleft()
+                evicted.append(message)
+                self._turn_tokens -= tokens
+
+            if self.summarizer is not None:
+                self._update_summary(evicted)
+                evicted = []
+
+    def _update_summary(self, evicted):
+        """
+        Incorpora as mensagens removidas ao resumo, limitando o seu tamanho.
+
+        Cada linha do resumo é contada uma única vez (com um token para a quebra de
+        linha): as linhas que já estavam no resumo reaproveitam a contagem anterior.
+        """
+        if self._summary_prefix_tokens is None:
+            self._summary_prefix_tokens = self._message_tokens(self.SUMMARY_PREFIX)
+        summary = self.summarizer(self._summary, evicted)
+        known = dict(self._summary_lines)
+        lines = deque((line, known[line] if line in known else self.count_tokens(line) + 1)
+                      for line in summary.splitlines())
+        tokens = self._summary_prefix_tokens + sum(count for _, count in lines)
+        # Descarta as linhas mais antigas do resumo até caber no limite
+        while len(lines) > 1 and tokens > self.summary_max_tokens:
+            tokens -= lines.popleft()[1]
+        self._summary_lines = list(lines)
+        self._summary = "\n".join(line for line, _ in lines)
+        self._summary_tokens = tokens
@@ -10,33 +10,38 @@ Data: 20/10/2024 15:12 (horário de Zurique)
 """
 
 import os
-import pyaudio
-import wave
-import tempfile
-from openai import OpenAI
 import logging
-from dotenv import load_dotenv
+from utils.env import load_environment
+from api.client_registry import get_client
+from api.call_policy import get_policy
+from utils.audio_buffer import AudioBuffer
 
 # Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
+load_environment()
 
 # Configuração global de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Inicializa o cliente OpenAI
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 # Configurações de áudio
 CHUNK = 1024
-FORMAT = pyaudio.paInt16
 CHANNELS = 1
 RATE = 16000
 RECORD_SECONDS = 3
 WAKE_WORD = "bom dia"
 
-def record_audio():
+def record_audio(subscription=None):
+    if subscription is not None:
+        # Lê o bloco da captura compartilhada, sem abrir outro stream
+        samples = subscription.read(subscription.sample_rate * RECORD_SECONDS)
+        if samples is None:
+            raise RuntimeError("Captura de áudio encerrada.")
+        return AudioBuffer(samples, subscription.sample_rate, CHANNELS)
+
+    # Importado apenas quando um stream próprio é aberto
+    import pyaudio
     p = pyaudio.PyAudio()
-    stream = p.open(format=FORMAT,
+    stream = p.open(format=pyaudio.paInt16,
                     channels=CHANNELS,
                     rate=RATE,
                     input=True,
@@ -55,43 +60,34 @@ def record_audio():
     stream.close()
     p.terminate()
 
-    return frames
-
-def save_audio(frames):
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-        wf = wave.open(temp_audio.name, 'wb')
-        wf.setnchannels(CHANNELS)
-        wf.setsampwidth(pyaudio.PyAudio().get_sample_size(FORMAT))
-        wf.setframerate(RATE)
-        wf.writeframes(b''.join(frames))
-        wf.close()
-        return temp_audio.name
-
-def transcribe_audio(audio_file):
-    with open(audio_file, "rb") as file:
-        transcript = client.audio.transcriptions.create(
-            model="whisper-1", 
-            file=file,
-            language="pt"
+    return AudioBuffer.from_frames(frames, RATE, CHANNELS)
+
+def transcribe_audio(audio):
+    wav = audio.to_wav()
+
+    def request(timeout):
+        wav.seek(0)
+        return get_client().audio.transcriptions.create(
+            model="whisper-1",
+            file=wav,
+            language="pt",
+            timeout=timeout
         )
-    return transcript.text.lower()
 
-def detect_wake_word():
+    return get_policy("wake_word").call(request).text.lower()
+
+def detect_wake_word(subscription=None):
     try:
         while True:
-            frames = record_audio()
-            audio_file = save_audio(frames)
+            audio = record_audio(subscription)
             
-            transcription = transcribe_audio(audio_file)
+            transcription = transcribe_audio(audio)
             logging.info(f"Transcrição: {transcription}")
 
             if WAKE_WORD in transcription:
                 logging.info("Palavra-chave detectada!")
-                os.remove(audio_file)
                 return True
 
-            os.remove(audio_file)
-
     except Exception as e:
         logging.error(f"Ocorreu um erro: {e}")
         return False
@@ -3,28 +3,45 @@
 Módulo: OpenAIClient
 
 Este módulo implementa um cliente para interação com a API da OpenAI,
-permitindo a geração de texto e imagens.
+permitindo a geração de texto e imagens, com memória de conversa limitada por
+um orçamento de tokens e um cache semântico opcional de respostas.
 
 Autor: Stefano Gysin - StefanoGysin@hotmail.com
 Data: 20/10/2024 15:12 (horário de Zurique)
 """
 
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
+from pathlib import Path
+from utils.env import load_environment
+from api.client_registry import get_client
+from api.call_policy import get_policy
+from utils.telemetry import telemetry
+from api.semantic_cache import SemanticCache, HashingEmbedder
+from api.conversation import ConversationMemory
 
 # Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
+load_environment()
 
 class OpenAIClient:
     """
     Cliente para interação com a API da OpenAI.
     """
 
-    def __init__(self):
+    SYSTEM_PROMPT = "Você é uma assistente virtual chamada Gysin IA, desenvolvida para ser útil, criativa e amigável."
+    ERROR_MESSAGE = "Desculpe, ocorreu um erro ao processar sua solicitação."
+
+    def __init__(self, semantic_cache=None, conversation=None, client=None):
         """
         Inicializa o cliente OpenAI.
 
+        Args:
+            semantic_cache (SemanticCache, optional): Cache semântico de respostas. Se omitido,
+                é criado um cache com o embedder local quando SEMANTIC_CACHE=1.
+            conversation (ConversationMemory, optional): Memória de conversa. Se omitida, é
+                criada com o orçamento de CONVERSATION_MAX_TOKENS (padrão 2000).
+            client (OpenAI, optional): Cliente da API. Se omitido, é usado o cliente
+                compartilhado do processo (mesmo pool de conexões dos módulos de voz).
+
         Raises:
             ValueError: Se a chave da API não for encontrada nas variáveis de ambiente.
         """
@@ -33,8 +50,100 @@ class OpenAIClient:
         if not self.api_key:
             raise ValueError("A chave da API OpenAI não foi encontrada nas variáveis de ambiente.")
         
-        # Inicializa o cliente OpenAI
-        self.client = OpenAI(api_key=self.api_key)
+        # Usa o cliente compartilhado (pool de conexões único)
+        self.client = client if client is not None else get_client()
+
+        if semantic_cache is None and os.getenv('SEMANTIC_CACHE') == '1':
+            semantic_cache = self.create_default_semantic_cache()
+        self.semantic_cache = semantic_cache
+        self.cache_context_turns = int(os.getenv('SEMANTIC_CACHE_CONTEXT_TURNS', '1'))
+
+        if conversation is None:
+            conversation = ConversationMemory(
+                self.SYSTEM_PROMPT,
+                max_tokens=int(os.getenv('CONVERSATION_MAX_TOKENS', '2000'))
+            )
+        self.conversation = conversation
+
+    @staticmethod
+    def create_default_semantic_cache():
+        """
+        Cria o cache semântico padrão, com embedder local e índice persistido em disco.
+
+        Returns:
+            SemanticCache: Cache configurado pelas variáveis de ambiente.
+        """
+        return SemanticCache(
+            HashingEmbedder(),
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.92')),
+            capacity=int(os.getenv('SEMANTIC_CACHE_CAPACITY', '1000')),
+            path=os.getenv('SEMANTIC_CACHE_PATH', str(Path.home() / '.cache' / 'gysin_ia' / 'semantic_cache'))
+        )
+
+    def stream_response(self, prompt, max_tokens=150):
+        """
+        Gera uma resposta em modo streaming, entregando os trechos à medida que chegam.
+
+        Args:
+            prompt (str): O texto de entrada para o qual a resposta deve ser gerada.
+            max_tokens (int, optional): Número máximo de tokens na resposta gerada. Padrão é 150.
+
+        O prompt é enviado junto com o histórico da conversa; ao final, o turno é
+        registrado na memória. Com o cache semântico habilitado, a resposta de um prompt
+        semelhante já respondido no mesmo contexto (resumo e últimos
+        SEMANTIC_CACHE_CONTEXT_TURNS turnos, padrão 1) é entregue de uma vez, sem chamada
+        à API. A requisição segue a política da etapa "llm" (api.call_policy): as
+        repetições só acontecem antes do primeiro trecho, e o prazo da etapa vale até o
+        último trecho.
+
+        Yields:
+            str: Trechos incrementais (deltas) do texto gerado.
+
+        Raises:
+            APICallError: Em caso de falha na comunicação com a API.
+        """
+        # Com histórico, a mesma pergunta ("e amanhã?") pode ter outra resposta: as
+        # entradas do cache valem apenas para o mesmo contexto
+        if self.semantic_cache is not None:
+            context = self.conversation.context(self.cache_context_turns)
+            cached = self.semantic_cache.lookup(prompt, context=context)
+            if cached is not None:
+                telemetry.count("llm_semantic_cache_hits_total")
+                self.conversation.add_exchange(prompt, cached)
+                yield cached
+                return
+
+        parts = []
+        messages = self.conversation.messages(pending_user=prompt)
+        # Encerrado explicitamente: o gerador é suspenso a cada trecho
+        span = telemetry.span("llm.stream", max_tokens=max_tokens)
+        stream = get_policy("llm").stream(lambda timeout: self.client.chat.completions.create(
+            model="gpt-4",
+            messages=messages,
+            max_tokens=max_tokens,
+            stream=True,
+            timeout=timeout
+        ))
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if not parts:
+                        telemetry.observe("llm_ttft_ms", span.elapsed_ms())
+                    parts.append(delta)
+                    yield delta
+        finally:
+            span.end(chunks=len(parts))
+            # Gerador fechado antes do fim (turno interrompido): libera a conexão, e o
+            # turno incompleto não entra no histórico
+            stream.close()
+
+        response = "".join(parts).strip()
+        self.conversation.add_exchange(prompt, response)
+        if self.semantic_cache is not None and response:
+            self.semantic_cache.add(prompt, response, context=context)
 
     def get_response(self, prompt, max_tokens=150):
         """
@@ -45,21 +154,17 @@ class OpenAIClient:
             max_tokens (int, optional): Número máximo de tokens na resposta gerada. Padrão é 150.
 
         Returns:
-            str: Texto gerado pela API da OpenAI ou mensagem de erro.
+            str: Texto gerado pela API da OpenAI.
+
+        Raises:
+            APICallError: Em caso de falha na comunicação com a API.
         """
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "Você é uma assistente virtual chamada Gysin IA, desenvolvida para ser útil, criativa e amigável."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Erro ao gerar texto com a API OpenAI: {e}")
-            return "Desculpe, ocorreu um erro ao processar sua solicitação."
+        return "".join(self.stream_response(prompt, max_tokens=max_tokens)).strip()
+
+    def close(self):
+        """Persiste o estado local do cliente (por exemplo, o cache semântico)."""
+        if self.semantic_cache is not None:
+            self.semantic_cache.save()
 
     def generate_image(self, prompt):
         """
@@ -69,16 +174,16 @@ class OpenAIClient:
             prompt (str): Descrição da imagem a ser gerada.
 
         Returns:
-            str: URL da imagem gerada ou None em caso de erro.
+            str: URL da imagem gerada.
+
+        Raises:
+            APICallError: Em caso de falha na comunicação com a API.
         """
-        try:
-            response = self.client.images.generate(
-                prompt=prompt,
-                n=1,
-                size="1024x1024"
-            )
-            image_url = response.data[0].url
-            return image_url
-        except Exception as e:
-            print(f"Erro ao gerar imagem com a API OpenAI: {e}")
-            return None
\ No newline at end of file
+        response = get_policy("image").call(lambda timeout: self.client.images.generate(
+            prompt=prompt,
+            n=1,
+            size="1024x1024",
+            timeout=timeout
+        ))
+        image_url = response.data[0].url
+        return image_url
\ No newline at end of file
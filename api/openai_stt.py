@@ -1,29 +1,79 @@
 # api/openai_stt.py
 
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
+from utils.env import load_environment
+from api.client_registry import get_client
+from api.call_policy import get_policy
+from utils.telemetry import telemetry
+from utils.audio_buffer import AudioBuffer
+from utils.audio_encoding import encode_for_upload
 
-load_dotenv()
+load_environment()
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
-def transcribe_audio(audio_file_path, language='pt'):
+# Formato de upload: "auto" (FLAC quando disponível), "wav", "flac" ou "opus"
+UPLOAD_CODEC = os.getenv('STT_UPLOAD_CODEC', 'auto')
+
+# Métricas acumuladas dos uploads de AudioBuffer
+upload_stats = {"uploads": 0, "bytes_before": 0, "bytes_after": 0}
+
+# Nomes de idioma do verbose_json do Whisper -> ISO-639-1
+WHISPER_LANGUAGES = {
+    "portuguese": "pt", "english": "en", "german": "de", "spanish": "es",
+    "french": "fr", "italian": "it",
+}
+
+def _open_audio(audio):
     """
-    Transcreve um arquivo de áudio usando a API Whisper da OpenAI.
+    Retorna um objeto de arquivo para o áudio (AudioBuffer, caminho ou arquivo aberto).
+
+    Um AudioBuffer é convertido para 16 kHz mono e comprimido conforme UPLOAD_CODEC.
+    """
+    if isinstance(audio, AudioBuffer):
+        encoded = encode_for_upload(audio, codec=UPLOAD_CODEC)
+        upload_stats["uploads"] += 1
+        upload_stats["bytes_before"] += encoded.bytes_before
+        upload_stats["bytes_after"] += encoded.bytes_after
+        telemetry.count("stt_upload_bytes_total", encoded.bytes_after)
+        return encoded.file
+    if isinstance(audio, (str, os.PathLike)):
+        return open(audio, 'rb')
+    return audio
+
 
-    :param audio_file_path: Caminho para o arquivo de áudio a ser transcrito.
-    :param language: Código do idioma no formato ISO-639-1 (padrão: 'pt').
-    :return: Texto transcrito.
+def transcribe_audio(audio, language='pt', timeout=None, verbose=False):
     """
-    try:
-        with open(audio_file_path, 'rb') as audio_file:
-            transcript = client.audio.transcriptions.create(
+    Transcreve um áudio usando a API Whisper da OpenAI.
+
+    A chamada segue a política da etapa "stt" (prazo total, repetições e disjuntor).
+
+    :param audio: AudioBuffer em memória, caminho de um arquivo de áudio ou arquivo binário aberto.
+    :param language: Código do idioma no formato ISO-639-1 (padrão: 'pt'); None para detecção automática.
+    :param timeout: Tempo máximo de cada tentativa em segundos (padrão: o prazo restante da etapa).
+    :param verbose: Se verdadeiro, retorna também o idioma informado pelo Whisper (verbose_json).
+    :return: Texto transcrito, ou (texto, idioma ISO-639-1) com ``verbose``.
+    :raises APICallError: Se a transcrição falhar (DeadlineExceeded, CircuitOpenError).
+    """
+    options = {}
+    if language:
+        options["language"] = language
+    if verbose:
+        options["response_format"] = "verbose_json"
+
+    with telemetry.span("stt.transcribe", language=language) as span, _open_audio(audio) as audio_file:
+        def request(remaining):
+            # O mesmo arquivo é reenviado desde o início a cada tentativa
+            audio_file.seek(0)
+            return get_client().audio.transcriptions.create(
                 model="whisper-1",
                 file=audio_file,
-                language=language
+                timeout=min(timeout, remaining) if timeout is not None else remaining,
+                **options
             )
-        return transcript.text
-    except Exception as e:
-        print(f"Erro na transcrição: {e}")
-        return ""
\ No newline at end of file
+
+        transcript = get_policy("stt").call(request)
+        span.set(chars=len(transcript.text))
+    if verbose:
+        detected = (transcript.language or "").lower()
+        return transcript.text, WHISPER_LANGUAGES.get(detected, detected if len(detected) == 2 else None)
+    return transcript.text
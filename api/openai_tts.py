@@ -1,37 +1,312 @@
 # utils/openai_tts.py
 
 from pathlib import Path
-from openai import OpenAI
 import os
-from dotenv import load_dotenv
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import unicodedata
+from contextlib import ExitStack, closing
+from utils.env import load_environment
+from api.client_registry import get_client
+from api.call_policy import get_policy
+from api.tts_pipeline import split_text
+from utils.telemetry import telemetry
 
-load_dotenv()
+load_environment()
+
+
+TTS_MODEL = "tts-1"
+TTS_SPEED = 1.0
+
+# Formato "pcm" da API: 24 kHz, 16 bits, mono, little-endian, sem cabeçalho
+PCM_SAMPLE_RATE = 24000
+PCM_CHANNELS = 1
+# Tamanho dos blocos lidos da resposta HTTP (1920 bytes = 40 ms de áudio PCM)
+STREAM_CHUNK_SIZE = 1920
+
+VOICE_MAP = {
+    'pt': 'onyx',  # Voz para português
+    'en': 'onyx',  # Voz para inglês
+    'de': 'onyx',  # Voz para alemão
+    'es': 'onyx'   # Voz para espanhol
+}
+
+
+class TTSCache:
+    """
+    Cache em disco de áudios sintetizados, endereçado pelo conteúdo.
+
+    A chave é o hash de (texto normalizado, voz, modelo, formato, velocidade). As
+    gravações são atômicas (arquivo temporário + ``os.replace``), de modo que várias
+    threads ou processos podem compartilhar o mesmo diretório. O diretório é limitado
+    em bytes, com remoção dos itens menos usados recentemente (LRU) e expiração por idade (TTL).
+    """
+
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024, ttl_seconds=30 * 24 * 3600):
+        """
+        Inicializa o cache. O diretório é criado na primeira gravação.
+
+        :param directory: Diretório onde os áudios são armazenados.
+        :param max_bytes: Tamanho máximo do diretório em bytes.
+        :param ttl_seconds: Idade máxima de um item em segundos (None para não expirar).
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._size = None
+        self._stats = {"hits": 0, "misses": 0, "bytes_read": 0, "bytes_written": 0, "evictions": 0}
+
+    @staticmethod
+    def normalize_text(text):
+        """Normaliza o texto (Unicode NFC e espaços) para que variações triviais compartilhem a chave."""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def make_key(self, text, voice, model, response_format, speed):
+        """
+        Calcula a chave de cache de uma síntese.
+
+        :return: Hash SHA-256 em hexadecimal.
+        """
+        payload = json.dumps(
+            [self.normalize_text(text), voice, model, response_format, float(speed)],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """
+        Lê um áudio do cache.
+
+        :param key: Chave calculada por ``make_key``.
+        :return: Bytes do áudio ou None se ausente ou expirado.
+        """
+        path = self._path(key)
+        try:
+            stat = path.stat()
+            if self.ttl_seconds is not None and time.time() - stat.st_mtime > self.ttl_seconds:
+                self._remove(path, stat.st_size)
+                data = None
+            else:
+                data = path.read_bytes()
+                # atime marca o último uso (LRU); mtime preserva a data de gravação (TTL)
+                os.utime(path, (time.time(), stat.st_mtime))
+        except FileNotFoundError:
+            data = None
+
+        with self._lock:
+            if data is None:
+                self._stats["misses"] += 1
+            else:
+                self._stats["hits"] += 1
+                self._stats["bytes_read"] += len(data)
+        return data
+
+    def put(self, key, data):
+        """
+        Grava um áudio no cache de forma atômica e aplica os limites de tamanho.
+
+        :param key: Chave calculada por ``make_key``.
+        :param data: Bytes do áudio.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        with self._lock:
+            self._stats["bytes_written"] += len(data)
+            if self._size is not None:
+                self._size += len(data)
+            over_limit = self._size is None or self._size > self.max_bytes
+        if over_limit:
+            self.evict()
+
+    def evict(self):
+        """Remove itens expirados e, se necessário, os menos usados até respeitar o limite."""
+        entries = []
+        now = time.time()
+        for path in self.directory.glob("*.audio"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self.ttl_seconds is not None and now - stat.st_mtime > self.ttl_seconds:
+                self._remove(path, 0)
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+
+        # Arquivos temporários órfãos de gravações interrompidas
+        for path in self.directory.glob(".tmp-*"):
+            try:
+                if now - path.stat().st_mtime > 3600:
+                    path.unlink()
+            except FileNotFoundError:
+                continue
+
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path, 0)
+            total -= size
+
+        with self._lock:
+            self._size = total
+
+    def stats(self):
+        """
+        Retorna as estatísticas de uso do cache.
+
+        :return: Dicionário com hits, misses, bytes lidos/gravados e remoções.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _path(self, key):
+        """Caminho do arquivo de uma chave."""
+        return self.directory / f"{key}.audio"
+
+    def _remove(self, path, size):
+        """Remove um item do cache, tolerando remoções concorrentes."""
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._stats["evictions"] += 1
+            if self._size is not None:
+                self._size -= size
+
+
+tts_cache = TTSCache(
+    os.getenv('TTS_CACHE_DIR', str(Path.home() / '.cache' / 'gysin_ia' / 'tts')),
+    max_bytes=int(os.getenv('TTS_CACHE_MAX_MB', '200')) * 1024 * 1024,
+    ttl_seconds=int(os.getenv('TTS_CACHE_TTL_DAYS', '30')) * 24 * 3600
+)
+
+
+def get_voice(language_code):
+    """
+    Retorna a voz configurada para o idioma.
+
+    :param language_code: Código do idioma no formato ISO-639-1.
+    :return: Nome da voz da API OpenAI TTS.
+    """
+    return VOICE_MAP.get(language_code, 'onyx')
+
+
+def synthesize_speech(text, language_code='pt', response_format='pcm'):
+    """
+    Sintetiza um trecho de texto e retorna o áudio em memória, usando o cache quando possível.
+
+    :param text: Texto a ser convertido em fala (até o limite de entrada da API).
+    :param language_code: Código do idioma no formato ISO-639-1 (padrão: 'pt').
+    :param response_format: Formato do áudio retornado (padrão: 'pcm').
+    :return: Bytes do áudio sintetizado.
+    :raises APICallError: Se a síntese falhar (política da etapa "tts").
+    """
+    voice = get_voice(language_code)
+    key = tts_cache.make_key(text, voice, TTS_MODEL, response_format, TTS_SPEED)
+    cached = tts_cache.get(key)
+    telemetry.count("tts_cache_total", result="miss" if cached is None else "hit")
+    if cached is not None:
+        return cached
+
+    with telemetry.span("tts.synthesize", chars=len(text), format=response_format):
+        response = get_policy("tts").call(lambda timeout: get_client().audio.speech.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text,
+            response_format=response_format,
+            speed=TTS_SPEED,
+            timeout=timeout
+        ))
+    if response.content:
+        tts_cache.put(key, response.content)
+    return response.content
+
+
+def stream_speech(text, language_code='pt', chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Sintetiza um trecho de texto e entrega o áudio PCM em blocos, à medida que chega da rede.
+
+    Nenhum arquivo temporário é gravado: os blocos vêm diretamente do corpo da resposta
+    HTTP. Em caso de acerto no cache, os blocos são lidos do áudio já armazenado; ao
+    final de um stream completo, o áudio é gravado no cache. O cache é consultado antes
+    da política da etapa "tts", de modo que os trechos já sintetizados continuam sendo
+    falados com o disjuntor aberto; as tentativas só são repetidas antes do primeiro bloco,
+    e o prazo da etapa vale até o último bloco.
+
+    :param text: Texto a ser convertido em fala (até o limite de entrada da API).
+    :param language_code: Código do idioma no formato ISO-639-1 (padrão: 'pt').
+    :param chunk_size: Tamanho de cada bloco em bytes.
+    :return: Gerador de blocos de áudio PCM (24 kHz, 16 bits, mono).
+    :raises APICallError: Se a síntese falhar.
+    """
+    voice = get_voice(language_code)
+    key = tts_cache.make_key(text, voice, TTS_MODEL, "pcm", TTS_SPEED)
+    cached = tts_cache.get(key)
+    telemetry.count("tts_cache_total", result="miss" if cached is None else "hit")
+    if cached is not None:
+        view = memoryview(cached)
+        for offset in range(0, len(view), chunk_size):
+            yield view[offset:offset + chunk_size]
+        return
+
+    audio = bytearray()
+    # Sem "with": o gerador é suspenso entre os blocos e o span não deve virar pai de outros
+    span = telemetry.span("tts.stream", chars=len(text))
+    try:
+        with ExitStack() as stack:
+            chunks = stack.enter_context(closing(get_policy("tts").stream(
+                lambda timeout: stack.enter_context(
+                    get_client().audio.speech.with_streaming_response.create(
+                        model=TTS_MODEL,
+                        voice=voice,
+                        input=text,
+                        response_format="pcm",
+                        speed=TTS_SPEED,
+                        timeout=timeout
+                    )
+                ),
+                body=lambda response: response.iter_bytes(chunk_size)
+            )))
+            for chunk in chunks:
+                if not audio:
+                    telemetry.observe("tts_first_byte_ms", span.elapsed_ms())
+                audio += chunk
+                yield chunk
+    finally:
+        span.end(bytes=len(audio))
+    # Uma resposta vazia não é guardada: seria repetida como silêncio até expirar
+    if audio:
+        tts_cache.put(key, bytes(audio))
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 def text_to_speech(text, output_filename, language_code='pt'):
     """
     Converte texto em fala usando a API OpenAI TTS.
 
+    Textos maiores que o limite de entrada da API são sintetizados por trechos,
+    e os trechos MP3 são concatenados no arquivo de saída.
+
     :param text: Texto a ser convertido em fala.
     :param output_filename: Nome do arquivo de saída para salvar o áudio.
     :param language_code: Código do idioma no formato ISO-639-1 (padrão: 'pt').
     """
-    voice_map = {
-        'pt': 'onyx',  # Voz para português
-        'en': 'onyx',  # Voz para inglês
-        'de': 'onyx',  # Voz para alemão
-        'es': 'onyx'   # Voz para espanhol
-    }
-
-    voice = voice_map.get(language_code, 'onyx')
-
     speech_file_path = Path(output_filename)
-    response = client.audio.speech.create(
-        model="tts-1",
-        voice=voice,
-        input=text
-    )
-
-    response.stream_to_file(speech_file_path)
-    print(f"Áudio salvo como {output_filename}")
\ No newline at end of file
+    with open(speech_file_path, 'wb') as speech_file:
+        for segment in split_text(text):
+            speech_file.write(synthesize_speech(segment, language_code, response_format='mp3'))
+    print(f"Áudio salvo como {output_filename}")
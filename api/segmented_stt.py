@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: segmented_stt
+
+Este módulo implementa a transcrição segmentada de gravações longas. Durante a
+gravação, o áudio é cortado em trechos nas pausas da fala; cada trecho é enviado à
+transcrição assim que fecha, com um número limitado de requisições simultâneas, e os
+textos são unidos na ordem, removendo as palavras repetidas nas fronteiras. Ao fim
+da fala, resta transcrever apenas o último trecho, independentemente da duração total.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 19:05 (horário de Zurique)
+"""
+
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from utils.audio_buffer import AudioBuffer
+from utils.audio_utils import EnergyVAD
+from api.stt_backends import Transcript
+
+# Número máximo de requisições de transcrição simultâneas
+MAX_IN_FLIGHT = 3
+# Número máximo de palavras comparadas na remoção de repetições entre trechos
+MAX_OVERLAP_WORDS = 8
+
+
+def _normalize_word(word):
+    """Normaliza uma palavra para comparação (minúsculas, sem pontuação)."""
+    return re.sub(r"[^\w]", "", word.casefold())
+
+
+def stitch(texts, max_overlap_words=MAX_OVERLAP_WORDS):
+    """
+    Une os textos dos trechos na ordem, removendo palavras repetidas nas fronteiras.
+
+    Quando as últimas palavras de um texto coincidem com as primeiras do seguinte
+    (áudio sobreposto entre os trechos), a repetição é descartada.
+
+    Args:
+        texts (list[str]): Textos dos trechos, na ordem.
+        max_overlap_words (int, optional): Tamanho máximo da repetição procurada.
+
+    Returns:
+        str: Texto completo.
+    """
+    words = []
+    for text in texts:
+        new_words = text.split()
+        if not new_words:
+            continue
+        overlap = 0
+        for size in range(min(max_overlap_words, len(words), len(new_words)), 0, -1):
+            tail = [_normalize_word(word) for word in words[-size:]]
+            head = [_normalize_word(word) for word in new_words[:size]]
+            if tail == head:
+                overlap = size
+                break
+        words.extend(new_words[overlap:])
+    return " ".join(words)
+
+
+class PauseSegmenter:
+    """
+    Divide um stream de áudio em trechos nas pausas da fala.
+
+    Um trecho fecha na metade da primeira pausa de ``pause_ms`` depois de atingir
+    ``min_segment_ms``; se não houver pausa até ``max_segment_ms``, ele é cortado à
+    força, e o trecho seguinte começa ``overlap_ms`` antes do corte para não perder
+    a palavra dividida. O silêncio no início e no fim de cada trecho é removido.
+    """
+
+    def __init__(self, sample_rate, vad=None, pause_ms=350, min_segment_ms=4000, max_segment_ms=15000,
+                 overlap_ms=300, padding_ms=150):
+        """
+        Inicializa o segmentador.
+
+        Args:
+            sample_rate (int): Taxa de amostragem do áudio.
+            vad (EnergyVAD, optional): Detector de voz; padrão é EnergyVAD na mesma taxa.
+            pause_ms (float, optional): Silêncio que caracteriza uma pausa. Padrão é 350.
+            min_segment_ms (float, optional): Duração mínima de um trecho. Padrão é 4000.
+            max_segment_ms (float, optional): Duração máxima de um trecho. Padrão é 15000.
+            overlap_ms (float, optional): Sobreposição nos cortes forçados. Padrão é 300.
+            padding_ms (float, optional): Margem mantida ao redor da fala. Padrão é 150.
+        """
+        self.sample_rate = sample_rate
+        self.vad = vad or EnergyVAD(sample_rate)
+        self.frame_length = self.vad.frame_length
+        frame_ms = 1000 * self.frame_length / sample_rate
+        self.pause_frames = max(1, round(pause_ms / frame_ms))
+        self.min_segment_frames = round(min_segment_ms / frame_ms)
+        self.max_segment_frames = max(1, round(max_segment_ms / frame_ms))
+        self.overlap_frames = round(overlap_ms / frame_ms)
+        self.padding_frames = round(padding_ms / frame_ms)
+        self._chunks = []
+        self._flags = []
+        self._silence_run = 0
+
+    def feed(self, samples):
+        """
+        Processa um bloco de áudio.
+
+        Args:
+            samples (np.ndarray): Amostras int16 mono.
+
+        Returns:
+            list[np.ndarray]: Trechos fechados por este bloco (com fala).
+        """
+        self._chunks.append(samples)
+        segments = []
+        for is_speech in self.vad.process(samples):
+            self._flags.append(bool(is_speech))
+            self._silence_run = 0 if is_speech else self._silence_run + 1
+            count = len(self._flags)
+            if (self._silence_run >= self.pause_frames and count >= self.min_segment_frames
+                    and any(self._flags)):
+                segment = self._cut(count - self._silence_run // 2, overlap=0)
+            elif count >= self.max_segment_frames:
+                segment = self._cut(count, overlap=self.overlap_frames)
+            else:
+                continue
+            if segment is not None:
+                segments.append(segment)
+        return segments
+
+    def flush(self):
+        """
+        Fecha o trecho em andamento (fim da gravação).
+
+        Returns:
+            np.ndarray: Último trecho, ou None se ele não contiver fala.
+        """
+        segment = self._trim(np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=np.int16),
+                             self._flags)
+        self._chunks = []
+        self._flags = []
+        self._silence_run = 0
+        return segment
+
+    def _cut(self, cut_frame, overlap):
+        """Fecha o trecho no frame ``cut_frame`` e mantém o restante (e a sobreposição) no buffer."""
+        audio = np.concatenate(self._chunks)
+        next_frame = max(0, cut_frame - overlap)
+        segment = self._trim(audio[:cut_frame * self.frame_length], self._flags[:cut_frame])
+        self._chunks = [audio[next_frame * self.frame_length:]]
+        self._flags = self._flags[next_frame:]
+        if overlap:
+            # A sobreposição pertence à fala do trecho anterior
+            self._flags[:cut_frame - next_frame] = [True] * (cut_frame - next_frame)
+        self._silence_run = 0
+        for flag in reversed(self._flags):
+            if flag:
+                break
+            self._silence_run += 1
+        return segment
+
+    def _trim(self, audio, flags):
+        """Remove o silêncio no início e no fim de um trecho; retorna None se não houver fala."""
+        speech = np.flatnonzero(flags)
+        if not speech.size:
+            return None
+        start = max(0, speech[0] - self.padding_frames) * self.frame_length
+        end = min(len(audio), (speech[-1] + 1 + self.padding_frames) * self.frame_length)
+        return audio[start:end]
+
+
+class SegmentedTranscriber:
+    """
+    Transcreve os trechos de uma gravação em paralelo, enquanto ela ainda está em andamento.
+    """
+
+    def __init__(self, transcribe, sample_rate, segmenter=None, max_in_flight=MAX_IN_FLIGHT):
+        """
+        Inicializa o transcritor.
+
+        Args:
+            transcribe (callable): Função ``transcribe(AudioBuffer) -> str`` de um trecho.
+            sample_rate (int): Taxa de amostragem do áudio.
+            segmenter (PauseSegmenter, optional): Segmentador; padrão é PauseSegmenter na mesma taxa.
+            max_in_flight (int, optional): Requisições simultâneas. Padrão é 3.
+        """
+        self.transcribe = transcribe
+        self.sample_rate = sample_rate
+        self.segmenter = segmenter or PauseSegmenter(sample_rate)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="stt-segment")
+        self._futures = []
+
+    @property
+    def segment_count(self):
+        """Número de trechos enviados à transcrição."""
+        return len(self._futures)
+
+    def feed(self, samples):
+        """
+        Processa um bloco de áudio, enviando à transcrição os trechos que fecharem.
+
+        Args:
+            samples (np.ndarray): Amostras int16 mono.
+        """
+        for segment in self.segmenter.feed(samples):
+            self._submit(segment)
+
+    def finish(self):
+        """
+        Envia o último trecho e aguarda todas as transcrições.
+
+        Returns:
+            Transcript: Texto completo, unido na ordem dos trechos, com o idioma do primeiro
+            trecho que o informar.
+        """
+        segment = self.segmenter.flush()
+        if segment is not None:
+            self._submit(segment)
+        try:
+            texts = [future.result() for future in self._futures]
+        finally:
+            self._executor.shutdown(wait=False)
+        logging.info(f"Transcrição segmentada: {len(texts)} trecho(s).")
+        language = next((text.language for text in texts if getattr(text, "language", None)), None)
+        return Transcript(stitch(texts), language)
+
+    def cancel(self):
+        """Cancela os trechos ainda não iniciados."""
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _submit(self, segment):
+        """Envia um trecho à transcrição."""
+        audio = AudioBuffer(segment, self.sample_rate)
+        self._futures.append(self._executor.submit(self.transcribe, audio))
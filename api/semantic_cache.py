@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: semantic_cache
+
+Este módulo implementa um cache semântico de respostas para o OpenAIClient. Os prompts
+são convertidos em vetores por um embedder plugável e armazenados em uma matriz NumPy;
+a busca por similaridade de cosseno (top-k) devolve a resposta de um prompt anterior
+quando a similaridade ultrapassa um limiar configurável.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 13:10 (horário de Zurique)
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import logging
+import threading
+import unicodedata
+from pathlib import Path
+import numpy as np
+from api.call_policy import get_policy
+
+
+class HashingEmbedder:
+    """
+    Embedder local baseado em n-gramas de caracteres com hashing (funciona offline).
+
+    Cada n-grama é mapeado por CRC32 (estável entre processos) para uma dimensão do
+    vetor, com sinal também derivado do hash; o vetor final é normalizado (L2).
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim=512, ngram_range=(3, 5)):
+        """
+        Inicializa o embedder.
+
+        Args:
+            dim (int, optional): Dimensão dos vetores. Padrão é 512.
+            ngram_range (tuple, optional): Tamanhos mínimo e máximo dos n-gramas. Padrão é (3, 5).
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    @staticmethod
+    def normalize(text):
+        """Converte para minúsculas, remove acentos e pontuação e normaliza os espaços."""
+        text = unicodedata.normalize("NFKD", text.casefold())
+        text = "".join(char for char in text if not unicodedata.combining(char))
+        text = re.sub(r"[^\w\s]", " ", text)
+        return " ".join(text.split())
+
+    def embed(self, texts):
+        """
+        Calcula os vetores de uma lista de textos.
+
+        Args:
+            texts (list[str]): Textos a serem convertidos.
+
+        Returns:
+            np.ndarray: Matriz (len(texts), dim) float32 com linhas normalizadas.
+        """
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        low, high = self.ngram_range
+        for row, text in enumerate(texts):
+            padded = f" {self.normalize(text)} "
+            hashes = np.fromiter(
+                (zlib.crc32(padded[i:i + n].encode("utf-8"))
+                 for n in range(low, high + 1)
+                 for i in range(len(padded) - n + 1)),
+                dtype=np.uint32
+            )
+            if not hashes.size:
+                continue
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            vectors[row] = np.bincount(hashes % self.dim, weights=signs, minlength=self.dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class OpenAIEmbedder:
+    """
+    Embedder baseado na API de embeddings da OpenAI.
+    """
+
+    def __init__(self, client, model="text-embedding-3-small", dim=1536):
+        """
+        Inicializa o embedder.
+
+        Args:
+            client (OpenAI): Cliente da API OpenAI.
+            model (str, optional): Modelo de embeddings. Padrão é "text-embedding-3-small".
+            dim (int, optional): Dimensão dos vetores do modelo. Padrão é 1536.
+        """
+        self.client = client
+        self.model = model
+        self.dim = dim
+        self.name = f"openai:{model}"
+
+    def embed(self, texts):
+        """
+        Calcula os vetores de uma lista de textos pela API.
+
+        Returns:
+            np.ndarray: Matriz (len(texts), dim) float32 com linhas normalizadas.
+
+        Raises:
+            APICallError: Em caso de falha na API (política da etapa "embeddings").
+        """
+        texts = list(texts)
+        response = get_policy("embeddings").call(lambda timeout: self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            timeout=timeout
+        ))
+        vectors = np.array([item.embedding for item in response.data], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+class SemanticCache:
+    """
+    Cache de respostas indexado pela similaridade semântica dos prompts.
+
+    Os vetores ficam em uma matriz pré-alocada de ``capacity`` linhas; quando ela
+    está cheia, a entrada usada há mais tempo (LRU) é substituída. Cada entrada pode
+    ter um contexto (por exemplo, os turnos anteriores da conversa): a busca considera
+    apenas as entradas com o mesmo contexto, comparado após a normalização do texto.
+    """
+
+    def __init__(self, embedder, threshold=0.92, capacity=1000, ttl_seconds=None, path=None,
+                 autosave_every=20):
+        """
+        Inicializa o cache, carregando o índice salvo em ``path``, se existir.
+
+        Args:
+            embedder: Objeto com ``name``, ``dim`` e ``embed(texts) -> np.ndarray``.
+            threshold (float, optional): Similaridade mínima para um acerto. Padrão é 0.92.
+            capacity (int, optional): Número máximo de entradas. Padrão é 1000.
+            ttl_seconds (float, optional): Idade máxima de uma entrada (None para não expirar).
+            path (str, optional): Caminho base dos arquivos do índice em disco.
+            autosave_every (int, optional): Salva o índice a cada N inserções. Padrão é 20.
+        """
+        self.embedder = embedder
+        self.threshold = threshold
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.path = Path(path) if path else None
+        self.autosave_every = autosave_every
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((capacity, embedder.dim), dtype=np.float32)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._created = np.zeros(capacity, dtype=np.float64)
+        self._prompts = [None] * capacity
+        self._responses = [None] * capacity
+        self._contexts = [""] * capacity
+        self._count = 0
+        self._clock = 0
+        self._unsaved = 0
+        if self.path is not None:
+            self.load()
+
+    def __len__(self):
+        return self._count
+
+    def search(self, prompt, k=5, context=""):
+        """
+        Busca as entradas mais semelhantes a um prompt.
+
+        Args:
+            prompt (str): Prompt a ser buscado.
+            k (int, optional): Número máximo de resultados. Padrão é 5.
+            context (str, optional): Contexto das entradas consideradas. Padrão é "".
+
+        Returns:
+            list[tuple[float, str, str]]: (similaridade, prompt, resposta), em ordem decrescente.
+        """
+        query = self.embedder.embed([prompt])[0]
+        with self._lock:
+            return [(score, self._prompts[i], self._responses[i])
+                    for score, i in self._top_k(query, k, context)]
+
+    def lookup(self, prompt, context=""):
+        """
+        Retorna a resposta em cache para um prompt semelhante, se houver.
+
+        Args:
+            prompt (str): Prompt do usuário.
+            context (str, optional): Contexto em que o prompt foi feito. Padrão é "".
+
+        Returns:
+            str: Resposta armazenada ou None se nenhuma entrada atingir o limiar.
+        """
+        query = self.embedder.embed([prompt])[0]
+        with self._lock:
+            best = self._top_k(query, 1, context)
+            if best and best[0][0] >= self.threshold:
+                index = best[0][1]
+                self._clock += 1
+                self._last_used[index] = self._clock
+                self.hits += 1
+                return self._responses[index]
+            self.misses += 1
+            return None
+
+    def add(self, prompt, response, context=""):
+        """
+        Armazena a resposta de um prompt, substituindo a entrada LRU se o cache estiver cheio.
+
+        Args:
+            prompt (str): Prompt do usuário.
+            response (str): Resposta gerada.
+            context (str, optional): Contexto em que o prompt foi feito. Padrão é "".
+        """
+        vector = self.embedder.embed([prompt])[0]
+        with self._lock:
+            if self._count < self.capacity:
+                index = self._count
+                self._count += 1
+            else:
+                index = int(np.argmin(self._last_used))
+            self._clock += 1
+            self._vectors[index] = vector
+            self._last_used[index] = self._clock
+            self._created[index] = time.time()
+            self._prompts[index] = prompt
+            self._responses[index] = response
+            self._contexts[index] = HashingEmbedder.normalize(context)
+            self._unsaved += 1
+            autosave = self.path is not None and self._unsaved >= self.autosave_every
+        if autosave:
+            self.save()
+
+    def save(self):
+        """Salva o índice em disco de forma atômica (matriz .npz e metadados .json)."""
+        if self.path is None:
+            return
+        with self._lock:
+            count = self._count
+            arrays = {
+                "vectors": self._vectors[:count].copy(),
+                "last_used": self._last_used[:count].copy(),
+                "created": self._created[:count].copy(),
+            }
+            metadata = {
+                "embedder": self.embedder.name,
+                "dim": self.embedder.dim,
+                "clock": self._clock,
+                "prompts": self._prompts[:count],
+                "responses": self._responses[:count],
+                "contexts": self._contexts[:count],
+            }
+            self._unsaved = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        npz_path = self.path.with_suffix(".npz")
+        json_path = self.path.with_suffix(".json")
+        with open(f"{npz_path}.tmp", "wb") as npz_file:
+            np.savez(npz_file, **arrays)
+        with open(f"{json_path}.tmp", "w", encoding="utf-8") as json_file:
+            json.dump(metadata, json_file, ensure_ascii=False)
+        os.replace(f"{npz_path}.tmp", npz_path)
+        os.replace(f"{json_path}.tmp", json_path)
+
+    def load(self):
+        """Carrega o índice salvo em disco, se existir e for compatível com o embedder."""
+        npz_path = self.path.with_suffix(".npz")
+        json_path = self.path.with_suffix(".json")
+        if not (npz_path.exists() and json_path.exists()):
+            return
+        try:
+            with open(json_path, encoding="utf-8") as json_file:
+                metadata = json.load(json_file)
+            if metadata["embedder"] != self.embedder.name or metadata["dim"] != self.embedder.dim:
+                logging.info("Cache semântico ignorado: embedder diferente do salvo.")
+                return
+            with np.load(npz_path) as arrays:
+                count = min(len(metadata["prompts"]), self.capacity)
+                # Mantém as entradas usadas mais recentemente se a capacidade diminuiu
+                order = np.argsort(arrays["last_used"])[::-1][:count]
+                with self._lock:
+                    self._vectors[:count] = arrays["vectors"][order]
+                    self._last_used[:count] = arrays["last_used"][order]
+                    self._created[:count] = arrays["created"][order]
+                    self._prompts[:count] = [metadata["prompts"][i] for i in order]
+                    self._responses[:count] = [metadata["responses"][i] for i in order]
+                    # Índices salvos antes dos contextos: entradas sem contexto
+                    contexts = metadata.get("contexts") or [""] * len(metadata["prompts"])
+                    self._contexts[:count] = [contexts[i] for i in order]
+                    self._count = count
+                    self._clock = metadata["clock"]
+        except (OSError, ValueError, KeyError) as e:
+            logging.error(f"Erro ao carregar o cache semântico: {e}")
+
+    def _top_k(self, query, k, context=""):
+        """Retorna as k entradas válidas do contexto mais semelhantes ao vetor de consulta."""
+        if not self._count:
+            return []
+        scores = self._vectors[:self._count] @ query
+        context = HashingEmbedder.normalize(context)
+        other_context = np.fromiter((entry != context for entry in self._contexts[:self._count]),
+                                    dtype=bool, count=self._count)
+        scores[other_context] = -np.inf
+        if self.ttl_seconds is not None:
+            expired = time.time() - self._created[:self._count] > self.ttl_seconds
+            scores[expired] = -np.inf
+        k = min(k, self._count)
+        candidates = np.argpartition(-scores, k - 1)[:k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        return [(float(scores[i]), int(i)) for i in candidates if np.isfinite(scores[i])]
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: stt_backends
+
+Este módulo define a interface dos mecanismos de transcrição de fala (STT) e as suas
+implementações: a API Whisper da OpenAI (transcrição do arquivo completo) e o
+reconhecedor local do Vosk, que transcreve em streaming durante a gravação, emitindo
+hipóteses parciais enquanto o usuário fala e o texto final no fim da fala, sem rede.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 18:30 (horário de Zurique)
+"""
+
+import os
+import json
+import threading
+import numpy as np
+
+# Modelos do Vosk por idioma (ISO-639-1 -> nome usado pelo Vosk para baixar o modelo pequeno)
+VOSK_LANGUAGES = {
+    "pt": "pt",
+    "en": "en-us",
+    "es": "es",
+    "fr": "fr",
+    "de": "de",
+    "it": "it",
+}
+
+# Mecanismos disponíveis em STT_BACKEND
+STT_MODES = ("openai", "vosk", "hybrid")
+DEFAULT_STT_MODE = "openai"
+
+
+class Transcript(str):
+    """
+    Texto transcrito acompanhado do idioma informado pelo mecanismo (None se desconhecido).
+    """
+
+    def __new__(cls, text, language=None):
+        transcript = super().__new__(cls, text)
+        transcript.language = language
+        return transcript
+
+
+class STTStream:
+    """
+    Sessão de transcrição em streaming: recebe o áudio aos poucos e devolve hipóteses.
+    """
+
+    def feed(self, samples):
+        """
+        Processa um bloco de áudio.
+
+        Args:
+            samples (np.ndarray): Amostras int16 mono.
+
+        Returns:
+            str: Hipótese atual do texto completo, ou None se ela não mudou.
+        """
+        raise NotImplementedError
+
+    def finish(self):
+        """
+        Encerra a sessão.
+
+        Returns:
+            str: Texto final transcrito.
+        """
+        raise NotImplementedError
+
+
+class STTBackend:
+    """
+    Interface de um mecanismo de transcrição.
+
+    Mecanismos com ``streaming`` verdadeiro implementam ``create_stream`` e podem
+    transcrever durante a gravação; todos implementam ``transcribe`` para um áudio completo.
+    """
+
+    name = None
+    streaming = False
+
+    def supports(self, language):
+        """Indica se o mecanismo transcreve o idioma informado."""
+        return True
+
+    def transcribe(self, audio, language):
+        """
+        Transcreve um áudio completo.
+
+        Args:
+            audio (AudioBuffer): Áudio gravado.
+            language (str): Código do idioma (ISO-639-1).
+
+        Returns:
+            Transcript: Texto transcrito e o seu idioma.
+
+        Raises:
+            APICallError: Se a transcrição por uma API falhar.
+        """
+        raise NotImplementedError
+
+    def create_stream(self, language, sample_rate):
+        """
+        Cria uma sessão de transcrição em streaming.
+
+        Args:
+            language (str): Código do idioma (ISO-639-1).
+            sample_rate (int): Taxa de amostragem do áudio.
+
+        Returns:
+            STTStream: Sessão de transcrição.
+        """
+        raise NotImplementedError(f"O mecanismo {self.name} não transcreve em streaming.")
+
+
+class OpenAISTTBackend(STTBackend):
+    """
+    Transcrição pela API Whisper da OpenAI (envio do áudio completo ao fim da gravação).
+
+    O idioma identificado pelo Whisper (verbose_json) acompanha o texto e serve de dica
+    confiável para a identificação de idioma da interface.
+    """
+
+    name = "openai"
+
+    def __init__(self, timeout=None, auto_detect=False):
+        """
+        Args:
+            timeout (float, optional): Tempo máximo da requisição em segundos.
+            auto_detect (bool, optional): Se verdadeiro, o Whisper detecta o idioma em vez
+                de usar o idioma informado. Padrão é False.
+        """
+        self.timeout = timeout
+        self.auto_detect = auto_detect
+
+    def transcribe(self, audio, language):
+        from api.openai_stt import transcribe_audio
+        text, detected = transcribe_audio(audio, language=None if self.auto_detect else language,
+                                          timeout=self.timeout, verbose=True)
+        return Transcript(text, detected)
+
+
+class VoskSTTStream(STTStream):
+    """
+    Sessão de streaming sobre um KaldiRecognizer (vocabulário completo do modelo).
+    """
+
+    def __init__(self, recognizer):
+        """
+        Args:
+            recognizer (vosk.KaldiRecognizer): Reconhecedor já configurado.
+        """
+        self.recognizer = recognizer
+        self._segments = []
+        self._last_hypothesis = ""
+
+    def feed(self, samples):
+        data = np.asarray(samples, dtype=np.int16).tobytes()
+        if self.recognizer.AcceptWaveform(data):
+            # Fim de um trecho detectado pelo próprio reconhecedor (pausa)
+            self._append(json.loads(self.recognizer.Result()).get("text", ""))
+            partial = ""
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        hypothesis = " ".join(self._segments + ([partial] if partial else []))
+        if hypothesis == self._last_hypothesis:
+            return None
+        self._last_hypothesis = hypothesis
+        return hypothesis
+
+    def finish(self):
+        self._append(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        return " ".join(self._segments)
+
+    def _append(self, text):
+        """Acrescenta um trecho final (ignorando trechos vazios)."""
+        text = text.strip()
+        if text:
+            self._segments.append(text)
+
+
+class VoskSTTBackend(STTBackend):
+    """
+    Transcrição local em streaming com o Vosk.
+
+    Os modelos são carregados uma única vez por idioma; o caminho de cada modelo vem
+    de ``VOSK_MODEL_PATH_<IDIOMA>`` (por exemplo, VOSK_MODEL_PATH_EN). Para o português,
+    o modelo da palavra-chave (VOSK_MODEL_PATH) é reaproveitado. Sem caminho, o Vosk
+    baixa o modelo pequeno do idioma.
+    """
+
+    name = "vosk"
+    streaming = True
+
+    def __init__(self):
+        self._models = {}
+        self._lock = threading.Lock()
+
+    def supports(self, language):
+        return language in VOSK_LANGUAGES
+
+    def load_model(self, language):
+        """
+        Carrega (uma única vez) o modelo do idioma.
+
+        Raises:
+            ValueError: Se o idioma não tiver modelo do Vosk.
+        """
+        if not self.supports(language):
+            raise ValueError(f"Idioma sem modelo do Vosk: {language}.")
+        with self._lock:
+            if language not in self._models:
+                model_path = os.getenv(f'VOSK_MODEL_PATH_{language.upper()}')
+                if language == "pt" and not model_path:
+                    from utils.vosk_activation import load_model
+                    self._models[language] = load_model()
+                else:
+                    import vosk
+                    vosk.SetLogLevel(-1)
+                    self._models[language] = (vosk.Model(model_path) if model_path
+                                              else vosk.Model(lang=VOSK_LANGUAGES[language]))
+            return self._models[language]
+
+    def create_stream(self, language, sample_rate):
+        import vosk
+        return VoskSTTStream(vosk.KaldiRecognizer(self.load_model(language), sample_rate))
+
+    def transcribe(self, audio, language):
+        from utils.audio_encoding import to_mono
+        audio = to_mono(audio)
+        stream = self.create_stream(language, audio.sample_rate)
+        stream.feed(audio.samples)
+        return Transcript(stream.finish(), language)
+
+
+_openai_backend = None
+_vosk_backend = None
+
+
+def get_backend(name):
+    """
+    Retorna a instância compartilhada de um mecanismo.
+
+    Args:
+        name (str): "openai" ou "vosk".
+
+    Returns:
+        STTBackend: Mecanismo solicitado.
+    """
+    global _openai_backend, _vosk_backend
+    if name == "openai":
+        if _openai_backend is None:
+            timeout = os.getenv('STT_TIMEOUT')
+            _openai_backend = OpenAISTTBackend(timeout=float(timeout) if timeout else None,
+                                               auto_detect=os.getenv('STT_AUTO_LANGUAGE', '1') != '0')
+        return _openai_backend
+    if name == "vosk":
+        if _vosk_backend is None:
+            _vosk_backend = VoskSTTBackend()
+        return _vosk_backend
+    raise ValueError(f"Mecanismo de transcrição desconhecido: {name}.")
+
+
+def select_backends(language, mode=None):
+    """
+    Escolhe os mecanismos de transcrição para um idioma conforme a configuração.
+
+    Modos (``mode`` ou a variável STT_BACKEND):
+        - "openai": apenas a API, sem resultados parciais (padrão);
+        - "vosk": transcrição local, com parciais, quando o idioma tiver modelo;
+        - "hybrid": parciais locais e texto final pela API, com o texto local como
+          alternativa se a API falhar ou exceder STT_TIMEOUT.
+
+    Args:
+        language (str): Código do idioma (ISO-639-1).
+        mode (str, optional): Modo de seleção.
+
+    Returns:
+        tuple[STTBackend, STTBackend | None]: Mecanismo do texto final e mecanismo em
+        streaming (parciais e alternativa), ou None.
+    """
+    mode = (mode or os.getenv('STT_BACKEND') or DEFAULT_STT_MODE).lower()
+    if mode not in STT_MODES:
+        raise ValueError(f"Modo de transcrição desconhecido: {mode}. Opções: {', '.join(STT_MODES)}.")
+
+    local = get_backend("vosk")
+    if mode == "openai" or not local.supports(language):
+        return get_backend("openai"), None
+    if mode == "vosk":
+        return local, local
+    return get_backend("openai"), local
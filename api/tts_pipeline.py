@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: tts_pipeline
+
+Este módulo implementa o pipeline de síntese de voz por frases. O texto da resposta
+(completo ou recebido em streaming) é dividido em frases ou orações, cada trecho é
+sintetizado em paralelo com concorrência limitada e o áudio é reproduzido na ordem
+original, sem intervalos, assim que o primeiro trecho fica pronto.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 11:20 (horário de Zurique)
+"""
+
+import re
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Limite de caracteres aceito pela API de TTS em uma única requisição
+MAX_TTS_INPUT_CHARS = 4096
+# Tamanho mínimo de um trecho para evitar requisições muito curtas
+MIN_SEGMENT_CHARS = 12
+# Acima deste tamanho, o trecho é cortado na última vírgula/ponto e vírgula
+SOFT_MAX_SEGMENT_CHARS = 220
+# Número máximo de sínteses simultâneas
+MAX_PARALLEL_SYNTHESIS = 3
+
+# Fim de frase: pontuação final (com aspas/parênteses de fechamento) seguida de espaço, ou quebra de linha
+_SENTENCE_END = re.compile(r'[.!?…]+["\'»”)\]]*\s+|\n+')
+# Fim de oração: vírgula, ponto e vírgula, dois-pontos ou travessão seguidos de espaço
+_CLAUSE_END = re.compile(r'[,;:—–]\s+')
+
+
+class SentenceSegmenter:
+    """
+    Divide um texto recebido aos poucos em trechos adequados para síntese de voz.
+
+    Os trechos terminam em fins de frase; frases longas demais são cortadas em
+    fins de oração e, em último caso, no último espaço antes do limite da API.
+    """
+
+    def __init__(self, min_chars=MIN_SEGMENT_CHARS, soft_max_chars=SOFT_MAX_SEGMENT_CHARS,
+                 max_chars=MAX_TTS_INPUT_CHARS):
+        """
+        Inicializa o segmentador.
+
+        Args:
+            min_chars (int, optional): Tamanho mínimo de um trecho terminado em fim de frase.
+            soft_max_chars (int, optional): Tamanho a partir do qual se corta em fim de oração.
+            max_chars (int, optional): Tamanho máximo absoluto de um trecho.
+        """
+        self.min_chars = min_chars
+        self.soft_max_chars = min(soft_max_chars, max_chars)
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text):
+        """
+        Acrescenta texto ao buffer e retorna os trechos que ficaram completos.
+
+        Args:
+            text (str): Novo trecho de texto (por exemplo, um delta do streaming).
+
+        Returns:
+            list[str]: Trechos completos, na ordem.
+        """
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment = self._buffer[:cut].strip()
+            self._buffer = self._buffer[cut:]
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self):
+        """
+        Retorna o texto restante no buffer como trechos finais.
+
+        Returns:
+            list[str]: Trechos restantes, respeitando o tamanho máximo.
+        """
+        remaining, self._buffer = self._buffer, ""
+        segments = self.feed(remaining)
+        rest = self._buffer.strip()
+        self._buffer = ""
+        if rest:
+            segments.append(rest)
+        return segments
+
+    def _find_cut(self):
+        """Encontra a posição de corte do próximo trecho completo, se houver."""
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if match.end() > self.max_chars:
+                break
+            if len(self._buffer[:match.end()].strip()) >= self.min_chars:
+                return match.end()
+
+        if len(self._buffer) <= self.soft_max_chars:
+            return None
+
+        clause_cuts = [m.end() for m in _CLAUSE_END.finditer(self._buffer, 0, self.max_chars)]
+        clause_cuts = [cut for cut in clause_cuts if cut >= self.min_chars]
+        if clause_cuts:
+            return clause_cuts[-1]
+
+        if len(self._buffer) <= self.max_chars:
+            return None
+
+        space = self._buffer.rfind(" ", 0, self.max_chars)
+        return space + 1 if space > 0 else self.max_chars
+
+
+def split_text(text, max_chars=MAX_TTS_INPUT_CHARS):
+    """
+    Divide um texto completo em trechos de até ``max_chars`` caracteres.
+
+    As frases são agrupadas no menor número possível de trechos, para que textos
+    dentro do limite da API continuem sendo sintetizados em uma única requisição.
+
+    Args:
+        text (str): Texto a ser dividido.
+        max_chars (int, optional): Tamanho máximo de cada trecho.
+
+    Returns:
+        list[str]: Trechos do texto, na ordem.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    segmenter = SentenceSegmenter(soft_max_chars=max_chars, max_chars=max_chars)
+    chunks = []
+    for sentence in segmenter.feed(text) + segmenter.flush():
+        if chunks and len(chunks[-1]) + 1 + len(sentence) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {sentence}"
+        else:
+            chunks.append(sentence)
+    return chunks
+
+
+class _SegmentStream:
+    """
+    Blocos de áudio de um trecho, produzidos pela síntese e consumidos pela reprodução.
+    """
+
+    _END = object()
+
+    def __init__(self, cancelled):
+        self._queue = queue.Queue()
+        self._cancelled = cancelled
+
+    def put(self, chunk):
+        """Acrescenta um bloco de áudio recebido da síntese."""
+        self._queue.put(chunk)
+
+    def finish(self, error=None):
+        """Sinaliza o fim do trecho, opcionalmente com o erro que o interrompeu."""
+        self._queue.put(error if error is not None else self._END)
+
+    def __iter__(self):
+        while not self._cancelled.is_set():
+            try:
+                item = self._queue.get(timeout=0.05)
+            except queue.Empty:
+                continue
+            if item is self._END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class SpeechPipeline:
+    """
+    Pipeline de síntese e reprodução de voz por trechos.
+
+    O texto alimentado em ``feed`` é segmentado; cada trecho é enviado para síntese
+    em um pool de threads limitado, e uma thread de reprodução toca os trechos na
+    ordem em que foram produzidos. O áudio de cada trecho é repassado à reprodução
+    bloco a bloco, à medida que chega da síntese.
+    """
+
+    def __init__(self, synthesize, play, max_workers=MAX_PARALLEL_SYNTHESIS, segmenter=None):
+        """
+        Inicializa o pipeline e inicia a thread de reprodução.
+
+        Args:
+            synthesize (callable): Função que recebe um trecho de texto e retorna um
+                iterável de blocos de áudio.
+            play (callable): Função que recebe um iterável de blocos de áudio, reproduz
+                os blocos à medida que chegam e retorna ao final da reprodução.
+            max_workers (int, optional): Número máximo de sínteses simultâneas.
+            segmenter (SentenceSegmenter, optional): Segmentador a ser usado.
+        """
+        self._synthesize = synthesize
+        self._play = play
+        self._segmenter = segmenter or SentenceSegmenter()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._cancelled = threading.Event()
+        self._playback_thread = threading.Thread(target=self._playback_loop, daemon=True)
+        self._playback_thread.start()
+
+    @property
+    def cancelled(self):
+        """Indica se o pipeline foi cancelado."""
+        return self._cancelled.is_set()
+
+    def feed(self, text):
+        """Acrescenta texto à resposta; trechos completos são enviados para síntese."""
+        with self._lock:
+            if self._closed:
+                return
+            for segment in self._segmenter.feed(text):
+                self._submit(segment)
+
+    def close(self):
+        """Indica o fim do texto; o restante do buffer é sintetizado e reproduzido."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for segment in self._segmenter.flush():
+                self._submit(segment)
+            self._queue.put(None)
+
+    def cancel(self):
+        """Interrompe o pipeline, descartando os trechos ainda não reproduzidos."""
+        self._cancelled.set()
+        with self._lock:
+            self._closed = True
+            self._queue.put(None)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def wait(self, timeout=None):
+        """
+        Aguarda o fim da reprodução.
+
+        Returns:
+            bool: True se a reprodução terminou dentro do tempo limite.
+        """
+        self._playback_thread.join(timeout)
+        return not self._playback_thread.is_alive()
+
+    def _submit(self, segment):
+        """Envia um trecho para síntese e enfileira o seu stream para reprodução."""
+        if self._cancelled.is_set():
+            return
+        stream = _SegmentStream(self._cancelled)
+        try:
+            self._executor.submit(self._run_synthesis, segment, stream)
+        except RuntimeError:
+            # O executor já foi encerrado por um cancelamento concorrente
+            return
+        self._queue.put(stream)
+
+    def _run_synthesis(self, segment, stream):
+        """Sintetiza um trecho, repassando os blocos de áudio ao seu stream."""
+        chunks = None
+        try:
+            chunks = self._synthesize(segment)
+            for chunk in chunks:
+                if self._cancelled.is_set():
+                    break
+                stream.put(chunk)
+        except Exception as e:
+            stream.finish(e)
+            return
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+        stream.finish()
+
+    def _playback_loop(self):
+        """Reproduz os trechos sintetizados na ordem em que foram produzidos."""
+        try:
+            while not self._cancelled.is_set():
+                stream = self._queue.get()
+                if stream is None:
+                    break
+                try:
+                    self._play(stream)
+                except Exception as e:
+                    if not self._cancelled.is_set():
+                        logging.error(f"Erro na síntese ou reprodução de um trecho de voz: {e}")
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: bench_startup
+
+Benchmark da inicialização: abre a janela principal (sem exibição, plataforma
+offscreen), registra o tempo até a primeira pintura e até a prontidão de cada
+subsistema e exibe o perfil de inicialização. Termina com código 1 se a primeira
+pintura exceder o orçamento ou se algum módulo pesado tiver sido importado antes dela.
+
+Uso:
+    python benchmarks/bench_startup.py [--budget 300] [--wait 10]
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 21:20 (horário de Zurique)
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# Importado primeiro: o início do perfil é a importação deste módulo
+from utils.startup_profile import startup_profile, FIRST_PAINT, FIRST_PAINT_BUDGET_MS
+
+import time
+import argparse
+from PySide6.QtWidgets import QApplication
+from gui.main_window import MainWindow
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da inicialização.")
+    parser.add_argument("--budget", type=float, default=FIRST_PAINT_BUDGET_MS)
+    parser.add_argument("--wait", type=float, default=10.0,
+                        help="Tempo máximo de espera pelos subsistemas, em segundos.")
+    args = parser.parse_args()
+
+    startup_profile.mark("importações")
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = MainWindow()
+    startup_profile.mark("janela criada")
+    window.show()
+
+    deadline = time.monotonic() + args.wait
+    while time.monotonic() < deadline:
+        app.processEvents()
+        if (startup_profile.elapsed(FIRST_PAINT) is not None
+                and window.ready_subsystems >= set(window.SUBSYSTEMS)):
+            break
+        time.sleep(0.005)
+    pending = set(window.SUBSYSTEMS) - window.ready_subsystems
+
+    print(startup_profile.report(args.budget))
+    if pending:
+        print(f"  Subsistemas não inicializados em {args.wait:.0f} s: {', '.join(sorted(pending))}")
+    window.close()
+
+    first_paint = startup_profile.elapsed(FIRST_PAINT)
+    if first_paint is None or first_paint > args.budget or startup_profile.heavy_at_first_paint:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
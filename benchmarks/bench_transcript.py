@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: bench_transcript
+
+Benchmark do histórico do chat: acrescenta 50 mil mensagens a uma TranscriptView
+visível e mede o tempo de cada bloco de mil mensagens e a memória alocada. Com o
+custo de acréscimo O(1), o tempo do último bloco deve ser próximo ao do primeiro.
+
+Uso:
+    python benchmarks/bench_transcript.py [--messages 50000] [--block 1000]
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 20:15 (horário de Zurique)
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from gui.transcript import TranscriptView
+
+BACKGROUNDS = ("#E6F3FF", "#F0FFF0")
+
+
+def run(messages, block):
+    """Acrescenta ``messages`` mensagens e retorna os tempos (s) de cada bloco."""
+    app = QApplication.instance() or QApplication([])
+    view = TranscriptView()
+    view.resize(800, 600)
+    view.show()
+    timings = []
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        for i in range(messages):
+            view.transcript.append_message("Você" if i % 2 == 0 else "Gysin IA",
+                                           f"Mensagem {i}: " + "texto de exemplo " * (i % 12 + 1),
+                                           BACKGROUNDS[i % 2])
+            if (i + 1) % block == 0:
+                # Processa a pintura e o layout pendentes, como no laço de eventos real
+                app.processEvents()
+                now = time.perf_counter()
+                timings.append(now - start)
+                start = now
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        spilled = view.transcript.store.spilled
+        view.close_transcript()
+        view.close()
+    return timings, peak, spilled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do histórico do chat.")
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--block", type=int, default=1000)
+    args = parser.parse_args()
+
+    timings, peak, spilled = run(args.messages, args.block)
+    per_message = [1e6 * timing / args.block for timing in timings]
+    print(f"Mensagens: {args.messages} (gravadas no disco: {spilled})")
+    print(f"Primeiro bloco: {per_message[0]:.1f} µs/mensagem")
+    print(f"Último bloco:   {per_message[-1]:.1f} µs/mensagem")
+    print(f"Pior bloco:     {max(per_message):.1f} µs/mensagem")
+    print(f"Total:          {sum(timings):.2f} s")
+    print(f"Pico de memória Python: {peak / 1e6:.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
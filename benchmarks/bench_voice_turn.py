@@ -0,0 +1,446 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: bench_voice_turn
+
+Benchmark de ponta a ponta de um turno de voz, sem dispositivos de áudio nem rede:
+palavra-chave → gravação (record_audio) → transcrição → resposta do modelo em
+streaming → síntese e reprodução por trechos. O código real do pipeline é executado
+com um microfone simulado (alimenta o AudioCaptureService com falas sintéticas em
+pt/en/de/es), um alto-falante simulado (consome o motor de reprodução em tempo real) e a API
+simulada de tests/openai_stub.py, com latências sorteadas por uma semente fixa.
+
+São medidos, em milissegundos (p50/p95/p99):
+    wake_word   fim da palavra-chave → detecção
+    record      fim da fala → fim da gravação (detecção do fim da fala)
+    stt         transcrição
+    ttft        início da requisição ao modelo → primeiro token
+    llm         início da requisição ao modelo → último token
+    tts         primeiro token → primeiro áudio no alto-falante
+    playback    primeiro áudio → fim da reprodução
+    ttfa        fim da fala → primeiro áudio no alto-falante
+    total       fim da palavra-chave → fim da reprodução
+
+Os dispositivos simulados rodam ``--speed`` vezes mais rápido que o tempo real (as
+etapas de áudio encolhem na mesma proporção); as latências da API não mudam. O
+resultado é comparado com uma linha de base em JSON, e o benchmark termina com
+código 1 se algum percentil exceder a base em mais de ``--tolerance`` (mais uma
+folga absoluta de ``--slack-ms``).
+
+Uso:
+    python benchmarks/bench_voice_turn.py [--iterations 3] [--warmup 1] [--languages pt,en,de,es]
+        [--speed 4] [--baseline benchmarks/baselines/voice_turn.json] [--save-baseline]
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 23:40 (horário de Zurique)
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import logging
+import argparse
+import tempfile
+import threading
+from contextlib import redirect_stdout
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from tests.openai_stub import start_shared_stub, StubBehavior, Latency
+from utils.audio_buffer import AudioBuffer
+from utils.audio_capture import AudioCaptureService
+from utils.audio_player import PlaybackEngine, PCMPlayer
+from utils.audio_utils import record_audio
+from api import openai_tts
+from api.openai_tts import stream_speech, TTSCache, PCM_SAMPLE_RATE
+from api.openai_client import OpenAIClient
+from api.stt_backends import get_backend
+from api.tts_pipeline import SpeechPipeline
+from api.openai_audio_activation import detect_wake_word, WAKE_WORD
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "voice_turn.json")
+METRICS = ("wake_word", "record", "stt", "ttft", "llm", "tts", "playback", "ttfa", "total")
+PERCENTILES = (50, 95, 99)
+CAPTURE_RATE = 16000
+# Pré-gravação usada pela janela ao iniciar a gravação após a palavra-chave
+RECORDING_PREROLL_MS = 300
+
+# O que o usuário "diz" em cada idioma (texto devolvido pela transcrição simulada)
+UTTERANCES = {
+    "pt": "Qual é a previsão do tempo para amanhã em Zurique?",
+    "en": "What is the weather forecast for tomorrow in Zurich?",
+    "de": "Wie ist die Wettervorhersage für morgen in Zürich?",
+    "es": "¿Cuál es el pronóstico del tiempo para mañana en Zúrich?",
+}
+REPLIES = {
+    "pt": "Amanhã em Zurique o céu fica parcialmente nublado. A máxima deve chegar a dezoito graus. "
+          "Leve um casaco leve para a noite.",
+    "en": "Tomorrow in Zurich the sky will be partly cloudy. The high should reach eighteen degrees. "
+          "Bring a light jacket for the evening.",
+    "de": "Morgen ist es in Zürich teilweise bewölkt. Die Höchsttemperatur liegt bei achtzehn Grad. "
+          "Nimm am Abend eine leichte Jacke mit.",
+    "es": "Mañana en Zúrich el cielo estará parcialmente nublado. La máxima llegará a dieciocho grados. "
+          "Lleva una chaqueta ligera para la noche.",
+}
+
+
+def simulated_api(seed, speed):
+    """Configuração da API simulada: latências típicas e síntese duas vezes mais rápida que a fala."""
+    return StubBehavior(
+        seed=seed,
+        latency={
+            "transcriptions": Latency.lognormal(300, 0.3),
+            "chat": Latency.lognormal(350, 0.3),
+            "speech": Latency.lognormal(200, 0.3),
+        },
+        tokens_per_second=50,
+        speech_bytes_per_second=2 * PCM_SAMPLE_RATE * 2 * speed,
+    )
+
+
+def synthesize_speech_like(key, seconds, sample_rate=CAPTURE_RATE):
+    """
+    Gera um sinal semelhante à fala: sílabas sonoras (harmônicos com envelope) separadas
+    por pausas curtas, determinístico para cada chave.
+
+    Returns:
+        np.ndarray: Amostras int16 mono.
+    """
+    rng = np.random.default_rng(zlib.crc32(key.encode("utf-8")))
+    parts = []
+    total = 0
+    while total < seconds * sample_rate:
+        length = int(rng.uniform(0.12, 0.22) * sample_rate)
+        t = np.arange(length) / sample_rate
+        f0 = rng.uniform(110, 220)
+        voiced = sum(np.sin(2 * np.pi * f0 * harmonic * t) / harmonic for harmonic in range(1, 6))
+        syllable = 4000 * voiced * np.hanning(length)
+        gap = np.zeros(int(rng.uniform(0.03, 0.08) * sample_rate))
+        parts.extend((syllable, gap))
+        total += length + len(gap)
+    return np.concatenate(parts).astype(np.int16)
+
+
+def build_fixtures(languages):
+    """Falas sintéticas da palavra-chave e de cada idioma (duração proporcional ao texto)."""
+    fixtures = {"wake": synthesize_speech_like("wake", 0.6)}
+    for language in languages:
+        fixtures[language] = synthesize_speech_like(language, 0.03 * len(UTTERANCES[language]))
+    return fixtures
+
+
+class Utterance:
+    """Fala enfileirada no microfone simulado; ``end`` é o instante em que terminou."""
+
+    def __init__(self, samples):
+        self.samples = samples
+        self.end = None
+        self.done = threading.Event()
+
+
+class FakeMicrophone:
+    """
+    Microfone simulado: publica no AudioCaptureService, em tempo real (dividido por
+    ``speed``), um ruído de fundo baixo e as falas enfileiradas.
+    """
+
+    def __init__(self, capture, speed=1.0, noise_rms=30.0, seed=0):
+        self.capture = capture
+        self.speed = speed
+        self.noise_rms = noise_rms
+        self._rng = np.random.default_rng(seed)
+        self._queue = []
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="fake-microphone")
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+
+    def say(self, samples):
+        """Enfileira uma fala; retorna o Utterance correspondente."""
+        utterance = Utterance(samples)
+        with self._lock:
+            self._queue.append(utterance)
+        return utterance
+
+    def _run(self):
+        block = self.capture.frame_length
+        interval = block / self.capture.sample_rate / self.speed
+        current, offset = None, 0
+        next_time = time.perf_counter()
+        while self._running:
+            samples = self._rng.normal(0, self.noise_rms, block)
+            if current is None:
+                with self._lock:
+                    current = self._queue.pop(0) if self._queue else None
+                offset = 0
+            if current is not None:
+                speech = current.samples[offset:offset + block]
+                samples[:len(speech)] += speech
+                offset += block
+            self.capture.write(samples.astype(np.int16))
+            if current is not None and offset >= len(current.samples):
+                current.end = time.perf_counter()
+                current.done.set()
+                current = None
+            next_time += interval
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+
+class FakeOutputStream:
+    """Dispositivo de saída simulado: chama o callback do reprodutor em tempo real (dividido por ``speed``)."""
+
+    def __init__(self, callback, sample_rate, channels, speed=1.0, block_frames=480):
+        self.callback = callback
+        self.frame_size = 2 * channels
+        self.block_frames = block_frames
+        self.interval = block_frames / sample_rate / speed
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True, name="fake-speaker")
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+
+    def close(self):
+        pass
+
+    def _run(self):
+        out = bytearray(self.block_frames * self.frame_size)
+        next_time = time.perf_counter()
+        while self._running:
+            self.callback(out, self.block_frames, None, None)
+            next_time += self.interval
+            time.sleep(max(0.0, next_time - time.perf_counter()))
+
+
+class HeadlessPlaybackEngine(PlaybackEngine):
+    """Motor de reprodução com o alto-falante simulado; registra o instante do primeiro áudio tocado."""
+
+    def __init__(self, speed=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.speed = speed
+        self.first_audio_time = None
+
+    def _open_stream(self):
+        return FakeOutputStream(self._callback, self.sample_rate, self.channels, self.speed)
+
+    def _update_level(self, data):
+        if self.first_audio_time is None:
+            self.first_audio_time = time.perf_counter()
+        super()._update_level(data)
+
+
+def run_turn(language, microphone, player, stub, fixtures, cache_directory):
+    """
+    Executa um turno de voz completo.
+
+    Returns:
+        dict: Latência de cada métrica, em milissegundos.
+    """
+    capture = microphone.capture
+    # Cache de síntese vazio a cada turno: mede o caminho sem cache
+    openai_tts.tts_cache = TTSCache(cache_directory)
+    player.engine.first_audio_time = None
+
+    # Palavra-chave (janela fixa de gravação + transcrição)
+    stub.behavior.transcript = WAKE_WORD
+    subscription = capture.subscribe()
+    wake = microphone.say(fixtures["wake"])
+    if not detect_wake_word(subscription):
+        raise RuntimeError("Palavra-chave não detectada.")
+    detected = time.perf_counter()
+    subscription.close()
+
+    # Gravação até o fim da fala
+    subscription = capture.subscribe(preroll_ms=RECORDING_PREROLL_MS)
+    utterance = microphone.say(fixtures[language])
+    audio = record_audio(max_duration=15.0, subscription=subscription)
+    recorded = time.perf_counter()
+    subscription.close()
+    if not audio:
+        raise RuntimeError("Nenhuma fala detectada na gravação.")
+
+    # Transcrição
+    stub.behavior.transcript = UTTERANCES[language]
+    text = get_backend("openai").transcribe(audio, language)
+    transcribed = time.perf_counter()
+
+    # Resposta em streaming, sintetizada e reproduzida por trechos
+    stub.behavior.reply = lambda messages: REPLIES[language]
+    client = OpenAIClient()
+    pipeline = SpeechPipeline(synthesize=lambda segment: stream_speech(segment, language_code=language),
+                              play=player.play_stream)
+    first_token = None
+    llm_start = time.perf_counter()
+    for delta in client.stream_response(text):
+        if first_token is None:
+            first_token = time.perf_counter()
+        pipeline.feed(delta)
+    llm_end = time.perf_counter()
+    pipeline.close()
+    pipeline.wait()
+    finished = time.perf_counter()
+    first_audio = player.engine.first_audio_time
+    if first_audio is None:
+        raise RuntimeError("Nenhum áudio foi reproduzido.")
+
+    ms = lambda start, end: 1000 * (end - start)
+    return {
+        "wake_word": ms(wake.end, detected),
+        "record": ms(utterance.end, recorded),
+        "stt": ms(recorded, transcribed),
+        "ttft": ms(llm_start, first_token),
+        "llm": ms(llm_start, llm_end),
+        "tts": ms(first_token, first_audio),
+        "playback": ms(first_audio, finished),
+        "ttfa": ms(utterance.end, first_audio),
+        "total": ms(wake.end, finished),
+    }
+
+
+def summarize(samples):
+    """Percentis de cada métrica."""
+    return {metric: {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+            for metric, values in samples.items()}
+
+
+def compare(summary, baseline, tolerance, slack_ms):
+    """
+    Compara o resultado com a linha de base.
+
+    Returns:
+        list[str]: Regressões encontradas (vazia se todas as métricas estão no limite).
+    """
+    regressions = []
+    for metric, percentiles in summary.items():
+        for name, value in percentiles.items():
+            reference = baseline.get("metrics", {}).get(metric, {}).get(name)
+            if reference is None:
+                continue
+            limit = reference * (1 + tolerance) + slack_ms
+            if value > limit:
+                regressions.append(f"{metric} {name}: {value:.0f} ms > {limit:.0f} ms (base {reference:.0f} ms)")
+    return regressions
+
+
+def report(summary, baseline=None):
+    """Tabela das métricas (com a linha de base, se houver)."""
+    lines = [f"{'métrica':<10}" + "".join(f"{f'p{p}':>10}" for p in PERCENTILES)
+             + (f"{'base p50':>11}{'Δ p50':>9}" if baseline else "")]
+    for metric in METRICS:
+        values = summary[metric]
+        line = f"{metric:<10}" + "".join(f"{values[f'p{p}']:>10.0f}" for p in PERCENTILES)
+        reference = (baseline or {}).get("metrics", {}).get(metric, {}).get("p50")
+        if reference:
+            line += f"{reference:>11.0f}{100 * (values['p50'] / reference - 1):>+8.0f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ponta a ponta de um turno de voz.")
+    parser.add_argument("--iterations", type=int, default=3, help="Turnos por idioma.")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Turnos descartados antes da medição (criação do cliente, importações).")
+    parser.add_argument("--languages", default=",".join(UTTERANCES))
+    parser.add_argument("--speed", type=float, default=4.0,
+                        help="Aceleração dos dispositivos simulados em relação ao tempo real.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Grava o resultado como linha de base.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Aumento relativo tolerado.")
+    parser.add_argument("--slack-ms", type=float, default=50.0, help="Folga absoluta tolerada.")
+    parser.add_argument("--write-fixtures", metavar="DIR", help="Grava as falas sintéticas em WAV.")
+    args = parser.parse_args()
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+
+    logging.getLogger().setLevel(logging.WARNING)
+    fixtures = build_fixtures(languages)
+    if args.write_fixtures:
+        os.makedirs(args.write_fixtures, exist_ok=True)
+        for name, samples in fixtures.items():
+            AudioBuffer(samples, CAPTURE_RATE).save(os.path.join(args.write_fixtures, f"{name}.wav"))
+
+    stub = start_shared_stub()
+    stub.configure(simulated_api(args.seed, args.speed))
+    capture = AudioCaptureService(sample_rate=CAPTURE_RATE)
+    microphone = FakeMicrophone(capture, speed=args.speed, seed=args.seed)
+    player = PCMPlayer(engine=HeadlessPlaybackEngine(speed=args.speed, sample_rate=PCM_SAMPLE_RATE))
+    microphone.start()
+    # Calibra o detector de voz com o ruído de fundo antes do primeiro turno
+    time.sleep(0.5 / args.speed)
+
+    samples = {metric: [] for metric in METRICS}
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for iteration in range(args.warmup):
+                with redirect_stdout(io.StringIO()):
+                    run_turn(languages[0], microphone, player, stub, fixtures,
+                             os.path.join(directory, f"warmup-{iteration}"))
+            for iteration in range(args.iterations):
+                for language in languages:
+                    with redirect_stdout(io.StringIO()):
+                        result = run_turn(language, microphone, player, stub, fixtures,
+                                          os.path.join(directory, f"{language}-{iteration}"))
+                    for metric, value in result.items():
+                        samples[metric].append(value)
+                    print(f"  {language} #{iteration + 1}: ttfa {result['ttfa']:.0f} ms, "
+                          f"total {result['total']:.0f} ms")
+    finally:
+        microphone.stop()
+        player.close()
+        player.engine.close()
+
+    summary = summarize(samples)
+    settings = {"iterations": args.iterations, "warmup": args.warmup, "languages": languages,
+                "speed": args.speed, "seed": args.seed}
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get("settings", {}).get("speed") != args.speed:
+            print(f"Aviso: a linha de base foi medida com --speed {baseline['settings'].get('speed')}.")
+
+    print(f"\nTurno de voz ({len(samples['total'])} turnos, velocidade {args.speed:g}x), em ms:")
+    print(report(summary, baseline))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"settings": settings, "metrics": summary}, baseline_file, indent=2)
+            baseline_file.write("\n")
+        print(f"\nLinha de base gravada em {args.baseline}.")
+        return 0
+    if baseline is None:
+        print(f"\nSem linha de base em {args.baseline}; use --save-baseline para criá-la.")
+        return 0
+    regressions = compare(summary, baseline, args.tolerance, args.slack_ms)
+    if regressions:
+        print("\nRegressões (tolerância de {:.0%} + {:.0f} ms):".format(args.tolerance, args.slack_ms))
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nDentro da linha de base.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,14 +11,15 @@ Data: 15/10/2024 13:11 (horário de Zurique)
 """
 
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, QLineEdit,
-    QPushButton, QScrollArea, QTimer, QMessageBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
+    QPushButton, QMessageBox
 )
-from PySide6.QtCore import Qt, Signal, Slot
-from PySide6.QtGui import QFont, QTextCursor, QKeyEvent
+from PySide6.QtCore import Qt, Signal, Slot, QTimer
+from PySide6.QtGui import QFont, QKeyEvent
 from typing import Optional
-from html import escape
 from gui.language_utils import detect_language
+from gui.transcript import TranscriptView
+from gui.render_scheduler import RenderScheduler
 
 class ChatWidget(QWidget):
     """
@@ -51,19 +52,15 @@ class ChatWidget(QWidget):
         layout = QVBoxLayout(self)
 
         # Configuração da área de exibição do chat
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
+        self.chat_display = TranscriptView()
         self.chat_display.setFont(QFont("Arial", self.FONT_SIZE))
         self.chat_display.setStyleSheet(
             f"background-color: {self.BACKGROUND_COLOR}; "
             f"border: 1px solid {self.BORDER_COLOR}; border-radius: 5px;"
         )
-
-        # Adição de uma área de rolagem para o chat
-        scroll_area = QScrollArea()
-        scroll_area.setWidget(self.chat_display)
-        scroll_area.setWidgetResizable(True)
-        layout.addWidget(scroll_area)
+        layout.addWidget(self.chat_display)
+        # As atualizações do chat são aplicadas no máximo uma vez por quadro
+        self.render_scheduler = RenderScheduler(self.chat_display, parent=self)
 
         # Layout para entrada de texto e botão de envio
         input_layout = QHBoxLayout()
@@ -124,21 +121,8 @@ class ChatWidget(QWidget):
     def add_message(self, sender: str, message: str, background_color: Optional[str] = None):
         """Adiciona uma mensagem à área de exibição do chat."""
         try:
-            cursor = self.chat_display.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.chat_display.setTextCursor(cursor)
-
-            if background_color:
-                formatted_message = f'<p style="background-color: {background_color};"><strong>{escape(sender)}:</strong> {escape(message)}</p>'
-            else:
-                formatted_message = f"<p><strong>{escape(sender)}:</strong> {escape(message)}</p>"
-            
-            self.chat_display.insertHtml(formatted_message)
-            
-            # Rola para o final da área de chat
-            self.chat_display.verticalScrollBar().setValue(
-                self.chat_display.verticalScrollBar().maximum()
-            )
+            # A visão rola para o final enquanto o usuário não estiver lendo mensagens anteriores
+            self.render_scheduler.append(sender, message, background_color)
         except Exception as e:
             print(f"Erro ao adicionar mensagem: {str(e)}")
 
@@ -156,7 +140,8 @@ class ChatWidget(QWidget):
 
     def clear_chat(self):
         """Limpa todas as mensagens do chat."""
-        self.chat_display.clear()
+        self.render_scheduler.flush()
+        self.chat_display.transcript.clear()
 
     def disable_input(self):
         """Desabilita a entrada do usuário."""
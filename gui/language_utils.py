@@ -1,15 +1,173 @@
-from langdetect import detect, DetectorFactory
+# -*- coding: utf-8 -*-
+"""
+Módulo: language_utils
 
-# Configuração para resultados consistentes na detecção de idiomas
-DetectorFactory.seed = 0
+Este módulo implementa a identificação de idioma usada pela interface. Os perfis do
+langdetect são carregados em segundo plano na inicialização, os resultados ficam em
+um cache LRU por texto e dicas confiáveis (o idioma informado pela transcrição ou o
+idioma do turno anterior) dispensam a detecção. Textos curtos com palavras de um
+único idioma são resolvidos por um caminho rápido, sem o classificador estatístico.
+O próprio langdetect só é importado no carregamento dos perfis, e não na importação
+deste módulo.
 
-def detect_language(text):
-    """Detecta o idioma do texto de entrada."""
-    try:
-        if len(text) < 3:
-            print("Texto muito curto para detecção precisa.")
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 19:40 (horário de Zurique)
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+# Abaixo deste tamanho, o caminho rápido é tentado antes do langdetect
+SHORT_TEXT_CHARS = 20
+CACHE_SIZE = 1024
+
+# Palavras frequentes de cada idioma suportado (caminho rápido). As palavras comuns a
+# mais de um idioma aparecem em todos eles: um texto com essas palavras empata e vai
+# para o classificador estatístico
+COMMON_WORDS = {
+    "pt": {"olá", "ola", "obrigado", "obrigada", "você", "voce", "não", "nao", "sim", "bom", "dia",
+           "tudo", "bem", "que", "como", "está", "esta", "por", "favor", "tchau", "boa", "noite", "no"},
+    "en": {"hello", "hi", "thanks", "thank", "you", "yes", "the", "what", "how", "please", "good",
+           "morning", "bye", "is", "are", "no", "was", "so"},
+    "de": {"hallo", "danke", "ja", "nein", "bitte", "guten", "tag", "morgen", "wie", "ist", "und",
+           "nicht", "tschüss", "was", "so"},
+    "es": {"hola", "gracias", "sí", "qué", "cómo", "buenos", "días", "buenas", "adiós", "usted",
+           "está", "por", "que", "como", "esta", "dia", "no"},
+}
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+class LanguageIdentifier:
+    """
+    Serviço de identificação de idioma com pré-carregamento, cache LRU e dicas.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE, default=None):
+        """
+        Inicializa o serviço (os perfis são carregados por ``warm_up`` ou no primeiro uso).
+
+        Args:
+            cache_size (int, optional): Número máximo de textos no cache. Padrão é 1024.
+            default (str, optional): Idioma usado quando não há como detectar. Padrão é None.
+        """
+        self.cache_size = cache_size
+        self.default = default
+        self.last_language = None
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._warming_up = False
+
+    @property
+    def ready(self):
+        """Indica se os perfis do langdetect já foram carregados."""
+        return self._ready.is_set()
+
+    def warm_up(self, background=True):
+        """
+        Carrega os perfis do langdetect, por padrão em uma thread daemon.
+
+        Args:
+            background (bool, optional): Se verdadeiro, não bloqueia. Padrão é True.
+        """
+        if self._ready.is_set() or self._warming_up:
+            return
+        self._warming_up = True
+        if background:
+            threading.Thread(target=self._load_profiles, daemon=True).start()
+        else:
+            self._load_profiles()
+
+    def remember(self, language):
+        """Registra o idioma do turno atual, usado como dica para o próximo."""
+        if language:
+            self.last_language = language
+
+    def detect(self, text, hint=None):
+        """
+        Identifica o idioma de um texto.
+
+        Args:
+            text (str): Texto a ser analisado.
+            hint (str, optional): Idioma já conhecido e confiável (por exemplo, o informado
+                pela transcrição); quando presente, é retornado sem detecção.
+
+        Returns:
+            str: Código ISO-639-1 do idioma, ou o idioma do turno anterior (ou ``default``)
+            quando a detecção falha ou os perfis ainda estão carregando.
+        """
+        if hint:
+            return hint
+        key = " ".join(text.split())
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+
+        language = self._detect_short(key) if len(key) < SHORT_TEXT_CHARS else None
+        if language is None:
+            if self._warming_up and not self._ready.is_set():
+                # Não bloqueia enquanto o pré-carregamento não termina
+                return self.last_language or self.default
+            language = self._detect_statistical(key)
+
+        if language is not None:
+            with self._lock:
+                self._cache[key] = language
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            return language
+        return self.last_language or self.default
+
+    def _detect_short(self, text):
+        """
+        Caminho rápido: palavras frequentes de cada idioma.
+
+        Só decide quando apenas um idioma tem palavras no texto; caso contrário (nenhum
+        ou mais de um), retorna None e o texto vai para o classificador estatístico.
+        """
+        words = _WORD_PATTERN.findall(text.casefold())
+        matches = [language for language, vocabulary in COMMON_WORDS.items()
+                   if any(word in vocabulary for word in words)]
+        return matches[0] if len(matches) == 1 else None
+
+    def _detect_statistical(self, text):
+        """Detecção pelo langdetect; None em caso de erro."""
+        self._load_profiles()
+        from langdetect import detector_factory
+        try:
+            detector = detector_factory._factory.create()
+            detector.append(text)
+            return detector.detect()
+        except Exception as e:
+            print(f"Erro na detecção do idioma: {e}")
             return None
-        return detect(text)
-    except Exception as e:
-        print(f"Erro na detecção do idioma: {e}")
-        return None
\ No newline at end of file
+
+    def _load_profiles(self):
+        """Carrega os perfis do langdetect uma única vez (o langdetect não protege a carga)."""
+        if self._ready.is_set():
+            return
+        with self._load_lock:
+            if self._ready.is_set():
+                return
+            from langdetect import DetectorFactory, detector_factory
+            # Configuração para resultados consistentes na detecção de idiomas
+            DetectorFactory.seed = 0
+            detector_factory.init_factory()
+            self._ready.set()
+
+
+# Instância compartilhada pela aplicação
+language_identifier = LanguageIdentifier()
+
+
+def detect_language(text, hint=None):
+    """Detecta o idioma do texto de entrada (veja ``LanguageIdentifier.detect``)."""
+    return language_identifier.detect(text, hint=hint)
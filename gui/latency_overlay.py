@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: latency_overlay
+
+Este módulo implementa o painel de latência exibido sobre a janela principal quando
+TELEMETRY_OVERLAY=1. O painel consulta periodicamente os últimos valores registrados
+pela telemetria (utils.telemetry) e mostra a duração das etapas do último turno de
+voz, sem receber sinais das threads que fazem as medições.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 18/10/2026 00:40 (horário de Zurique)
+"""
+
+from PySide6.QtWidgets import QLabel
+from PySide6.QtCore import Qt, QTimer, QEvent
+
+# Métricas exibidas, na ordem do turno de voz: (rótulo, chave em Telemetry.latest())
+OVERLAY_METRICS = (
+    ("Palavra-chave", "wake_word_process_ms"),
+    ("Gravação", "span:audio.record"),
+    ("Transcrição", "span:stt.transcribe"),
+    ("1º token", "ttft_ms"),
+    ("1º áudio", "ttfa_ms"),
+    ("Resposta", "span:turn.response"),
+)
+REFRESH_INTERVAL_MS = 500
+MARGIN = 12
+
+
+class LatencyOverlay(QLabel):
+    """
+    Painel semitransparente, no canto superior direito da janela, com as latências do último turno.
+    """
+
+    def __init__(self, telemetry, parent):
+        """
+        Inicializa o painel.
+
+        Args:
+            telemetry (Telemetry): Registro consultado.
+            parent (QWidget): Janela sobre a qual o painel é exibido.
+        """
+        super().__init__(parent)
+        self.telemetry = telemetry
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 160); color: #E0E0E0; border-radius: 6px;"
+            "padding: 6px; font-family: monospace; font-size: 11px;"
+        )
+        self._text = None
+        parent.installEventFilter(self)
+        self._timer = QTimer(self)
+        self._timer.setInterval(REFRESH_INTERVAL_MS)
+        self._timer.timeout.connect(self.refresh)
+        self._timer.start()
+        self.refresh()
+
+    def refresh(self):
+        """Atualiza o texto com os últimos valores (apenas se algo mudou)."""
+        latest = self.telemetry.latest()
+        lines = []
+        for label, key in OVERLAY_METRICS:
+            value = latest.get(key)
+            lines.append(f"{label:<14}{'—' if value is None else f'{value:.0f} ms':>10}")
+        text = "\n".join(lines)
+        if text != self._text:
+            self._text = text
+            self.setText(text)
+            self.adjustSize()
+            self.reposition()
+
+    def reposition(self):
+        """Mantém o painel no canto superior direito da janela."""
+        self.move(self.parentWidget().width() - self.width() - MARGIN, MARGIN)
+        self.raise_()
+
+    def eventFilter(self, watched, event):
+        if watched is self.parentWidget() and event.type() == QEvent.Resize:
+            self.reposition()
+        return super().eventFilter(watched, event)
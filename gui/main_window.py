@@ -5,52 +5,201 @@ Módulo: MainWindow
 Este módulo implementa a janela principal da aplicação Gysin IA, que oferece uma interface
 de chat interativa com integração de IA, síntese de voz e detecção de palavra-chave.
 
+A janela é pintada antes de qualquer subsistema pesado: o cliente da API, o áudio, a
+palavra-chave e os perfis de idioma são inicializados em segundo plano após a primeira
+pintura, e cada um emite ``subsystem_ready`` quando fica pronto. Os módulos que
+dependem do openai, do NumPy ou dos dispositivos de áudio são importados sob demanda.
+
 Autor: Stefano Gysin - StefanoGysin@hotmail.com
 Data: 20/10/2024 15:12 (horário de Zurique)
 """
 
 # Importações necessárias
 from PySide6.QtWidgets import (
-    QMainWindow, QWidget, QVBoxLayout, QPushButton, QTextEdit, QLineEdit, QApplication, QLabel, QCheckBox
+    QMainWindow, QWidget, QVBoxLayout, QPushButton, QLineEdit, QApplication, QLabel, QCheckBox
 )
-from PySide6.QtCore import Qt, Slot, QTimer, Signal
-from PySide6.QtGui import QFont, QIcon, QTextCursor
-from api.openai_client import OpenAIClient
-from dotenv import load_dotenv
-from api.openai_tts import text_to_speech
-from api.openai_stt import transcribe_audio as openai_transcribe_audio
-from utils.audio_utils import record_audio
-from gui.language_utils import detect_language
-from utils.audio_activation import detect_wake_word
+from PySide6.QtCore import Qt, Slot, Signal, QThreadPool, QTimer
+from PySide6.QtGui import QFont, QIcon
+from utils.env import load_environment
+from utils.startup_profile import startup_profile, FIRST_PAINT
+from utils.telemetry import telemetry, notify_first, start_exporters, shutdown_exporters
+from gui.language_utils import language_identifier
+from api.client_registry import client_registry
+from gui.workers import Worker, StreamingWorker
+from gui.transcript import TranscriptView
+from gui.render_scheduler import RenderScheduler
 import threading
-import vlc
+import time
 import os
 
 # Carrega as variáveis de ambiente
-load_dotenv()
+load_environment()
 
 class MainWindow(QMainWindow):
     """Classe principal que representa a janela da aplicação Gysin IA."""
 
     # Sinal para detecção de palavra-chave
     wake_word_detected = Signal()
+    # Sinal para interrupção da fala do assistente pelo usuário
+    barge_in_detected = Signal()
+    # Sinal emitido quando um subsistema termina de inicializar (nome do subsistema)
+    subsystem_ready = Signal(str)
+    # Sinal emitido quando um subsistema falha fora do pool de threads (nome, mensagem)
+    subsystem_failed = Signal(str, str)
+
+    # Subsistemas inicializados em segundo plano após a primeira pintura
+    SUBSYSTEMS = ("language", "api", "audio", "wake_word")
 
     # Constantes para cores de fundo das mensagens
     BACKGROUND_USER = "#E6F3FF"
     BACKGROUND_AI = "#F0FFF0"
     BACKGROUND_SYSTEM = "#444444"
     FONT_SIZE = 12
+    TYPING_TEXT = "Gysin IA está digitando..."
+    MAX_WORKER_THREADS = 4
+    # Áudio anterior à palavra-chave incluído na gravação
+    RECORDING_PREROLL_MS = 500
+    # Na interrupção, inclui o início da fala usado para detectá-la
+    BARGE_IN_PREROLL_MS = 400
+    # Duração máxima de uma gravação (ditados longos são transcritos em trechos)
+    MAX_RECORDING_SECONDS = 120
+    # Espera após uma falha da detecção da palavra-chave (dobra a cada falha seguida)
+    WAKE_WORD_RETRY_SECONDS = 1.0
+    WAKE_WORD_MAX_RETRY_SECONDS = 30.0
+    # Falhas seguidas após as quais a detecção da palavra-chave é desativada
+    WAKE_WORD_MAX_FAILURES = 5
+    # Som tocado ao detectar a palavra-chave e o seu volume
+    ACTIVATION_SOUND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "resources", "Audios", "activation_sound.mp3")
+    ACTIVATION_VOLUME = 0.8
 
     def __init__(self):
         """Inicializa a janela principal e configura a interface do usuário."""
         super().__init__()
         self.setWindowTitle("Gysin IA")
         self.setMinimumSize(1080, 720)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(self.MAX_WORKER_THREADS)
+        self._active_workers = set()
+        self._recording = False
+        self._streaming_message = None  # Índice do balão da resposta em streaming
+        # Turno da resposta em andamento: trechos e resultados de turnos anteriores são ignorados
+        self._response_turn = 0
+        self._response_cancel = None
+        self._speech_pipeline = None
+        # Criados pela inicialização em segundo plano (ou no primeiro uso)
+        self._openai_client = None
+        self._client_lock = threading.Lock()
+        self.playback_engine = None
+        self.audio_player = None
+        self.audio_capture = None
+        self.echo_gate = None
+        self.barge_in_monitor = None
+        self.ready_subsystems = set()
+        self._painted = False
         self.setup_ui()
-        self.openai_client = OpenAIClient()
+        self.latency_overlay = None
+        if os.getenv('TELEMETRY_OVERLAY') == '1':
+            from gui.latency_overlay import LatencyOverlay
+            self.latency_overlay = LatencyOverlay(telemetry, self)
+        self.subsystem_ready.connect(self.on_subsystem_ready)
+        self.subsystem_failed.connect(self.on_subsystem_error)
+        self.wake_word_detected.connect(self.on_wake_word_detected)
+        self.barge_in_detected.connect(self.on_barge_in)
         self.add_message("Sistema", "Bem-vindo ao Gysin IA! Como posso ajudar você hoje?", self.BACKGROUND_SYSTEM)
+
+    @property
+    def openai_client(self):
+        """Cliente da API, criado na inicialização em segundo plano ou no primeiro uso."""
+        with self._client_lock:
+            if self._openai_client is None:
+                from api.openai_client import OpenAIClient
+                self._openai_client = OpenAIClient()
+            return self._openai_client
+
+    def paintEvent(self, event):
+        """Inicia os subsistemas em segundo plano depois da primeira pintura da janela."""
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            startup_profile.mark(FIRST_PAINT)
+            QTimer.singleShot(0, self.initialize_subsystems)
+
+    # Inicialização em Segundo Plano
+    def initialize_subsystems(self):
+        """Inicializa os perfis de idioma, o cliente da API e o áudio no pool de threads."""
+        start_exporters()
+        self.start_worker(self.load_language_profiles,
+                          on_result=lambda _: self.subsystem_ready.emit("language"),
+                          on_error=lambda message: self.on_subsystem_error("language", message))
+        self.start_worker(self.create_openai_client,
+                          on_result=lambda _: self.subsystem_ready.emit("api"),
+                          on_error=lambda message: self.on_subsystem_error("api", message))
+        self.start_worker(self.initialize_audio,
+                          on_result=self.on_audio_ready,
+                          on_error=self.on_audio_error)
+
+    def load_language_profiles(self, progress_callback):
+        """Carrega os perfis de idioma (executa em segundo plano)."""
+        language_identifier.warm_up(background=False)
+
+    def create_openai_client(self, progress_callback):
+        """Cria o cliente da API (executa em segundo plano)."""
+        return self.openai_client is not None
+
+    def initialize_audio(self, progress_callback):
+        """
+        Cria o reprodutor e abre a captura de áudio compartilhada (executa em segundo plano).
+
+        A falha da captura não é fatal: sem ela, cada etapa abre o seu próprio stream.
+        """
+        from api.openai_tts import PCM_SAMPLE_RATE, PCM_CHANNELS
+        from utils.audio_player import PlaybackEngine, PCMPlayer
+        from utils.audio_capture import AudioCaptureService
+        from utils.barge_in import EchoGate
+
+        playback_engine = PlaybackEngine(sample_rate=PCM_SAMPLE_RATE, channels=PCM_CHANNELS)
+        # O som de ativação é decodificado uma única vez e tocado da memória
+        playback_engine.load_cue("activation", self.ACTIVATION_SOUND)
+        audio_player = PCMPlayer(engine=playback_engine)
+        audio_capture = AudioCaptureService()
+        try:
+            audio_capture.start()
+        except Exception as e:
+            print(f"Captura de áudio compartilhada indisponível: {e}")
+        self.playback_engine = playback_engine
+        self.audio_player = audio_player
+        self.echo_gate = EchoGate(audio_player)
+        self.audio_capture = audio_capture
+
+    @Slot(object)
+    def on_audio_ready(self, _):
+        """Inicia a detecção da palavra-chave e o monitor de interrupção após a inicialização do áudio."""
+        self.subsystem_ready.emit("audio")
+        self.initialize_wake_word_detection()
+
+    @Slot(str)
+    def on_audio_error(self, message):
+        """
+        Exibe a falha na inicialização do áudio e inicia a detecção da palavra-chave mesmo assim.
+
+        Sem a captura compartilhada, o mecanismo de palavra-chave abre o seu próprio stream.
+        """
+        self.on_subsystem_error("audio", message)
         self.initialize_wake_word_detection()
 
+    @Slot(str)
+    def on_subsystem_ready(self, name):
+        """Registra um subsistema pronto e, com STARTUP_PROFILE=1, exibe o perfil de inicialização."""
+        self.ready_subsystems.add(name)
+        startup_profile.mark(f"{name} pronto")
+        if self.ready_subsystems >= set(self.SUBSYSTEMS) and os.getenv('STARTUP_PROFILE') == '1':
+            print(startup_profile.report())
+
+    def on_subsystem_error(self, name, message):
+        """Exibe a falha na inicialização de um subsistema."""
+        self.add_message("Sistema", f"Falha ao inicializar {name}: {message}", self.BACKGROUND_SYSTEM)
+
     # Configuração da Interface do Usuário
     def setup_ui(self):
         """Configura todos os elementos da interface do usuário."""
@@ -67,15 +216,16 @@ class MainWindow(QMainWindow):
 
     def setup_chat_display(self, layout):
         """Configura a área de exibição do chat."""
-        self.chat_display = QTextEdit()
-        self.chat_display.setReadOnly(True)
+        self.chat_display = TranscriptView()
         self.chat_display.setFont(QFont("Arial", self.FONT_SIZE))
         self.chat_display.setStyleSheet("background-color: #393737;")
         layout.addWidget(self.chat_display)
+        # As atualizações do chat são aplicadas no máximo uma vez por quadro
+        self.render_scheduler = RenderScheduler(self.chat_display, parent=self)
 
     def setup_typing_label(self, layout):
         """Configura o label que indica que a IA está digitando."""
-        self.typing_label = QLabel("Gysin IA está digitando...")
+        self.typing_label = QLabel(self.TYPING_TEXT)
         self.typing_label.hide()
         layout.addWidget(self.typing_label)
 
@@ -109,62 +259,295 @@ class MainWindow(QMainWindow):
         """Conecta os sinais aos slots correspondentes."""
         self.send_button.clicked.connect(self.send_message)
         self.user_input.returnPressed.connect(self.send_message)
+        # O usuário começou a digitar: a conexão com a API é aberta enquanto ele escreve
+        self.user_input.textEdited.connect(self.warm_up_api)
         self.record_button.clicked.connect(self.send_audio_message)
 
     # Detecção de Palavra-Chave
     # Detecção de Palavra-Chave
     def initialize_wake_word_detection(self):
-        """Inicializa a detecção da palavra-chave em uma thread separada."""
+        """
+        Inicia o monitor de interrupção (requer a captura compartilhada) e a detecção da
+        palavra-chave em uma thread separada.
+        """
+        if self.audio_capture is not None and self.audio_capture.running:
+            from utils.barge_in import BargeInMonitor
+            self.barge_in_monitor = BargeInMonitor(
+                self.audio_capture, self.audio_player, self.barge_in_detected.emit, gate=self.echo_gate
+            )
+            self.barge_in_monitor.start()
         self.wake_word_thread = threading.Thread(target=self.run_wake_word_detection, daemon=True)
         self.wake_word_thread.start()
-        self.wake_word_detected.connect(self.on_wake_word_detected)
 
     def run_wake_word_detection(self):
-        """Executa a detecção de palavra-chave continuamente."""
+        """Executa a detecção de palavra-chave continuamente (mecanismo definido em WAKE_WORD_BACKEND)."""
+        from utils.wake_word import get_wake_word_detector
+        try:
+            detect_wake_word = get_wake_word_detector()
+        except Exception as e:
+            print(f"Detecção de palavra-chave indisponível: {e}")
+            self.subsystem_failed.emit("wake_word", str(e))
+            return
+        self.subsystem_ready.emit("wake_word")
+        # A supressão de eco impede que a voz do próprio assistente acione a palavra-chave
+        capture = self.audio_capture
+        subscription = (capture.subscribe(frame_filter=self.echo_gate)
+                        if capture is not None and capture.running else None)
+        failures = 0
         while True:
-            if detect_wake_word():
-                self.wake_word_detected.emit()
+            try:
+                if detect_wake_word(subscription):
+                    failures = 0
+                    self.wake_word_detected.emit()
+                    continue
+                if subscription is not None and subscription.closed:
+                    break
+                # Os mecanismos que não levantam a exceção retornam False em caso de erro
+                error = "a detecção terminou sem resultado"
+            except Exception as e:
+                error = str(e)
+            failures += 1
+            if failures >= self.WAKE_WORD_MAX_FAILURES:
+                self.subsystem_failed.emit("wake_word", f"{error} (detecção desativada)")
+                break
+            delay = min(self.WAKE_WORD_RETRY_SECONDS * 2 ** (failures - 1), self.WAKE_WORD_MAX_RETRY_SECONDS)
+            print(f"Erro na detecção da palavra-chave: {error}. Nova tentativa em {delay:.0f} s.")
+            time.sleep(delay)
+        if subscription is not None and not subscription.closed:
+            subscription.close()
 
     @Slot()
     def on_wake_word_detected(self):
         """Manipula a detecção da palavra-chave."""
+        if self._recording:
+            return
+        telemetry.count("turns_total", trigger="wake_word")
+        # Interrompe a resposta em andamento e grava imediatamente, a partir da pré-gravação;
+        # o som de ativação começa antes, para a supressão de eco da gravação já o considerar
+        self.stop_speech()
+        self.cancel_response()
         self.play_activation_sound()
-        QTimer.singleShot(500, self.send_audio_message)
+        self.start_recording(self.RECORDING_PREROLL_MS)
+
+    @Slot()
+    def on_barge_in(self):
+        """Interrompe a fala do assistente quando o usuário começa a falar e grava a sua fala."""
+        if self._recording:
+            return
+        telemetry.count("turns_total", trigger="barge_in")
+        self.stop_speech()
+        self.cancel_response()
+        self.start_recording(self.BARGE_IN_PREROLL_MS)
+
+    # Execução em Segundo Plano
+    def start_worker(self, fn, *args, on_result=None, on_error=None, on_finished=None, on_partial=None, **kwargs):
+        """
+        Executa uma função bloqueante no pool de threads.
+
+        O progresso reportado pela função é exibido no label de status, e os
+        callbacks são chamados na thread da interface. Quando ``on_partial`` é
+        informado, a função recebe também ``partial_callback``.
+        """
+        if on_partial is not None:
+            worker = StreamingWorker(fn, *args, **kwargs)
+            worker.signals.partial.connect(on_partial)
+        else:
+            worker = Worker(fn, *args, **kwargs)
+        worker.signals.progress.connect(self.show_progress)
+        if on_result is not None:
+            worker.signals.result.connect(on_result)
+        worker.signals.error.connect(on_error if on_error is not None else self.on_worker_error)
+        if on_finished is not None:
+            worker.signals.finished.connect(on_finished)
+        # Mantém a referência Python até o fim da execução
+        self._active_workers.add(worker)
+        worker.signals.finished.connect(lambda: self._active_workers.discard(worker))
+        self.thread_pool.start(worker)
+        return worker
+
+    @Slot(str)
+    def show_progress(self, text):
+        """Exibe a etapa atual do processamento no label de status."""
+        self.typing_label.setText(text)
+        self.typing_label.show()
+
+    @Slot(str)
+    def on_worker_error(self, message):
+        """Exibe um erro ocorrido em uma tarefa em segundo plano."""
+        self.add_message("Sistema", f"Erro: {message}", self.BACKGROUND_SYSTEM)
 
     # Funcionalidades de Áudio
     def play_activation_sound(self):
-        """Reproduz um som de ativação pré-gravado com volume ajustado para 10%."""
-        audio_file = "resources/audios/activation_sound.mp3"
-        if os.path.exists(audio_file):
-            player = vlc.MediaPlayer(audio_file)
-            
-            # Ajusta o volume para 10%
-            player.audio_set_volume(80)
-            
-            player.play()
-            print("Áudio de ativação reproduzido com volume ajustado para 50%.")
-        else:
-            print("Arquivo de áudio de ativação não encontrado.")
+        """Reproduz o som de ativação pré-carregado, sem bloquear."""
+        if self.playback_engine is None:
+            return
+        try:
+            if self.playback_engine.play_cue("activation", volume=self.ACTIVATION_VOLUME) is None:
+                print("Som de ativação indisponível.")
+        except Exception as e:
+            # Sem dispositivo de saída, a gravação continua sem o som
+            print(f"Erro ao reproduzir o som de ativação: {e}")
+
+    @Slot()
+    def warm_up_api(self):
+        """Abre a conexão com a API antes da próxima chamada (sem efeito se ela já está aberta)."""
+        client_registry.warm_up()
 
     @Slot()
     def send_audio_message(self):
         """Grava e envia uma mensagem de áudio do usuário."""
+        self.start_recording()
+
+    def start_recording(self, preroll_ms=0):
+        """
+        Inicia a gravação e a transcrição em segundo plano.
+
+        Com a captura compartilhada ativa, a assinatura é criada aqui, no instante do
+        acionamento, e começa ``preroll_ms`` milissegundos antes dele. Como nos detectores,
+        a supressão de eco impede que o som de ativação chegue à transcrição e ao detector
+        de fim de fala.
+        """
+        if self._recording:
+            return
+        self._recording = True
+        self.record_button.setEnabled(False)
+        # A conexão com a API é aberta enquanto o usuário fala
+        self.warm_up_api()
+
+        # O idioma do turno anterior orienta a transcrição
+        language_code = self.get_language_code(language_identifier.last_language)
+
+        capture = self.audio_capture
+        subscription = (capture.subscribe(preroll_ms, frame_filter=self.echo_gate)
+                        if capture is not None and capture.running else None)
+        self.start_worker(
+            self.record_and_transcribe, language_code, subscription,
+            on_partial=self.on_transcription_partial,
+            on_result=self.on_transcription_ready,
+            on_error=self.on_transcription_error,
+            on_finished=self.on_recording_finished
+        )
+
+    def record_and_transcribe(self, language_code, subscription, progress_callback, partial_callback):
+        """
+        Grava o áudio do microfone e o transcreve (executa em segundo plano).
+
+        Os mecanismos de transcrição são escolhidos pelo idioma e por STT_BACKEND. Com um
+        mecanismo em streaming, as hipóteses parciais são enviadas por ``partial_callback``
+        durante a gravação, e o seu texto final serve de alternativa se a API falhar.
+        Sem streaming, o áudio é dividido nas pausas e cada trecho é transcrito assim
+        que fecha (desative com STT_SEGMENTED=0).
+        """
+        from api.stt_backends import select_backends, Transcript
+        from api.segmented_stt import SegmentedTranscriber
+        from api.call_policy import APICallError
+        from utils.audio_utils import record_audio, RECORD_SAMPLE_RATE
+
+        final_backend, live_backend = select_backends(language_code)
+        sample_rate = subscription.sample_rate if subscription is not None else RECORD_SAMPLE_RATE
+        live_stream = None
+        if live_backend is not None:
+            try:
+                live_stream = live_backend.create_stream(language_code, sample_rate)
+            except Exception as e:
+                print(f"Transcrição local indisponível: {e}")
+        segmented = None
+        if not final_backend.streaming and os.getenv('STT_SEGMENTED', '1') != '0':
+            segmented = SegmentedTranscriber(lambda segment: final_backend.transcribe(segment, language_code),
+                                             sample_rate)
+
+        def on_chunk(samples):
+            if segmented is not None:
+                segmented.feed(samples)
+            if live_stream is not None:
+                hypothesis = live_stream.feed(samples)
+                if hypothesis:
+                    partial_callback(hypothesis)
+
+        progress_callback("Gravando...")
+        try:
+            audio = record_audio(max_duration=self.MAX_RECORDING_SECONDS, subscription=subscription,
+                                 on_chunk=on_chunk if live_stream or segmented else None)
+        except Exception:
+            if segmented is not None:
+                segmented.cancel()
+            raise
+        finally:
+            if subscription is not None:
+                subscription.close()
+        if not audio:
+            if segmented is not None:
+                segmented.cancel()
+            raise ValueError("Nenhuma fala detectada.")
+
+        local_text = Transcript(live_stream.finish(), language_code) if live_stream is not None else ""
+        if final_backend is live_backend and live_stream is not None:
+            return local_text
+        progress_callback("Transcrevendo...")
+        try:
+            # Espera pelo texto depois do fim da fala
+            with telemetry.span("turn.transcribe", backend=final_backend.name, segmented=segmented is not None):
+                if segmented is not None:
+                    return segmented.finish() or local_text
+                return final_backend.transcribe(audio, language_code) or local_text
+        except APICallError as e:
+            # API indisponível (prazo esgotado ou disjuntor aberto): usa a transcrição local
+            if local_text:
+                return local_text
+            return self.transcribe_locally(audio, language_code, final_backend, e)
+
+    def transcribe_locally(self, audio, language_code, failed_backend, error):
+        """
+        Transcreve o áudio gravado com o Vosk quando a transcrição pela API falha.
+
+        Args:
+            audio (AudioBuffer): Áudio gravado.
+            language_code (str): Código do idioma.
+            failed_backend (STTBackend): Mecanismo que falhou.
+            error (APICallError): Falha da API, levantada novamente se não houver alternativa.
+
+        Returns:
+            Transcript: Texto transcrito localmente.
+        """
+        from api.stt_backends import get_backend
+
+        local_backend = get_backend("vosk")
+        if failed_backend is local_backend or not local_backend.supports(language_code):
+            raise error
+        print(f"{error} Usando a transcrição local.")
         try:
-            audio_filename = "user_audio.wav"
-            record_audio(audio_filename)
-            
-            last_message = self.chat_display.toPlainText().split('\n')[-1]
-            detected_language = detect_language(last_message)
-            language_code = self.get_language_code(detected_language)
-            
-            user_text = openai_transcribe_audio(audio_filename, language=language_code)
-            if user_text:
-                self.add_message("Você", user_text, self.BACKGROUND_USER)
-                self.get_ai_response(user_text)
-            else:
-                raise ValueError("Transcrição vazia.")
+            return local_backend.transcribe(audio, language_code)
         except Exception as e:
-            self.add_message("Sistema", f"Erro durante a transcrição de áudio: {str(e)}", self.BACKGROUND_SYSTEM)
+            print(f"Transcrição local indisponível: {e}")
+            raise error
+
+    @Slot(object)
+    def on_transcription_partial(self, hypothesis):
+        """Exibe a transcrição parcial enquanto o usuário fala."""
+        self.show_progress(f"Ouvindo: {hypothesis}")
+
+    @Slot(object)
+    def on_transcription_ready(self, user_text):
+        """Exibe a transcrição e solicita a resposta da IA."""
+        if user_text:
+            self.add_message("Você", user_text, self.BACKGROUND_USER)
+            # O idioma informado pela transcrição é uma dica confiável
+            language = language_identifier.detect(user_text, hint=getattr(user_text, "language", None))
+            self.request_ai_response(str(user_text), language)
+        else:
+            self.on_transcription_error("Transcrição vazia.")
+
+    @Slot(str)
+    def on_transcription_error(self, message):
+        """Exibe um erro ocorrido durante a gravação ou a transcrição."""
+        self.typing_label.hide()
+        self.add_message("Sistema", f"Erro durante a transcrição de áudio: {message}", self.BACKGROUND_SYSTEM)
+
+    @Slot()
+    def on_recording_finished(self):
+        """Libera o botão de gravação após o fim da gravação."""
+        self._recording = False
+        self.record_button.setEnabled(True)
 
     # Processamento de Mensagens
     @Slot()
@@ -176,29 +559,121 @@ class MainWindow(QMainWindow):
 
         self.add_message("Você", user_text, self.BACKGROUND_USER)
         self.user_input.clear()
+        self.request_ai_response(user_text, language_identifier.detect(user_text))
+
+    def request_ai_response(self, user_text, language=None):
+        """
+        Bloqueia a entrada e solicita a resposta da IA em segundo plano.
+
+        O idioma da mensagem é registrado como dica para o próximo turno.
+        """
+        language_identifier.remember(language)
+        language_code = self.get_language_code(language)
         self.user_input.setEnabled(False)
         self.send_button.setEnabled(False)
-        self.typing_label.show()
+        self.show_progress(self.TYPING_TEXT)
         QApplication.setOverrideCursor(Qt.WaitCursor)
 
-        QTimer.singleShot(100, lambda: self.get_ai_response(user_text))
-
-    def get_ai_response(self, user_text):
-        """Obtém a resposta da IA e a exibe."""
+        self.stop_speech()
+        self.cancel_response()
+        turn = self._response_turn
+        cancel = self._response_cancel = threading.Event()
+        # Sem o áudio inicializado, a resposta é apenas exibida
+        speak = self.audio_response_checkbox.isChecked() and self.audio_player is not None
+        self.start_worker(
+            self.get_ai_response, user_text, language_code, speak, cancel,
+            on_partial=lambda delta: self.on_ai_delta(delta, turn),
+            on_result=lambda result: self.on_ai_response(result, turn),
+            on_finished=lambda: self.on_ai_finished(turn)
+        )
+
+    def cancel_response(self):
+        """
+        Abandona a resposta em andamento, se houver.
+
+        O worker encerra o stream no próximo trecho, e os trechos e o resultado que
+        ainda chegarem dele são ignorados (o turno interrompido não entra no histórico).
+        """
+        if self._response_cancel is not None:
+            self._response_cancel.set()
+            self._response_cancel = None
+        self._response_turn += 1
+        self._streaming_message = None
+
+    def get_ai_response(self, user_text, language_code, speak, cancel, progress_callback, partial_callback):
+        """
+        Obtém a resposta da IA em streaming (executa em segundo plano).
+
+        Cada trecho recebido é repassado à interface por ``partial_callback`` e, se
+        ``speak`` for verdadeiro, ao pipeline de voz, que começa a falar a partir da
+        primeira frase completa, no idioma da mensagem do usuário. Quando ``cancel``
+        (threading.Event) é acionado, o stream é encerrado sem repassar mais trechos.
+        """
+        span = telemetry.span("turn.response", language=language_code, speak=speak)
+        pipeline = None
+        if speak:
+            first_audio = threading.Event()
+
+            def on_first_audio():
+                if not first_audio.is_set():
+                    first_audio.set()
+                    telemetry.observe("ttfa_ms", span.elapsed_ms())
+
+            pipeline = self.start_speech(language_code, on_first_audio=on_first_audio)
+
+        parts = []
+        stream = self.openai_client.stream_response(user_text)
         try:
-            response = self.openai_client.get_response(user_text)
-            self.add_message("Gysin IA", response, self.BACKGROUND_AI)
-            
-            detected_language = detect_language(response)
-            language_code = self.get_language_code(detected_language)
-            
-            if self.audio_response_checkbox.isChecked():
-                self.generate_and_play_audio(response, language_code)
-                
+            for delta in stream:
+                if cancel.is_set():
+                    break
+                if not parts:
+                    telemetry.observe("ttft_ms", span.elapsed_ms())
+                parts.append(delta)
+                partial_callback(delta)
+                if pipeline is not None:
+                    pipeline.feed(delta)
         except Exception as e:
-            self.add_message("Sistema", f"Erro: {str(e)}", self.BACKGROUND_SYSTEM)
+            if cancel.is_set():
+                # Turno interrompido: o erro não é mais exibido
+                return "", language_code
+            print(f"Erro ao gerar texto com a API OpenAI: {e}")
+            if parts:
+                raise
+            parts = [self.openai_client.ERROR_MESSAGE]
+            partial_callback(parts[0])
+            if pipeline is not None:
+                pipeline.feed(parts[0])
         finally:
-            self.reset_ui_state()
+            # Encerra a requisição se o turno foi interrompido antes do fim
+            stream.close()
+            if pipeline is not None:
+                pipeline.close()
+            span.end(chunks=len(parts), cancelled=cancel.is_set())
+
+        response = "".join(parts).strip()
+        return response, language_code
+
+    def on_ai_delta(self, delta, turn):
+        """Renderiza um trecho da resposta da IA assim que ele chega (se o turno ainda é o atual)."""
+        if turn != self._response_turn:
+            return
+        if self._streaming_message is None:
+            self.typing_label.hide()
+            self._streaming_message = self.begin_streaming_message("Gysin IA", self.BACKGROUND_AI)
+        self.append_to_streaming_message(self._streaming_message, delta)
+
+    def on_ai_response(self, result, turn):
+        """
+        Finaliza o turno: exibe a resposta completa se nenhum trecho chegou em streaming
+        e encerra o balão em streaming. A fala já foi iniciada por ``get_ai_response``.
+        """
+        if turn != self._response_turn:
+            return
+        response, language_code = result
+        if self._streaming_message is None:
+            self.add_message("Gysin IA", response, self.BACKGROUND_AI)
+        self._streaming_message = None
 
     # Utilitários
     def get_language_code(self, detected_language):
@@ -206,34 +681,78 @@ class MainWindow(QMainWindow):
         language_map = {'pt': 'pt', 'en': 'en', 'de': 'de', 'es': 'es'}
         return language_map.get(detected_language, 'pt')
 
-    def generate_and_play_audio(self, text, language_code):
-        """Gera e reproduz o áudio da resposta."""
-        audio_file = "response_audio.mp3"
-        text_to_speech(text, audio_file, language_code=language_code)
-        self.play_audio(audio_file)
+    def start_speech(self, language_code, on_first_audio=None):
+        """
+        Cria o pipeline de voz de uma nova resposta.
+
+        Os trechos são sintetizados em PCM e reproduzidos em sequência pelo
+        reprodutor compartilhado da janela, a partir do primeiro bloco recebido.
+        ``on_first_audio`` é chamado quando o primeiro bloco de cada trecho chega ao reprodutor.
+        """
+        from api.openai_tts import stream_speech
+        from api.tts_pipeline import SpeechPipeline
+        play = self.audio_player.play_stream
+        if on_first_audio is not None:
+            play = lambda chunks: self.audio_player.play_stream(notify_first(chunks, on_first_audio))
+        pipeline = SpeechPipeline(
+            synthesize=lambda segment: stream_speech(segment, language_code=language_code),
+            play=play
+        )
+        self._speech_pipeline = pipeline
+        return pipeline
+
+    def stop_speech(self):
+        """Interrompe a fala da resposta anterior, se houver."""
+        if self._speech_pipeline is not None:
+            self._speech_pipeline.cancel()
+            self._speech_pipeline = None
+        if self.audio_player is not None:
+            self.audio_player.stop()
+
+    def on_ai_finished(self, turn):
+        """Libera a entrada ao fim do turno atual (ou de um turno interrompido sem sucessor)."""
+        # Cada pedido empilhou um cursor de espera: todo turno desfaz o seu, mesmo interrompido
+        QApplication.restoreOverrideCursor()
+        if turn == self._response_turn:
+            self._response_cancel = None
+        if self._response_cancel is None:
+            self.reset_ui_state()
 
+    @Slot()
     def reset_ui_state(self):
         """Reseta o estado da UI após processar a resposta."""
         self.user_input.setEnabled(True)
         self.send_button.setEnabled(True)
         self.typing_label.hide()
-        QApplication.restoreOverrideCursor()
+        self.typing_label.setText(self.TYPING_TEXT)
 
     def add_message(self, sender, message, background_color):
-        """Adiciona uma mensagem à área de chat."""
-        self.chat_display.append(f'<div style="background-color: {background_color}; padding: 5px; margin: 5px 0;">'
-                                 f'<b>{sender}:</b> {message}</div>')
-        self.chat_display.moveCursor(QTextCursor.End)
-        self.chat_display.ensureCursorVisible()
+        """Adiciona uma mensagem à área de chat e retorna o seu índice no histórico."""
+        return self.render_scheduler.append(sender, message, background_color)
+
+    def begin_streaming_message(self, sender, background_color):
+        """Cria o balão de uma mensagem cujo texto chegará aos poucos e retorna o seu índice."""
+        return self.add_message(sender, "", background_color)
+
+    def append_to_streaming_message(self, message_index, text):
+        """Acrescenta texto ao final do balão em streaming de índice ``message_index``."""
+        self.render_scheduler.append_to(message_index, text)
 
     def closeEvent(self, event):
         """Manipula o evento de fechamento da janela."""
-        event.accept()
-
-    def play_audio(self, audio_file):
-        """Reproduz um arquivo de áudio."""
-        try:
-            player = vlc.MediaPlayer(audio_file)
-            player.play()
-        except Exception as e:
-            self.add_message("Erro", f"Erro ao reproduzir áudio: {str(e)}", self.BACKGROUND_SYSTEM)
\ No newline at end of file
+        self.stop_speech()
+        if self.audio_player is not None:
+            self.audio_player.close()
+        if self.playback_engine is not None:
+            self.playback_engine.close()
+        if self.barge_in_monitor is not None:
+            self.barge_in_monitor.stop()
+        if self.audio_capture is not None:
+            self.audio_capture.stop()
+        if self._openai_client is not None:
+            self._openai_client.close()
+        client_registry.close()
+        shutdown_exporters()
+        self.render_scheduler.flush()
+        self.chat_display.close_transcript()
+        event.accept()
\ No newline at end of file
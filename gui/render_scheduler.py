@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: render_scheduler
+
+Este módulo implementa o agendador de atualizações do chat. Em vez de alterar a
+visão a cada chamada, as mensagens novas e os trechos das respostas em streaming são
+acumulados e aplicados no máximo uma vez por quadro (16 ms): trechos consecutivos do
+mesmo balão são unidos, mensagens consecutivas entram em uma única inserção e a
+rolagem até o fim é feita uma vez por aplicação. O agendador registra quantas
+atualizações foram agrupadas em cada quadro.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 20:50 (horário de Zurique)
+"""
+
+from collections import deque
+from PySide6.QtCore import QObject, QTimer, Slot
+from gui.transcript import ChatMessage
+
+# Intervalo mínimo entre duas aplicações (um quadro a 60 Hz)
+FRAME_INTERVAL_MS = 16
+# Quadros mantidos no histórico de estatísticas
+STATS_HISTORY = 1000
+
+
+class RenderScheduler(QObject):
+    """
+    Agrupa as atualizações do chat e as aplica uma vez por quadro.
+    """
+
+    def __init__(self, view, interval_ms=FRAME_INTERVAL_MS, parent=None):
+        """
+        Inicializa o agendador.
+
+        Args:
+            view (TranscriptView): Visão do chat atualizada pelo agendador.
+            interval_ms (int, optional): Intervalo entre aplicações. Padrão é 16.
+            parent (QObject, optional): Objeto pai.
+        """
+        super().__init__(parent)
+        self.view = view
+        # A rolagem passa a ser feita pelo agendador, uma vez por quadro
+        self.view.auto_scroll = False
+        self._pending = []  # Mensagens novas (ChatMessage) e trechos ([índice, texto]) de balões exibidos
+        self._queued = {}  # Mensagens novas ainda não exibidas, por índice no histórico
+        self._pending_updates = 0
+        self.frames = 0
+        self.updates = 0
+        self.frame_updates = deque(maxlen=STATS_HISTORY)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def pending(self):
+        """Indica se há atualizações aguardando o próximo quadro."""
+        return bool(self._pending)
+
+    def append(self, sender, text, background=None):
+        """
+        Agenda uma nova mensagem.
+
+        Args:
+            sender (str): Remetente.
+            text (str): Texto da mensagem.
+            background (str, optional): Cor de fundo do balão.
+
+        Returns:
+            int: Índice que a mensagem terá no histórico (identifica o balão em ``append_to``).
+        """
+        message = ChatMessage(sender, text, background)
+        index = len(self.view.transcript.store) + len(self._queued)
+        self._queued[index] = message
+        self._pending.append(message)
+        self._schedule()
+        return index
+
+    def append_to(self, index, text):
+        """
+        Agenda texto para o fim de um balão (respostas em streaming).
+
+        Args:
+            index (int): Índice da mensagem, retornado por ``append``.
+            text (str): Trecho a ser acrescentado.
+        """
+        if not text:
+            return
+        message = self._queued.get(index)
+        if message is not None:
+            # O balão ainda não foi exibido: o trecho entra no próprio texto
+            message.text += text
+        elif self._pending and isinstance(self._pending[-1], list) and self._pending[-1][0] == index:
+            self._pending[-1][1] += text
+        else:
+            self._pending.append([index, text])
+        self._schedule()
+
+    def append_to_last(self, text):
+        """
+        Agenda texto para o fim do último balão.
+
+        Args:
+            text (str): Trecho a ser acrescentado.
+        """
+        self.append_to(len(self.view.transcript.store) + len(self._queued) - 1, text)
+
+    @Slot()
+    def flush(self):
+        """Aplica as atualizações pendentes ao modelo e rola até o fim uma única vez."""
+        self._timer.stop()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._queued = {}
+        model = self.view.transcript
+        messages = []
+        for item in pending:
+            if isinstance(item, ChatMessage):
+                messages.append(item)
+                continue
+            model.append_messages(messages)
+            messages = []
+            model.append_to(*item)
+        model.append_messages(messages)
+        self.view.scroll_to_end()
+
+        self.frames += 1
+        self.frame_updates.append(self._pending_updates)
+        self._pending_updates = 0
+
+    def stats(self):
+        """
+        Retorna as estatísticas de agrupamento.
+
+        Returns:
+            dict: Quadros aplicados, atualizações recebidas, atualizações evitadas pelo
+            agrupamento e média e máximo de atualizações por quadro (nos últimos quadros).
+        """
+        recent = list(self.frame_updates)
+        return {
+            "frames": self.frames,
+            "updates": self.updates,
+            "coalesced": self.updates - self._pending_updates - self.frames,
+            "mean_per_frame": sum(recent) / len(recent) if recent else 0.0,
+            "max_per_frame": max(recent, default=0),
+        }
+
+    def _schedule(self):
+        """Conta a atualização e agenda a aplicação no próximo quadro."""
+        self.updates += 1
+        self._pending_updates += 1
+        if not self._timer.isActive():
+            self._timer.start()
@@ -0,0 +1,458 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: transcript
+
+Este módulo implementa o histórico do chat em modelo/visão, para sessões que duram
+dias. As mensagens ficam em um armazenamento com uma janela limitada em memória; as
+mais antigas são gravadas em páginas JSONL no disco e lidas sob demanda. O modelo
+expõe apenas as últimas linhas (as anteriores são carregadas ao rolar até o topo), e
+a visão desenha e mede somente as linhas visíveis, com alturas em cache. Acrescentar
+uma mensagem custa O(1), independentemente do tamanho do histórico.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 20:15 (horário de Zurique)
+"""
+
+import os
+import json
+import shutil
+import tempfile
+from collections import OrderedDict
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QTimer
+from PySide6.QtGui import QColor, QFont, QFontMetrics
+from PySide6.QtWidgets import QAbstractItemView, QListView, QStyledItemDelegate
+
+# Mensagens mantidas em memória antes de gravar as mais antigas no disco
+MEMORY_MESSAGES = int(os.getenv('TRANSCRIPT_MEMORY_MESSAGES', '1000'))
+# Mensagens por página gravada no disco
+PAGE_SIZE = 200
+# Páginas lidas do disco mantidas em cache
+CACHED_PAGES = 4
+# Linhas exibidas pelo modelo enquanto a visão acompanha o fim do chat
+MAX_ROWS = 300
+
+
+class ChatMessage:
+    """
+    Mensagem do chat: remetente, texto e cor de fundo do balão.
+    """
+
+    __slots__ = ("sender", "text", "background")
+
+    def __init__(self, sender, text, background=None):
+        self.sender = sender
+        self.text = text
+        self.background = background
+
+    def to_dict(self):
+        return {"sender": self.sender, "text": self.text, "background": self.background}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["sender"], data["text"], data.get("background"))
+
+
+class TranscriptStore:
+    """
+    Armazenamento das mensagens com janela limitada em memória e páginas no disco.
+
+    As mensagens são indexadas em ordem de chegada. Quando a memória passa de
+    ``memory_size + page_size`` mensagens, as ``page_size`` mais antigas são gravadas
+    em uma página no disco; as páginas lidas de volta ficam em um cache LRU pequeno.
+    """
+
+    def __init__(self, memory_size=MEMORY_MESSAGES, page_size=PAGE_SIZE, directory=None,
+                 cached_pages=CACHED_PAGES):
+        """
+        Inicializa o armazenamento.
+
+        Args:
+            memory_size (int, optional): Mensagens mantidas em memória. Padrão é 1000
+                (variável TRANSCRIPT_MEMORY_MESSAGES).
+            page_size (int, optional): Mensagens por página no disco. Padrão é 200.
+            directory (str, optional): Pasta das páginas; padrão é uma pasta temporária,
+                removida por ``close``.
+            cached_pages (int, optional): Páginas lidas mantidas em cache. Padrão é 4.
+        """
+        self.memory_size = memory_size
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self._own_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="gysin_transcript_")
+        os.makedirs(self.directory, exist_ok=True)
+        self._memory = []
+        self._offset = 0  # Índice da primeira mensagem em memória (= mensagens no disco)
+        self._page_cache = OrderedDict()
+
+    def __len__(self):
+        return self._offset + len(self._memory)
+
+    @property
+    def spilled(self):
+        """Número de mensagens gravadas no disco."""
+        return self._offset
+
+    def append(self, message):
+        """
+        Acrescenta uma mensagem.
+
+        Args:
+            message (ChatMessage): Mensagem a ser acrescentada.
+
+        Returns:
+            int: Índice da mensagem.
+        """
+        self._memory.append(message)
+        if len(self._memory) >= self.memory_size + self.page_size:
+            self._spill()
+        return len(self) - 1
+
+    def last(self):
+        """Retorna a última mensagem (sempre em memória), ou None."""
+        return self._memory[-1] if self._memory else None
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index >= self._offset:
+            return self._memory[index - self._offset]
+        return self._load_page(index // self.page_size)[index % self.page_size]
+
+    def clear(self):
+        """Remove todas as mensagens, inclusive as páginas no disco."""
+        for number in range(self._offset // self.page_size):
+            try:
+                os.remove(self._page_path(number))
+            except OSError:
+                pass
+        self._memory = []
+        self._offset = 0
+        self._page_cache.clear()
+
+    def close(self):
+        """Remove as páginas no disco (e a pasta temporária, se foi criada aqui)."""
+        self.clear()
+        if self._own_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _page_path(self, number):
+        return os.path.join(self.directory, f"page-{number:06d}.jsonl")
+
+    def _spill(self):
+        """Grava as mensagens mais antigas da memória em uma nova página."""
+        page = self._memory[:self.page_size]
+        with open(self._page_path(self._offset // self.page_size), "w", encoding="utf-8") as file:
+            for message in page:
+                file.write(json.dumps(message.to_dict(), ensure_ascii=False) + "\n")
+        del self._memory[:self.page_size]
+        self._offset += self.page_size
+
+    def _load_page(self, number):
+        """Lê uma página do disco (com cache LRU)."""
+        if number in self._page_cache:
+            self._page_cache.move_to_end(number)
+            return self._page_cache[number]
+        with open(self._page_path(number), encoding="utf-8") as file:
+            page = [ChatMessage.from_dict(json.loads(line)) for line in file]
+        self._page_cache[number] = page
+        if len(self._page_cache) > self.cached_pages:
+            self._page_cache.popitem(last=False)
+        return page
+
+
+class TranscriptModel(QAbstractListModel):
+    """
+    Modelo do histórico do chat.
+
+    Expõe as mensagens a partir de ``first_index`` até o fim do armazenamento. Enquanto
+    ``follow_tail`` é verdadeiro (a visão está no fim do chat), as linhas mais antigas
+    que ``max_rows`` deixam o modelo a cada nova mensagem; ``load_older`` as traz de
+    volta quando o usuário rola até o topo.
+    """
+
+    MessageRole = Qt.UserRole + 1
+    SenderRole = Qt.UserRole + 2
+    BackgroundRole = Qt.UserRole + 3
+
+    def __init__(self, store=None, max_rows=MAX_ROWS, parent=None):
+        """
+        Inicializa o modelo.
+
+        Args:
+            store (TranscriptStore, optional): Armazenamento; padrão é um novo TranscriptStore.
+            max_rows (int, optional): Linhas mantidas enquanto a visão acompanha o fim. Padrão é 300.
+            parent (QObject, optional): Objeto pai.
+        """
+        super().__init__(parent)
+        self.store = store if store is not None else TranscriptStore()
+        self.max_rows = max_rows
+        self.follow_tail = True
+        self.first_index = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.store) - self.first_index
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.message(index.row())
+        if role == Qt.DisplayRole:
+            return f"{message.sender}: {message.text}"
+        if role == self.MessageRole:
+            return message
+        if role == self.SenderRole:
+            return message.sender
+        if role == self.BackgroundRole:
+            return QColor(message.background) if message.background else None
+        return None
+
+    def message(self, row):
+        """Retorna a mensagem de uma linha do modelo."""
+        return self.store[self.first_index + row]
+
+    def absolute_index(self, row):
+        """Converte uma linha do modelo no índice da mensagem no armazenamento."""
+        return self.first_index + row
+
+    def append_message(self, sender, text, background=None):
+        """
+        Acrescenta uma mensagem ao fim do chat.
+
+        Args:
+            sender (str): Remetente.
+            text (str): Texto da mensagem.
+            background (str, optional): Cor de fundo do balão.
+
+        Returns:
+            int: Linha da mensagem no modelo.
+        """
+        return self.append_messages([ChatMessage(sender, text, background)])
+
+    def append_messages(self, messages):
+        """
+        Acrescenta várias mensagens ao fim do chat em uma única inserção.
+
+        Args:
+            messages (list[ChatMessage]): Mensagens, na ordem.
+
+        Returns:
+            int: Linha da última mensagem no modelo.
+        """
+        if messages:
+            row = self.rowCount()
+            self.beginInsertRows(QModelIndex(), row, row + len(messages) - 1)
+            for message in messages:
+                self.store.append(message)
+            self.endInsertRows()
+            if self.follow_tail:
+                self.trim()
+        return self.rowCount() - 1
+
+    def append_to(self, index, text):
+        """
+        Acrescenta texto a uma mensagem (respostas em streaming).
+
+        Args:
+            index (int): Índice da mensagem no armazenamento (estável, ao contrário da linha).
+            text (str): Trecho a ser acrescentado.
+        """
+        if not text or not 0 <= index < len(self.store):
+            return
+        self.store[index].text += text
+        row = index - self.first_index
+        if 0 <= row < self.rowCount():
+            model_index = self.index(row)
+            self.dataChanged.emit(model_index, model_index, [Qt.DisplayRole])
+
+    def append_to_last(self, text):
+        """Acrescenta texto à última mensagem."""
+        self.append_to(len(self.store) - 1, text)
+
+    def trim(self):
+        """Remove do modelo as linhas mais antigas que excedem ``max_rows``."""
+        excess = self.rowCount() - self.max_rows
+        if excess > 0:
+            self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+            self.first_index += excess
+            self.endRemoveRows()
+
+    def can_load_older(self):
+        """Indica se há mensagens anteriores à primeira linha."""
+        return self.first_index > 0
+
+    def load_older(self, count=PAGE_SIZE):
+        """
+        Traz de volta ao modelo mensagens anteriores à primeira linha.
+
+        Args:
+            count (int, optional): Número máximo de mensagens. Padrão é 200.
+
+        Returns:
+            int: Número de linhas inseridas no início.
+        """
+        count = min(count, self.first_index)
+        if count > 0:
+            self.beginInsertRows(QModelIndex(), 0, count - 1)
+            self.first_index -= count
+            self.endInsertRows()
+        return count
+
+    def clear(self):
+        """Remove todas as mensagens."""
+        self.beginResetModel()
+        self.store.clear()
+        self.first_index = 0
+        self.endResetModel()
+
+
+class MessageDelegate(QStyledItemDelegate):
+    """
+    Desenha uma mensagem como um balão: remetente em negrito e texto com quebra de linha.
+
+    As alturas são guardadas em cache por mensagem, largura e tamanho do texto; apenas
+    as linhas visíveis são medidas e desenhadas.
+    """
+
+    PADDING = 5
+    MARGIN = 5
+    CACHE_SIZE = 4096
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._size_cache = OrderedDict()
+
+    def _text_width(self, option):
+        view = self.parent()
+        width = view.viewport().width() if view is not None else option.rect.width()
+        return max(1, width - 2 * (self.PADDING + self.MARGIN))
+
+    def _layout(self, option, message, width):
+        """Calcula os retângulos do remetente e do texto para uma largura."""
+        bold = QFont(option.font)
+        bold.setBold(True)
+        sender_rect = QFontMetrics(bold).boundingRect(
+            QRect(0, 0, width, 100000), Qt.TextWordWrap, f"{message.sender}:")
+        text_rect = QFontMetrics(option.font).boundingRect(
+            QRect(0, 0, width, 100000), Qt.TextWordWrap, message.text) if message.text else QRect()
+        return bold, sender_rect, text_rect
+
+    def sizeHint(self, option, index):
+        message = index.data(TranscriptModel.MessageRole)
+        if message is None:
+            return super().sizeHint(option, index)
+        width = self._text_width(option)
+        key = (index.model().absolute_index(index.row()), width, len(message.text))
+        size = self._size_cache.get(key)
+        if size is None:
+            _, sender_rect, text_rect = self._layout(option, message, width)
+            height = sender_rect.height() + text_rect.height() + 2 * (self.PADDING + self.MARGIN)
+            size = QSize(width + 2 * (self.PADDING + self.MARGIN), height)
+            self._size_cache[key] = size
+            if len(self._size_cache) > self.CACHE_SIZE:
+                self._size_cache.popitem(last=False)
+        return size
+
+    def paint(self, painter, option, index):
+        message = index.data(TranscriptModel.MessageRole)
+        if message is None:
+            return super().paint(painter, option, index)
+        painter.save()
+        bubble = option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        background = QColor(message.background) if message.background else None
+        if background is not None:
+            painter.fillRect(bubble, background)
+        # Texto claro sobre fundos escuros
+        dark = (background or option.palette.base().color()).lightness() < 128
+        painter.setPen(QColor("white") if dark else QColor("black"))
+
+        width = bubble.width() - 2 * self.PADDING
+        bold, sender_rect, text_rect = self._layout(option, message, width)
+        x, y = bubble.left() + self.PADDING, bubble.top() + self.PADDING
+        painter.setFont(bold)
+        painter.drawText(QRect(x, y, width, sender_rect.height()), Qt.TextWordWrap, f"{message.sender}:")
+        if message.text:
+            painter.setFont(option.font)
+            painter.drawText(QRect(x, y + sender_rect.height(), width, text_rect.height()),
+                             Qt.TextWordWrap, message.text)
+        painter.restore()
+
+
+class TranscriptView(QListView):
+    """
+    Visão do histórico do chat.
+
+    Acompanha o fim do chat enquanto o usuário não rolar para cima; ao chegar ao topo,
+    carrega mensagens anteriores do armazenamento. A rolagem até o fim é feita uma vez
+    por iteração do laço de eventos, e não a cada mensagem, para que o layout das
+    linhas não seja refeito a cada acréscimo. Com ``auto_scroll`` falso, a rolagem fica
+    a cargo de quem atualiza o modelo (por exemplo, o RenderScheduler).
+    """
+
+    def __init__(self, model=None, parent=None):
+        """
+        Inicializa a visão.
+
+        Args:
+            model (TranscriptModel, optional): Modelo; padrão é um novo TranscriptModel.
+            parent (QWidget, optional): Widget pai.
+        """
+        super().__init__(parent)
+        self.transcript = model if model is not None else TranscriptModel(parent=self)
+        self.setModel(self.transcript)
+        self.setItemDelegate(MessageDelegate(self))
+        self.setUniformItemSizes(False)
+        self.setWordWrap(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.auto_scroll = True
+        self._scroll_pending = False
+
+        self.transcript.rowsInserted.connect(self._on_rows_inserted)
+        self.transcript.dataChanged.connect(self._on_data_changed)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+    def close_transcript(self):
+        """Remove as páginas do histórico gravadas no disco."""
+        self.transcript.store.close()
+
+    def _at_bottom(self):
+        scroll_bar = self.verticalScrollBar()
+        return scroll_bar.value() >= scroll_bar.maximum() - 4
+
+    def scroll_to_end(self):
+        """Rola até a última mensagem, se a visão estiver acompanhando o fim do chat."""
+        if self.transcript.follow_tail:
+            self.scrollToBottom()
+
+    def _schedule_scroll(self):
+        if self.auto_scroll and self.transcript.follow_tail and not self._scroll_pending:
+            self._scroll_pending = True
+            QTimer.singleShot(0, self._scroll_to_bottom)
+
+    def _scroll_to_bottom(self):
+        self._scroll_pending = False
+        self.scroll_to_end()
+
+    def _on_rows_inserted(self, parent, first, last):
+        if first > 0:
+            self._schedule_scroll()
+
+    def _on_data_changed(self, top_left, bottom_right, roles=()):
+        # A altura da mensagem em streaming mudou
+        self.itemDelegate().sizeHintChanged.emit(top_left)
+        self._schedule_scroll()
+
+    def _on_scrolled(self, value):
+        scroll_bar = self.verticalScrollBar()
+        self.transcript.follow_tail = self._at_bottom()
+        if value == scroll_bar.minimum() and scroll_bar.maximum() > 0 and self.transcript.can_load_older():
+            count = self.transcript.load_older()
+            # Mantém a mensagem que estava no topo no mesmo lugar
+            self.scrollTo(self.transcript.index(count), QAbstractItemView.PositionAtTop)
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: workers
+
+Este módulo implementa a camada de execução em segundo plano da aplicação Gysin IA.
+As etapas bloqueantes do fluxo (gravação, transcrição, resposta da IA, síntese e
+reprodução de voz) rodam no QThreadPool e comunicam progresso, resultado e erros
+à interface por meio de sinais Qt, mantendo o loop de eventos sempre livre.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 10:05 (horário de Zurique)
+"""
+
+import logging
+import traceback
+from PySide6.QtCore import QObject, QRunnable, Signal, Slot
+
+
+class WorkerSignals(QObject):
+    """
+    Sinais emitidos por um Worker durante a execução.
+
+    Os sinais são entregues na thread da interface (conexão enfileirada), portanto
+    os slots conectados podem manipular widgets com segurança.
+    """
+
+    started = Signal()
+    progress = Signal(str)
+    partial = Signal(object)
+    result = Signal(object)
+    error = Signal(str)
+    finished = Signal()
+
+
+class Worker(QRunnable):
+    """
+    Executa uma função bloqueante em uma thread do QThreadPool.
+
+    A função recebe o argumento nomeado ``progress_callback``, que pode ser chamado
+    com um texto para informar a etapa atual à interface.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        """
+        Inicializa o worker.
+
+        Args:
+            fn (callable): Função a ser executada em segundo plano.
+            *args: Argumentos posicionais repassados para a função.
+            **kwargs: Argumentos nomeados repassados para a função.
+        """
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self.kwargs['progress_callback'] = self.signals.progress.emit
+
+    @Slot()
+    def run(self):
+        """Executa a função e emite os sinais de resultado, erro e finalização."""
+        self.signals.started.emit()
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            logging.error(f"Erro na tarefa em segundo plano: {e}. {traceback.format_exc()}")
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
+
+
+class StreamingWorker(Worker):
+    """
+    Worker para funções que produzem resultados parciais.
+
+    Além de ``progress_callback``, a função recebe ``partial_callback``, que entrega
+    cada resultado parcial (por exemplo, um trecho de texto) pelo sinal ``partial``.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__(fn, *args, **kwargs)
+        self.kwargs['partial_callback'] = self.signals.partial.emit
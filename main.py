@@ -1,9 +1,14 @@
+from utils.startup_profile import startup_profile
+from utils.env import load_environment
 from PySide6.QtWidgets import QApplication
 from gui.main_window import MainWindow
 import sys
 
 if __name__ == "__main__":
+    load_environment()
+    startup_profile.mark("importações")
     app = QApplication(sys.argv)
     window = MainWindow()
+    startup_profile.mark("janela criada")
     window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
@@ -0,0 +1,15 @@
+# tests/conftest.py
+
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Os áudios sintetizados nos testes não entram no cache do usuário
+os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="gysin_ia_tts_"))
+
+from tests.openai_stub import start_shared_stub
+
+# Todas as chamadas à API passam pelo servidor local (tests/openai_stub.py)
+start_shared_stub()
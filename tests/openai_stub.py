@@ -0,0 +1,502 @@
+# tests/openai_stub.py
+"""
+Módulo: openai_stub
+
+Este módulo implementa um servidor HTTP local compatível com o subconjunto da API
+OpenAI usado pelo projeto: chat (com e sem streaming), transcrição, síntese de voz,
+geração de imagens e embeddings. As respostas são determinísticas; a latência de cada
+endpoint segue uma distribuição configurável, o chat e a síntese são entregues em
+ritmo controlado (tokens e bytes por segundo) e erros HTTP podem ser injetados, um a
+um ou por taxa. Os testes e benchmarks usam o servidor pelo cliente compartilhado
+(api.client_registry), sem acesso à rede.
+
+Uso manual: ``python -m tests.openai_stub --port 8765`` e OPENAI_BASE_URL com a URL exibida.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 23:10 (horário de Zurique)
+"""
+
+import io
+import os
+import re
+import json
+import math
+import time
+import wave
+import zlib
+import random
+import struct
+import argparse
+import threading
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Formato "pcm" da API de síntese: 24 kHz, 16 bits, mono
+SPEECH_SAMPLE_RATE = 24000
+# Duração do áudio sintetizado por caractere do texto
+SPEECH_SECONDS_PER_CHAR = 0.06
+# Tamanho dos blocos enviados nas respostas em ritmo controlado
+SPEECH_CHUNK_SIZE = 4800
+EMBEDDING_DIM = 1536
+DEFAULT_TRANSCRIPT = "Olá, este é um teste de transcrição."
+
+# ISO-639-1 -> nome do idioma no verbose_json do Whisper
+LANGUAGE_NAMES = {"pt": "portuguese", "en": "english", "de": "german", "es": "spanish",
+                  "fr": "french", "it": "italian"}
+
+ENDPOINTS = {
+    "/v1/chat/completions": "chat",
+    "/v1/audio/transcriptions": "transcriptions",
+    "/v1/audio/speech": "speech",
+    "/v1/images/generations": "images",
+    "/v1/embeddings": "embeddings",
+}
+
+
+class Latency:
+    """
+    Distribuição da latência de um endpoint (tempo até o início da resposta).
+    """
+
+    def __init__(self, kind="fixed", median_ms=0.0, spread=0.0):
+        """
+        Args:
+            kind (str, optional): "fixed", "uniform" (mediana ± spread ms) ou "lognormal"
+                (mediana em ms e desvio ``spread`` do logaritmo). Padrão é "fixed".
+            median_ms (float, optional): Latência mediana em milissegundos. Padrão é 0.
+            spread (float, optional): Dispersão da distribuição. Padrão é 0.
+        """
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Distribuição de latência desconhecida: {kind}.")
+        self.kind = kind
+        self.median_ms = median_ms
+        self.spread = spread
+
+    @classmethod
+    def fixed(cls, ms):
+        return cls("fixed", ms)
+
+    @classmethod
+    def uniform(cls, low_ms, high_ms):
+        return cls("uniform", (low_ms + high_ms) / 2, (high_ms - low_ms) / 2)
+
+    @classmethod
+    def lognormal(cls, median_ms, sigma=0.5):
+        return cls("lognormal", median_ms, sigma)
+
+    def sample(self, rng):
+        """
+        Sorteia uma latência.
+
+        Args:
+            rng (random.Random): Gerador (com semente, para resultados reproduzíveis).
+
+        Returns:
+            float: Latência em segundos.
+        """
+        if self.kind == "uniform":
+            ms = rng.uniform(self.median_ms - self.spread, self.median_ms + self.spread)
+        elif self.kind == "lognormal" and self.median_ms > 0:
+            ms = self.median_ms * math.exp(rng.gauss(0.0, self.spread))
+        else:
+            ms = self.median_ms
+        return max(0.0, ms) / 1000
+
+
+class StubBehavior:
+    """
+    Configuração do servidor: latências, ritmo de entrega, taxa de erros e conteúdo.
+    """
+
+    def __init__(self, seed=0, latency=None, tokens_per_second=None, speech_bytes_per_second=None,
+                 error_rate=0.0, reply=None, transcript=DEFAULT_TRANSCRIPT, stall_seconds=0.0):
+        """
+        Args:
+            seed (int, optional): Semente das latências e dos erros sorteados. Padrão é 0.
+            latency (Latency | dict, optional): Latência de todos os endpoints, ou por
+                endpoint ("chat", "transcriptions", "speech", "images", "embeddings").
+            tokens_per_second (float, optional): Ritmo do chat; None entrega tudo de uma vez.
+            speech_bytes_per_second (float, optional): Ritmo do áudio sintetizado; None
+                entrega tudo de uma vez (48000 corresponde ao tempo real em PCM).
+            error_rate (float | dict, optional): Probabilidade de erro 500, global ou por endpoint.
+            reply (callable, optional): Função ``reply(messages) -> str`` da resposta do
+                chat; padrão é ecoar a última mensagem do usuário.
+            transcript (str, optional): Texto retornado pela transcrição.
+            stall_seconds (float, optional): Pausa do corpo dos streams (chat e áudio) depois
+                do primeiro evento ou bloco, simulando uma conexão travada. Padrão é 0.0.
+        """
+        self.seed = seed
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.speech_bytes_per_second = speech_bytes_per_second
+        self.error_rate = error_rate
+        self.reply = reply or default_reply
+        self.transcript = transcript
+        self.stall_seconds = stall_seconds
+
+    def latency_for(self, endpoint):
+        latency = self.latency.get(endpoint) if isinstance(self.latency, dict) else self.latency
+        return latency or Latency()
+
+    def error_rate_for(self, endpoint):
+        if isinstance(self.error_rate, dict):
+            return self.error_rate.get(endpoint, 0.0)
+        return self.error_rate
+
+
+def default_reply(messages):
+    """Resposta padrão do chat: ecoa a última mensagem do usuário."""
+    prompt = next((message.get("content") or "" for message in reversed(messages)
+                   if message.get("role") == "user"), "")
+    return f"Resposta simulada: {prompt}"
+
+
+def tokenize(text):
+    """Divide um texto em "tokens" (palavras com o espaço seguinte)."""
+    return re.findall(r"\S+\s*|\s+", text)
+
+
+def synthesize_pcm(text):
+    """
+    Gera um áudio PCM determinístico para um texto (tom com frequência derivada do texto).
+
+    Returns:
+        bytes: Amostras int16 mono a 24 kHz, com duração proporcional ao texto.
+    """
+    frequency = 200 + zlib.crc32(text.encode("utf-8")) % 400
+    count = max(1, int(len(text) * SPEECH_SECONDS_PER_CHAR * SPEECH_SAMPLE_RATE))
+    step = 2 * math.pi * frequency / SPEECH_SAMPLE_RATE
+    samples = (int(8000 * math.sin(step * index)) for index in range(count))
+    return struct.pack(f"<{count}h", *samples)
+
+
+def embed(text, dim=EMBEDDING_DIM):
+    """Gera um embedding determinístico e normalizado para um texto."""
+    rng = random.Random(zlib.crc32(text.encode("utf-8")))
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+    return [value / norm for value in vector]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        # Aquecimento da conexão (ClientRegistry.warm_up)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/v1/models":
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-4", "object": "model"}]})
+        else:
+            self._send_error(404, f"Endpoint não encontrado: {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        endpoint = ENDPOINTS.get(self.path.split("?")[0].rstrip("/"))
+        if endpoint is None:
+            self._send_error(404, f"Endpoint não encontrado: {self.path}", "invalid_request_error")
+            return
+        stub = self.server.stub
+        if self.headers.get_content_type() == "multipart/form-data":
+            payload = self._parse_multipart(body)
+        else:
+            payload = json.loads(body or b"{}")
+        stub.record(endpoint, payload)
+
+        time.sleep(stub.sample_latency(endpoint))
+        failure = stub.take_failure(endpoint)
+        if failure is not None:
+            status, retry_after = failure
+            headers = {"retry-after": str(retry_after)} if retry_after is not None else {}
+            self._send_error(status, f"Erro simulado ({status}).", "server_error", headers)
+            return
+        getattr(self, f"_handle_{endpoint}")(payload, stub.behavior)
+
+    def _handle_chat(self, payload, behavior):
+        tokens = tokenize(behavior.reply(payload.get("messages", [])))
+        delay = 1 / behavior.tokens_per_second if behavior.tokens_per_second else 0.0
+        model = payload.get("model", "gpt-4")
+        if not payload.get("stream"):
+            time.sleep(delay * len(tokens))
+            self._send_json(200, {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": 0, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(tokens)}}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": len(tokens), "total_tokens": len(tokens)},
+            })
+            return
+
+        def chunk(delta, finish_reason=None):
+            event = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0, "model": model,
+                     "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            return f"data: {json.dumps(event)}\n\n".encode("utf-8")
+
+        self._start_chunked(200, "text/event-stream")
+        self._write_chunk(chunk({"role": "assistant", "content": ""}))
+        time.sleep(behavior.stall_seconds)
+        for token in tokens:
+            time.sleep(delay)
+            self._write_chunk(chunk({"content": token}))
+        self._write_chunk(chunk({}, "stop"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._end_chunked()
+
+    def _handle_transcriptions(self, payload, behavior):
+        if not payload.get("file"):
+            self._send_error(400, "Arquivo de áudio vazio.", "invalid_request_error")
+            return
+        language = payload.get("language") or "pt"
+        response_format = payload.get("response_format", "json")
+        if response_format == "text":
+            self._send(200, "text/plain; charset=utf-8", behavior.transcript.encode("utf-8"))
+        elif response_format == "verbose_json":
+            self._send_json(200, {"task": "transcribe", "language": LANGUAGE_NAMES.get(language, language),
+                                  "duration": 0.0, "text": behavior.transcript})
+        else:
+            self._send_json(200, {"text": behavior.transcript})
+
+    def _handle_speech(self, payload, behavior):
+        audio = synthesize_pcm(payload.get("input", ""))
+        response_format = payload.get("response_format", "mp3")
+        if response_format == "wav":
+            buffer = io.BytesIO()
+            with wave.open(buffer, "wb") as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(SPEECH_SAMPLE_RATE)
+                wav_file.writeframes(audio)
+            audio = buffer.getvalue()
+        # Os formatos comprimidos (mp3, opus, aac, flac) recebem o mesmo PCM: o conteúdo
+        # é determinístico, mas não é um arquivo válido do formato
+        content_type = "audio/pcm" if response_format == "pcm" else f"audio/{response_format}"
+        if not behavior.speech_bytes_per_second and not behavior.stall_seconds:
+            self._send(200, content_type, audio)
+            return
+        self._start_chunked(200, content_type)
+        for offset in range(0, len(audio), SPEECH_CHUNK_SIZE):
+            block = audio[offset:offset + SPEECH_CHUNK_SIZE]
+            if behavior.speech_bytes_per_second:
+                time.sleep(len(block) / behavior.speech_bytes_per_second)
+            self._write_chunk(block)
+            if offset == 0:
+                time.sleep(behavior.stall_seconds)
+        self._end_chunked()
+
+    def _handle_images(self, payload, behavior):
+        key = zlib.crc32(payload.get("prompt", "").encode("utf-8"))
+        host, port = self.server.server_address[:2]
+        urls = [{"url": f"http://{host}:{port}/images/{key:08x}-{index}.png"}
+                for index in range(int(payload.get("n") or 1))]
+        self._send_json(200, {"created": 0, "data": urls})
+
+    def _handle_embeddings(self, payload, behavior):
+        texts = payload.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        self._send_json(200, {
+            "object": "list", "model": payload.get("model", "text-embedding-3-small"),
+            "data": [{"object": "embedding", "index": index, "embedding": embed(text)}
+                     for index, text in enumerate(texts)],
+            "usage": {"prompt_tokens": 0, "total_tokens": 0},
+        })
+
+    def _parse_multipart(self, body):
+        """Lê os campos de um formulário multipart (arquivos como bytes)."""
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1")
+        message = BytesParser(policy=HTTP).parsebytes(header + body)
+        fields = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            content = part.get_payload(decode=True) or b""
+            fields[name] = content if part.get_filename() else content.decode("utf-8")
+        return fields
+
+    def _send(self, status, content_type, data, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_json(self, status, payload, headers=None):
+        self._send(status, "application/json", json.dumps(payload).encode("utf-8"), headers)
+
+    def _send_error(self, status, message, error_type, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "param": None,
+                                           "code": None}}, headers)
+
+    def _start_chunked(self, status, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class OpenAIStubServer:
+    """
+    Servidor local que imita a API OpenAI, executado em uma thread.
+    """
+
+    def __init__(self, behavior=None, host="127.0.0.1", port=0):
+        """
+        Args:
+            behavior (StubBehavior, optional): Configuração; padrão é StubBehavior().
+            host (str, optional): Endereço de escuta. Padrão é "127.0.0.1".
+            port (int, optional): Porta; 0 escolhe uma porta livre. Padrão é 0.
+        """
+        self.behavior = behavior or StubBehavior()
+        self.requests = []
+        self._failures = []
+        self._rng = random.Random(self.behavior.seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), StubHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """URL base da API simulada (equivalente a https://api.openai.com/v1)."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Inicia o servidor em segundo plano."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                            name="openai-stub")
+            self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Executa o servidor na thread atual (uso pela linha de comando)."""
+        self._server.serve_forever()
+
+    def stop(self):
+        """Encerra o servidor."""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def configure(self, behavior):
+        """Substitui a configuração (e reinicia o sorteio com a nova semente)."""
+        with self._lock:
+            self.behavior = behavior
+            self._rng = random.Random(behavior.seed)
+
+    def inject_error(self, endpoint, status=503, count=1, retry_after=None):
+        """
+        Faz as próximas ``count`` requisições a um endpoint falharem.
+
+        Args:
+            endpoint (str): "chat", "transcriptions", "speech", "images" ou "embeddings".
+            status (int, optional): Código HTTP do erro. Padrão é 503.
+            count (int, optional): Número de requisições afetadas. Padrão é 1.
+            retry_after (float, optional): Valor do cabeçalho Retry-After, em segundos.
+        """
+        with self._lock:
+            self._failures.extend([(endpoint, status, retry_after)] * count)
+
+    def reset(self):
+        """Descarta os erros injetados e o registro de requisições."""
+        with self._lock:
+            self._failures.clear()
+            self.requests.clear()
+
+    def record(self, endpoint, payload):
+        with self._lock:
+            self.requests.append((endpoint, payload))
+
+    def sample_latency(self, endpoint):
+        with self._lock:
+            return self.behavior.latency_for(endpoint).sample(self._rng)
+
+    def take_failure(self, endpoint):
+        """Retorna (status, retry_after) se a requisição deve falhar, ou None."""
+        with self._lock:
+            for index, (target, status, retry_after) in enumerate(self._failures):
+                if target == endpoint:
+                    del self._failures[index]
+                    return status, retry_after
+            rate = self.behavior.error_rate_for(endpoint)
+            if rate and self._rng.random() < rate:
+                return 500, None
+        return None
+
+
+_shared_server = None
+_shared_lock = threading.Lock()
+
+
+def start_shared_stub():
+    """
+    Inicia (uma vez por processo) o servidor compartilhado e aponta para ele o cliente
+    OpenAI compartilhado (api.client_registry).
+
+    Returns:
+        OpenAIStubServer: Servidor em execução.
+    """
+    global _shared_server
+    with _shared_lock:
+        if _shared_server is None:
+            from api.client_registry import client_registry
+            _shared_server = OpenAIStubServer().start()
+            # Também para subprocessos e para quem lê a configuração do ambiente
+            os.environ["OPENAI_API_KEY"] = "test-key"
+            os.environ["OPENAI_BASE_URL"] = _shared_server.base_url
+            client_registry.close()
+            client_registry.base_url = _shared_server.base_url
+            client_registry.api_key = "test-key"
+        return _shared_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API OpenAI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência mediana (log-normal).")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--speech-bytes-per-second", type=float, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    behavior = StubBehavior(seed=args.seed, latency=Latency.lognormal(args.latency_ms),
+                            tokens_per_second=args.tokens_per_second,
+                            speech_bytes_per_second=args.speech_bytes_per_second, error_rate=args.error_rate)
+    server = OpenAIStubServer(behavior, host=args.host, port=args.port)
+    print(f"API simulada em {server.base_url} (OPENAI_BASE_URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
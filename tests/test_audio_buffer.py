@@ -0,0 +1,47 @@
+# tests/test_audio_buffer.py
+
+import os
+import sys
+import wave
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.audio_buffer import AudioBuffer
+
+
+class TestAudioBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.samples = (np.sin(np.arange(1600) / 10) * 1000).astype(np.int16)
+
+    def test_from_frames_shares_memory(self):
+        data = self.samples.tobytes()
+        buffer = AudioBuffer.from_bytes(data, 16000)
+        self.assertFalse(buffer.samples.flags.owndata)
+        frames = [data[:1000], data[1000:]]
+        np.testing.assert_array_equal(AudioBuffer.from_frames(frames, 16000).samples, self.samples)
+
+    def test_metadata(self):
+        buffer = AudioBuffer(np.zeros(3200, dtype=np.int16), 16000, channels=2)
+        self.assertEqual(len(buffer), 1600)
+        self.assertAlmostEqual(buffer.duration, 0.1)
+        self.assertEqual(buffer.nbytes, 6400)
+        self.assertFalse(AudioBuffer(np.zeros(0, dtype=np.int16), 16000))
+
+    def test_wav_round_trip(self):
+        buffer = AudioBuffer(self.samples, 16000)
+        wav = buffer.to_wav()
+        self.assertEqual(wav.name, "audio.wav")
+        with wave.open(wav, 'rb') as wf:
+            self.assertEqual((wf.getnchannels(), wf.getsampwidth(), wf.getframerate()), (1, 2, 16000))
+        wav.seek(0)
+        restored = AudioBuffer.from_wav(wav)
+        np.testing.assert_array_equal(restored.samples, self.samples)
+        self.assertEqual(restored.sample_rate, 16000)
+
+
+if __name__ == '__main__':
+    unittest.main()
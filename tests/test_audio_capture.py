@@ -0,0 +1,92 @@
+# tests/test_audio_capture.py
+
+import os
+import sys
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.audio_capture import AudioCaptureService
+
+FRAME = 512
+
+
+def frames(start, count):
+    """Frames cujo conteúdo é o seu número de sequência."""
+    return np.repeat(np.arange(start, start + count, dtype=np.int16), FRAME)
+
+
+class TestAudioCaptureService(unittest.TestCase):
+
+    def setUp(self):
+        # 1 segundo a 16 kHz com frames de 512 amostras: 31 frames de capacidade
+        self.service = AudioCaptureService(frame_length=FRAME, buffer_seconds=1)
+
+    def test_subscribers_receive_same_frames(self):
+        first = self.service.subscribe()
+        second = self.service.subscribe()
+        self.service.write(frames(0, 3))
+        for subscription in (first, second):
+            values = [subscription.read_frame(timeout=0)[0] for _ in range(3)]
+            self.assertEqual(values, [0, 1, 2])
+            self.assertIsNone(subscription.read_frame(timeout=0))
+
+    def test_partial_writes_are_joined(self):
+        subscription = self.service.subscribe()
+        data = frames(0, 2)
+        self.service.write(data[:300].tobytes())
+        self.assertIsNone(subscription.read_frame(timeout=0))
+        self.service.write(data[300:])
+        self.assertEqual(subscription.read_frame(timeout=0)[0], 0)
+        self.assertEqual(subscription.read_frame(timeout=0)[0], 1)
+
+    def test_preroll_starts_in_the_past(self):
+        self.service.write(frames(0, 20))
+        # 500 ms = 15,6 frames, arredondado para 16
+        subscription = self.service.subscribe(preroll_ms=500)
+        self.assertEqual(subscription.read_frame(timeout=0)[0], 4)
+
+    def test_preroll_limited_to_history(self):
+        self.service.write(frames(0, 100))
+        subscription = self.service.subscribe(preroll_ms=5000)
+        self.assertEqual(subscription.read_frame(timeout=0)[0], 100 - self.service.capacity + 1)
+
+    def test_slow_reader_skips_overwritten_frames(self):
+        subscription = self.service.subscribe()
+        self.service.write(frames(0, self.service.capacity + 5))
+        frame = subscription.read_frame(timeout=0)
+        self.assertEqual(frame[0], 6)
+        self.assertEqual(subscription.dropped_frames, 6)
+
+    def test_read_arbitrary_sizes(self):
+        subscription = self.service.subscribe()
+        self.service.write(frames(0, 4))
+        first = subscription.read(700, timeout=0)
+        second = subscription.read(700, timeout=0)
+        np.testing.assert_array_equal(np.concatenate((first, second)), frames(0, 4)[:1400])
+
+    def test_close_wakes_blocked_reader(self):
+        subscription = self.service.subscribe()
+        result = []
+        reader = threading.Thread(target=lambda: result.append(subscription.read_frame()))
+        reader.start()
+        subscription.close()
+        reader.join(timeout=2)
+        self.assertFalse(reader.is_alive())
+        self.assertEqual(result, [None])
+
+    def test_blocked_reader_receives_new_frame(self):
+        subscription = self.service.subscribe()
+        result = []
+        reader = threading.Thread(target=lambda: result.append(subscription.read_frame(timeout=2)))
+        reader.start()
+        self.service.write(frames(7, 1))
+        reader.join(timeout=2)
+        self.assertEqual(result[0][0], 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
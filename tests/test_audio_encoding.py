@@ -0,0 +1,64 @@
+# tests/test_audio_encoding.py
+
+import os
+import sys
+import wave
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.audio_buffer import AudioBuffer, soundfile
+from utils.audio_encoding import to_mono, resample, encode_for_upload
+
+
+def tone(frequency, rate, seconds=1.0, amplitude=8000):
+    """Senoide int16."""
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+
+
+def dominant_frequency(buffer):
+    """Frequência de maior energia no espectro."""
+    spectrum = np.abs(np.fft.rfft(buffer.samples.astype(np.float32)))
+    return np.argmax(spectrum) * buffer.sample_rate / len(buffer.samples)
+
+
+class TestAudioEncoding(unittest.TestCase):
+
+    def test_to_mono(self):
+        stereo = np.column_stack((np.full(10, 100), np.full(10, 300))).astype(np.int16).reshape(-1)
+        mono = to_mono(AudioBuffer(stereo, 44100, channels=2))
+        self.assertEqual(mono.channels, 1)
+        np.testing.assert_array_equal(mono.samples, np.full(10, 200))
+
+    def test_resample_preserves_tone(self):
+        original = AudioBuffer(tone(440, 44100), 44100)
+        resampled = resample(original, 16000)
+        self.assertEqual(resampled.sample_rate, 16000)
+        self.assertEqual(len(resampled), 16000)
+        self.assertAlmostEqual(dominant_frequency(resampled), 440, delta=2)
+
+    def test_resample_removes_aliasing(self):
+        # 12 kHz está acima da nova frequência de Nyquist (8 kHz) e deve ser atenuado
+        resampled = resample(AudioBuffer(tone(12000, 44100), 44100), 16000)
+        rms = np.sqrt(np.mean(resampled.samples.astype(np.float32) ** 2))
+        self.assertLess(rms, 8000 / np.sqrt(2) * 0.05)
+
+    def test_wav_upload_is_smaller(self):
+        encoded = encode_for_upload(AudioBuffer(tone(300, 44100, seconds=5), 44100), codec='wav')
+        self.assertEqual(encoded.format, 'wav')
+        self.assertGreater(encoded.ratio, 2.7)
+        with wave.open(encoded.file, 'rb') as wf:
+            self.assertEqual(wf.getframerate(), 16000)
+
+    @unittest.skipIf(soundfile is None, "soundfile não instalado")
+    def test_flac_upload(self):
+        encoded = encode_for_upload(AudioBuffer(tone(300, 44100, seconds=5), 44100))
+        self.assertEqual(encoded.format, 'flac')
+        self.assertGreater(encoded.ratio, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+# tests/test_audio_player.py
+
+import os
+import sys
+import wave
+import time
+import tempfile
+import threading
+import tracemalloc
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.audio_player import JitterBuffer, PlaybackEngine, PCMPlayer, load_pcm
+
+
+class TestJitterBuffer(unittest.TestCase):
+
+    def test_waits_for_prebuffer(self):
+        buffer = JitterBuffer(prebuffer_bytes=8)
+        buffer.write(b"\x01\x02\x03\x04")
+        out = bytearray(4)
+        self.assertEqual(buffer.read_into(out), 0)
+        self.assertEqual(bytes(out), b"\x00" * 4)
+
+        buffer.write(b"\x05\x06\x07\x08")
+        self.assertEqual(buffer.read_into(out), 4)
+        self.assertEqual(bytes(out), b"\x01\x02\x03\x04")
+
+    def test_reads_across_chunks_and_pads_with_silence(self):
+        buffer = JitterBuffer(prebuffer_bytes=2)
+        buffer.write(b"ab")
+        buffer.write(b"cde")
+        out = bytearray(8)
+        self.assertEqual(buffer.read_into(out), 5)
+        self.assertEqual(bytes(out), b"abcde\x00\x00\x00")
+        self.assertEqual(buffer.underruns, 1)
+        self.assertEqual(buffer.pending, 0)
+
+    def test_flush_releases_tail(self):
+        buffer = JitterBuffer(prebuffer_bytes=100)
+        buffer.write(b"fim")
+        buffer.flush()
+        out = bytearray(3)
+        self.assertEqual(buffer.read_into(out), 3)
+        self.assertTrue(buffer.wait_drained(timeout=0))
+
+    def test_wait_drained_unblocks_on_clear(self):
+        buffer = JitterBuffer(prebuffer_bytes=1)
+        buffer.write(b"audio")
+        threading.Timer(0.05, buffer.clear).start()
+        self.assertTrue(buffer.wait_drained(timeout=2))
+
+    def test_fade_out_keeps_short_ramp(self):
+        buffer = JitterBuffer(prebuffer_bytes=1)
+        buffer.write(np.full(1000, 10000, dtype=np.int16).tobytes())
+        buffer.fade_out(nbytes=200)
+        self.assertEqual(buffer.pending, 200)
+        out = bytearray(200)
+        buffer.read_into(out)
+        ramp = np.frombuffer(bytes(out), dtype=np.int16)
+        self.assertEqual(ramp[0], 10000)
+        self.assertEqual(ramp[-1], 0)
+        self.assertTrue(np.all(np.diff(ramp) <= 0))
+
+
+class TestPCMPlayer(unittest.TestCase):
+
+    def test_stop_discards_rest_of_stream(self):
+        player = PCMPlayer(sample_rate=1000, prebuffer_ms=10, fade_ms=5)
+        # Sem dispositivo: o teste consome o buffer diretamente
+        player.engine.ensure_stream = lambda: None
+        chunk = np.full(100, 5000, dtype=np.int16).tobytes()
+
+        def chunks():
+            yield chunk
+            player.stop()
+            yield chunk
+
+        player.buffer.wait_drained = lambda timeout=None: True
+        player.play_stream(chunks())
+        self.assertEqual(player.buffer.pending, 10)
+
+    def test_output_level(self):
+        player = PCMPlayer()
+        player.engine._update_level(np.full(480, -3000, dtype=np.int16).tobytes())
+        self.assertAlmostEqual(player.output_level, 3000, delta=1)
+
+
+class TestPlaybackEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = PlaybackEngine(sample_rate=1000, voices=3, prebuffer_ms=10)
+        # Sem dispositivo: o teste chama o callback diretamente
+        self.engine.ensure_stream = lambda: None
+        self.engine.cues["bip"] = np.full(50, 8000, dtype=np.int16).tobytes()
+
+    def render(self, frames=20):
+        out = bytearray(frames * 2)
+        self.engine._callback(out, frames, None, None)
+        return np.frombuffer(bytes(out), dtype=np.int16)
+
+    def test_cue_plays_in_next_block_and_releases_voice(self):
+        started = time.perf_counter()
+        voice = self.engine.play_cue("bip", volume=0.5)
+        self.assertLess(time.perf_counter() - started, 0.02)
+        self.assertTrue(voice.in_use)
+        self.assertTrue(np.all(self.render() == 4000))
+        self.render()
+        self.render()
+        self.assertFalse(voice.in_use)
+        self.assertEqual(self.engine.active_voices, 0)
+        self.assertTrue(np.all(self.render() == 0))
+
+    def test_mixes_voices_and_clips(self):
+        player = PCMPlayer(sample_rate=1000, prebuffer_ms=10, engine=self.engine)
+        player.buffer.write(np.full(20, 30000, dtype=np.int16).tobytes())
+        self.engine.play_cue("bip")
+        self.assertTrue(np.all(self.render() == 32767))
+        self.engine.volume = 0.5
+        self.assertTrue(np.all(self.render() == 4000))
+        self.assertEqual(self.engine.active_voices, 2)
+
+    def test_pool_is_bounded(self):
+        voices = [self.engine.play_cue("bip") for _ in range(4)]
+        self.assertIsNone(voices[-1])
+        self.assertIsNone(self.engine.play_cue("desconhecido"))
+        for _ in range(3):
+            self.render()
+        self.assertEqual(self.engine.active_voices, 0)
+
+    def test_memory_is_flat_over_many_cues(self):
+        def turns(count):
+            for _ in range(count):
+                self.engine.play_cue("bip")
+                for _ in range(3):
+                    self.render()
+
+        turns(100)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            turns(3000)
+            growth = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertLess(growth, 20000)
+        self.assertEqual(self.engine.active_voices, 0)
+
+    def test_load_cue_from_wav(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bip.wav")
+            with wave.open(path, 'wb') as wf:
+                wf.setnchannels(1)
+                wf.setsampwidth(2)
+                wf.setframerate(500)
+                wf.writeframes(np.full(50, 1000, dtype=np.int16).tobytes())
+            self.assertTrue(self.engine.load_cue("wav", path))
+            self.assertFalse(self.engine.load_cue("ausente", os.path.join(directory, "ausente.wav")))
+            pcm = np.frombuffer(load_pcm(path, 1000), dtype=np.int16)
+        self.assertEqual(len(self.engine.cues["wav"]), 200)
+        self.assertEqual(len(pcm), 100)
+        self.assertNotIn("ausente", self.engine.cues)
+
+
+if __name__ == '__main__':
+    unittest.main()
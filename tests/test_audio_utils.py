@@ -0,0 +1,98 @@
+# tests/test_audio_utils.py
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.audio_utils import EnergyVAD, SpeechEndpointer, record_audio
+from utils.audio_capture import AudioCaptureService
+
+RATE = 16000
+
+
+def noise(seconds, amplitude=60, seed=0):
+    """Ruído de fundo de baixa amplitude."""
+    rng = np.random.default_rng(seed)
+    return (rng.normal(0, amplitude, int(RATE * seconds))).astype(np.int16)
+
+
+def voice(seconds, amplitude=6000, frequency=180):
+    """Tom harmônico que imita um trecho vozeado."""
+    t = np.arange(int(RATE * seconds)) / RATE
+    signal = np.sin(2 * np.pi * frequency * t) + 0.5 * np.sin(2 * np.pi * 2 * frequency * t)
+    return (amplitude * signal / 1.5).astype(np.int16) + noise(seconds, seed=1)
+
+
+def feed_in_chunks(endpointer, samples, chunk=1024):
+    """Alimenta o endpointer em blocos, como o stream do microfone; retorna as amostras consumidas."""
+    for offset in range(0, len(samples), chunk):
+        if endpointer.feed(samples[offset:offset + chunk]):
+            return offset + chunk
+    return len(samples)
+
+
+class TestEnergyVAD(unittest.TestCase):
+
+    def test_classifies_voice_and_silence(self):
+        vad = EnergyVAD(RATE)
+        flags = vad.process(np.concatenate((noise(0.5), voice(0.5), noise(0.5))))
+        frames = len(flags) // 3
+        self.assertLess(flags[:frames].mean(), 0.1)
+        self.assertGreater(flags[frames:2 * frames].mean(), 0.9)
+        self.assertLess(flags[2 * frames + 2:].mean(), 0.1)
+
+    def test_keeps_partial_frames(self):
+        vad = EnergyVAD(RATE, frame_ms=20)
+        self.assertEqual(len(vad.process(noise(0.015))), 0)
+        self.assertEqual(len(vad.process(noise(0.010))), 1)
+
+
+class TestSpeechEndpointer(unittest.TestCase):
+
+    def test_stops_after_hangover_and_trims(self):
+        endpointer = SpeechEndpointer(RATE, padding_ms=100)
+        samples = np.concatenate((noise(1.0), voice(1.2), noise(3.0)))
+        consumed = feed_in_chunks(endpointer, samples)
+
+        self.assertTrue(endpointer.done)
+        self.assertTrue(endpointer.speech_detected)
+        # Com o padrão, encerra logo após o fim da fala (1,0 s + 1,2 s + 0,3 s de silêncio)
+        self.assertLess(consumed / RATE, 2.7)
+        self.assertAlmostEqual(len(endpointer.audio()) / RATE, 1.4, delta=0.1)
+
+    def test_no_speech_timeout(self):
+        endpointer = SpeechEndpointer(RATE, no_speech_timeout=1.0)
+        consumed = feed_in_chunks(endpointer, noise(3.0))
+        self.assertTrue(endpointer.done)
+        self.assertFalse(endpointer.speech_detected)
+        self.assertLess(consumed / RATE, 1.1)
+        self.assertEqual(len(endpointer.audio()), 0)
+
+    def test_max_duration(self):
+        endpointer = SpeechEndpointer(RATE, max_duration=1.0)
+        consumed = feed_in_chunks(endpointer, voice(3.0))
+        self.assertTrue(endpointer.done)
+        self.assertLess(consumed / RATE, 1.1)
+
+
+class TestRecordFromCapture(unittest.TestCase):
+
+    def test_records_from_preroll(self):
+        service = AudioCaptureService(sample_rate=RATE)
+        # A fala começa antes da assinatura e só é capturada graças à pré-gravação
+        service.write(noise(1.0))
+        service.write(voice(0.3))
+        subscription = service.subscribe(preroll_ms=500)
+        service.write(voice(0.7))
+        service.write(noise(1.5))
+        audio = record_audio(subscription=subscription)
+        self.assertEqual(audio.sample_rate, RATE)
+        self.assertAlmostEqual(audio.duration, 1.3, delta=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
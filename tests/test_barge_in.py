@@ -0,0 +1,89 @@
+# tests/test_barge_in.py
+
+import os
+import sys
+import time
+import types
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.audio_capture import AudioCaptureService
+from utils.barge_in import EchoGate, BargeInMonitor
+
+RATE = 16000
+
+
+def fake_player(playing, level):
+    """Reprodutor com o estado e o nível de saída informados."""
+    return types.SimpleNamespace(is_playing=playing, output_level=level,
+                                 last_output_time=time.monotonic() if playing else 0.0)
+
+
+def tone(seconds, amplitude):
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 200 * t)).astype(np.int16)
+
+
+class TestEchoGate(unittest.TestCase):
+
+    def test_passes_everything_when_idle(self):
+        gate = EchoGate(fake_player(False, 0.0))
+        frame = tone(0.032, 100)
+        self.assertIs(gate(frame), frame)
+
+    def test_suppresses_echo_quieter_than_output(self):
+        gate = EchoGate(fake_player(True, 4000.0))
+        self.assertFalse(np.any(gate(tone(0.032, 3000))))
+        self.assertEqual(gate.suppressed_frames, 1)
+
+    def test_passes_voice_louder_than_output(self):
+        gate = EchoGate(fake_player(True, 1000.0))
+        frame = tone(0.032, 6000)
+        self.assertIs(gate(frame), frame)
+
+
+class TestBargeInMonitor(unittest.TestCase):
+
+    def make_monitor(self, player):
+        self.calls = []
+        return BargeInMonitor(AudioCaptureService(sample_rate=RATE), player,
+                              on_barge_in=lambda: self.calls.append(True), min_speech_ms=200)
+
+    def feed(self, monitor, samples):
+        return [monitor.process(monitor.gate(samples[i:i + 512]))
+                for i in range(0, len(samples), 512)]
+
+    def test_triggers_once_on_speech_during_playback(self):
+        monitor = self.make_monitor(fake_player(True, 500.0))
+        results = self.feed(monitor, np.concatenate((np.zeros(RATE // 2, dtype=np.int16), tone(1.0, 8000))))
+        self.assertEqual(results.count(True), 1)
+        # Dispara após ~200 ms de voz (a voz começa no frame 16)
+        self.assertLess(results.index(True) - 15, 9)
+
+    def test_ignores_echo(self):
+        monitor = self.make_monitor(fake_player(True, 8000.0))
+        self.assertNotIn(True, self.feed(monitor, tone(1.0, 6000)))
+
+    def test_ignores_speech_without_playback(self):
+        monitor = self.make_monitor(fake_player(False, 0.0))
+        self.assertNotIn(True, self.feed(monitor, tone(1.0, 8000)))
+
+    def test_thread_calls_callback(self):
+        player = fake_player(True, 500.0)
+        monitor = self.make_monitor(player)
+        monitor.start()
+        try:
+            monitor.capture.write(np.concatenate((np.zeros(RATE // 4, dtype=np.int16), tone(0.5, 8000))))
+            deadline = time.monotonic() + 2
+            while not self.calls and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            monitor.stop()
+        self.assertEqual(self.calls, [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+# tests/test_call_policy.py
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.call_policy import (CallPolicy, CircuitBreaker, APICallError, DeadlineExceeded, CircuitOpenError,
+                             classify)
+
+
+class StatusError(Exception):
+    """Erro com código HTTP e cabeçalhos, como os do pacote openai."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class FlakyCall:
+    """Função ``fn(timeout)`` que falha com os erros dados antes de retornar ``result``."""
+
+    def __init__(self, errors, result="ok"):
+        self.errors = list(errors)
+        self.result = result
+        self.timeouts = []
+
+    def __call__(self, timeout):
+        self.timeouts.append(timeout)
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.result
+
+
+class TestCallPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.sleeps = []
+        self.policy = CallPolicy("stt", deadline=10.0, max_attempts=3, sleep=self.sleeps.append)
+
+    def test_retries_transient_errors(self):
+        call = FlakyCall([StatusError(503), TimeoutError("lento")])
+        self.assertEqual(self.policy.call(call), "ok")
+        self.assertEqual(len(call.timeouts), 3)
+        self.assertEqual(len(self.sleeps), 2)
+        # Cada tentativa recebe apenas o prazo restante
+        self.assertTrue(all(0 < timeout <= 10.0 for timeout in call.timeouts))
+
+    def test_honors_retry_after(self):
+        call = FlakyCall([StatusError(429, {"retry-after": "1.5"})])
+        self.assertEqual(self.policy.call(call), "ok")
+        self.assertEqual(self.sleeps, [1.5])
+
+    def test_client_errors_are_not_retried(self):
+        call = FlakyCall([StatusError(400)])
+        with self.assertRaises(APICallError) as context:
+            self.policy.call(call)
+        self.assertFalse(context.exception.retryable)
+        self.assertEqual(context.exception.status_code, 400)
+        self.assertEqual(len(call.timeouts), 1)
+        self.assertEqual(self.policy.breaker.failures, 0)
+
+    def test_stops_when_deadline_is_exhausted(self):
+        # O servidor pede uma espera maior que o prazo da etapa
+        call = FlakyCall([StatusError(503, {"retry-after": "30"})])
+        with self.assertRaises(DeadlineExceeded) as context:
+            self.policy.call(call)
+        self.assertEqual(context.exception.attempts, 1)
+        self.assertEqual(self.sleeps, [])
+
+    def test_fallback_receives_error(self):
+        call = FlakyCall([StatusError(500)] * 3)
+        result = self.policy.call(call, fallback=lambda error: f"alternativa ({error.attempts})")
+        self.assertEqual(result, "alternativa (3)")
+
+    def test_stream_deadline_covers_body(self):
+        closed = []
+
+        class Body:
+            def __iter__(self):
+                yield "primeiro"
+                # Corpo lento: o próximo item chega depois do prazo
+                clock[0] += 11.0
+                yield "atrasado"
+
+            def close(self):
+                closed.append(True)
+
+        clock = [100.0]
+        with mock.patch("api.call_policy.time.monotonic", side_effect=lambda: clock[0]):
+            stream = self.policy.stream(lambda timeout: Body())
+            self.assertEqual(next(stream), "primeiro")
+            with self.assertRaises(DeadlineExceeded):
+                next(stream)
+        self.assertEqual(self.policy.breaker.failures, 1)
+        self.assertEqual(closed, [True])
+
+    def test_stream_read_errors_are_converted(self):
+        def body():
+            yield b"audio"
+            raise TimeoutError("read timed out")
+
+        stream = self.policy.stream(lambda timeout: object(), body=lambda response: body())
+        self.assertEqual(next(stream), b"audio")
+        with self.assertRaises(APICallError) as context:
+            next(stream)
+        self.assertTrue(context.exception.retryable)
+        self.assertEqual(self.policy.breaker.failures, 1)
+
+    def test_classify(self):
+        self.assertEqual(classify(StatusError(502)), (True, 502))
+        self.assertEqual(classify(StatusError(401)), (False, 401))
+        self.assertEqual(classify(ConnectionError()), (True, None))
+        self.assertEqual(classify(ValueError()), (False, None))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_fails_fast_and_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+        policy = CallPolicy("tts", deadline=5.0, max_attempts=1, breaker=breaker, sleep=lambda delay: None)
+        for _ in range(2):
+            with self.assertRaises(APICallError):
+                policy.call(FlakyCall([StatusError(503)]))
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        # Com o disjuntor aberto, a chamada nem é feita
+        call = FlakyCall([])
+        with self.assertRaises(CircuitOpenError):
+            policy.call(call)
+        self.assertEqual(call.timeouts, [])
+        self.assertEqual(policy.call(call, fallback=lambda error: "cache"), "cache")
+
+        # Depois do tempo de espera, uma chamada de teste fecha o disjuntor
+        with mock.patch("api.call_policy.time.monotonic", return_value=breaker.opened_at + 31):
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertEqual(policy.call(call), "ok")
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        breaker.record_failure()
+        with mock.patch("api.call_policy.time.monotonic", return_value=breaker.opened_at + 31):
+            self.assertTrue(breaker.allow())
+            # Apenas uma chamada de teste por vez
+            self.assertFalse(breaker.allow())
+            breaker.record_failure()
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_request_error_during_probe_keeps_breaker_open(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+        policy = CallPolicy("llm", deadline=1.0, breaker=breaker, sleep=lambda delay: None)
+        breaker.record_failure()
+        with mock.patch("api.call_policy.time.monotonic", return_value=breaker.opened_at + 31):
+            with self.assertRaises(APICallError):
+                policy.call(FlakyCall([StatusError(400)]))
+            # Nem fechado nem reaberto: a próxima chamada ainda é uma chamada de teste
+            self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertTrue(breaker.allow())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_client_registry.py
+
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.client_registry import ClientRegistry, PoolStats
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestClientRegistry(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/v1"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.registry = ClientRegistry(api_key="test-key", base_url=self.base_url)
+        self.addCleanup(self.registry.close)
+
+    def test_client_is_shared(self):
+        self.assertIs(self.registry.client, self.registry.client)
+        self.assertIs(self.registry.client._client, self.registry.http_client)
+
+    def test_connections_are_reused(self):
+        for _ in range(3):
+            self.registry.http_client.get(f"{self.base_url}/models").raise_for_status()
+        stats = self.registry.stats.snapshot()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertAlmostEqual(stats["reuse_ratio"], 2 / 3)
+        self.assertGreater(stats["mean_connect_ms"], 0.0)
+
+    def test_warm_up_opens_connection_for_next_call(self):
+        self.assertTrue(self.registry.warm_up(background=False))
+        self.registry.http_client.get(f"{self.base_url}/models")
+        stats = self.registry.stats.snapshot()
+        self.assertEqual(stats["warm_ups"], 1)
+        self.assertEqual(stats["new_connections"], 1)
+        self.assertEqual(stats["reused"], 1)
+
+    def test_warm_up_is_skipped_while_connection_is_fresh(self):
+        self.registry.warm_up(background=False)
+        self.assertFalse(self.registry.warm_up(background=False))
+        self.assertEqual(self.registry.stats.snapshot()["warm_ups"], 1)
+
+    def test_background_warm_up_does_not_wait_for_client_creation(self):
+        # Simula a criação do cliente em andamento em outra thread
+        self.registry._lock.acquire()
+        try:
+            caller = threading.Thread(target=self.registry.warm_up)
+            caller.start()
+            caller.join(timeout=1.0)
+            self.assertFalse(caller.is_alive())
+        finally:
+            self.registry._lock.release()
+
+
+class TestPoolStats(unittest.TestCase):
+
+    def test_empty_snapshot(self):
+        stats = PoolStats().snapshot()
+        self.assertEqual(stats["reuse_ratio"], 0.0)
+        self.assertEqual(stats["mean_connect_ms"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
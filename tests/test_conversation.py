@@ -0,0 +1,103 @@
+# tests/test_conversation.py
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.conversation import ConversationMemory, estimate_tokens, MESSAGE_OVERHEAD_TOKENS
+
+
+def word_counter(text):
+    """Contador simples para testes: um token por palavra."""
+    return len(text.split())
+
+
+class TestEstimateTokens(unittest.TestCase):
+
+    def test_estimate(self):
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("Olá, mundo!"), 5)
+        self.assertEqual(estimate_tokens("extraordinariamente"), 5)
+
+
+class TestConversationMemory(unittest.TestCase):
+
+    def test_messages_keep_system_prefix(self):
+        memory = ConversationMemory("sistema", token_counter=word_counter)
+        memory.add_exchange("oi", "olá")
+        messages = memory.messages(pending_user="tudo bem?")
+        self.assertEqual(messages[0], {"role": "system", "content": "sistema"})
+        self.assertEqual([m["role"] for m in messages[1:]], ["user", "assistant", "user"])
+        self.assertEqual(messages[-1]["content"], "tudo bem?")
+
+    def test_token_count_is_incremental(self):
+        calls = []
+
+        def counter(text):
+            calls.append(text)
+            return len(text.split())
+
+        memory = ConversationMemory("um dois", token_counter=counter, max_tokens=10 ** 6)
+        for i in range(50):
+            memory.add_exchange(f"pergunta {i}", f"resposta número {i}")
+        # Uma contagem por mensagem: sistema + 100 mensagens
+        self.assertEqual(len(calls), 101)
+        self.assertEqual(memory.token_count, 2 + 50 * 2 + 50 * 3 + 101 * MESSAGE_OVERHEAD_TOKENS)
+
+    def test_budget_trims_oldest_turns(self):
+        memory = ConversationMemory("sistema", token_counter=word_counter, max_tokens=40, summarizer=None)
+        for i in range(20):
+            memory.add_exchange(f"pergunta {i}", f"resposta {i}")
+            self.assertLessEqual(memory.token_count, 40)
+        messages = memory.messages()
+        self.assertEqual(messages[1]["role"], "user")
+        self.assertEqual(messages[-1]["content"], "resposta 19")
+        self.assertIsNone(memory.summary)
+
+    def test_evicted_turns_are_summarized(self):
+        memory = ConversationMemory("sistema", token_counter=word_counter, max_tokens=60, summary_max_tokens=30)
+        for i in range(10):
+            memory.add_exchange(f"Pergunta {i}. Detalhes extras.", f"Resposta {i}. Mais texto.")
+            self.assertLessEqual(memory.token_count, 60)
+        self.assertIn("Resposta", memory.summary)
+        messages = memory.messages()
+        self.assertEqual(messages[0]["content"], "sistema")
+        self.assertTrue(messages[1]["content"].startswith(ConversationMemory.SUMMARY_PREFIX))
+
+    def test_summary_lines_are_counted_once(self):
+        calls = []
+
+        def counter(text):
+            calls.append(text)
+            return len(text.split())
+
+        memory = ConversationMemory("sistema", token_counter=counter, max_tokens=60, summary_max_tokens=10 ** 6)
+        for i in range(40):
+            memory.add_exchange(f"Pergunta {i}.", f"Resposta {i}.")
+        summary_lines = memory.summary.splitlines()
+        # Mensagens, linhas do resumo e o prefixo do resumo, cada um contado uma vez
+        self.assertEqual(len(calls), 1 + 80 + len(summary_lines) + 1)
+        self.assertEqual(memory._summary_tokens,
+                         sum(len(line.split()) + 1 for line in summary_lines)
+                         + len(ConversationMemory.SUMMARY_PREFIX.split()) + MESSAGE_OVERHEAD_TOKENS)
+
+    def test_context_has_last_turns(self):
+        memory = ConversationMemory("sistema", token_counter=word_counter)
+        self.assertEqual(memory.context(), "")
+        memory.add_exchange("oi", "olá")
+        memory.add_exchange("tudo bem?", "tudo")
+        self.assertEqual(memory.context(), "user: tudo bem?\nassistant: tudo")
+        self.assertEqual(memory.context(turns=2).count("\n"), 3)
+
+    def test_clear(self):
+        memory = ConversationMemory("sistema", token_counter=word_counter)
+        memory.add_exchange("oi", "olá")
+        memory.clear()
+        self.assertEqual(len(memory), 0)
+        self.assertEqual(len(memory.messages()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
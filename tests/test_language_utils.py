@@ -0,0 +1,63 @@
+# tests/test_language_utils.py
+
+import os
+import sys
+import time
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from gui.language_utils import LanguageIdentifier
+
+
+class TestLanguageIdentifier(unittest.TestCase):
+
+    def setUp(self):
+        self.identifier = LanguageIdentifier(cache_size=2, default="pt")
+        self.identifier.warm_up(background=False)
+
+    def test_hint_skips_detection(self):
+        self.assertEqual(self.identifier.detect("Bonjour tout le monde, comment allez-vous?", hint="fr"), "fr")
+        self.assertEqual(self.identifier.misses, 0)
+
+    def test_long_text(self):
+        self.assertEqual(self.identifier.detect("Qual é a previsão do tempo para amanhã em Zurique?"), "pt")
+        self.assertEqual(self.identifier.detect("What is the weather forecast for tomorrow in Zurich?"), "en")
+
+    def test_short_text_fast_path(self):
+        start = time.perf_counter()
+        self.assertEqual(self.identifier.detect("Danke schön"), "de")
+        self.assertEqual(self.identifier.detect("Hola, gracias"), "es")
+        self.assertLess(time.perf_counter() - start, 0.01)
+
+    def test_ambiguous_short_text_uses_statistical_detector(self):
+        self.assertEqual(self.identifier.detect("¿Que hora es?"), "es")
+        self.assertEqual(self.identifier.detect("Como estás?"), "es")
+        self.assertEqual(self.identifier.detect("Que horas são?"), "pt")
+
+    def test_inconclusive_short_text_uses_previous_turn_while_warming_up(self):
+        identifier = LanguageIdentifier(default="pt")
+        identifier._warming_up = True
+        self.assertEqual(identifier.detect("Zurique?"), "pt")
+        identifier.remember("en")
+        self.assertEqual(identifier.detect("Zurique?"), "en")
+
+    def test_lru_cache(self):
+        first = "Qual é a previsão do tempo para amanhã em Zurique?"
+        self.identifier.detect(first)
+        self.identifier.detect(first)
+        self.assertEqual(self.identifier.hits, 1)
+        self.identifier.detect("What is the weather forecast for tomorrow in Zurich?")
+        self.identifier.detect("Wie wird das Wetter morgen in Zürich sein, bitte?")
+        self.identifier.detect(first)
+        self.assertEqual(self.identifier.hits, 1)
+
+    def test_does_not_block_while_warming_up(self):
+        identifier = LanguageIdentifier(default="pt")
+        identifier._warming_up = True
+        identifier.remember("de")
+        self.assertEqual(identifier.detect("What is the weather forecast for tomorrow in Zurich?"), "de")
+
+
+if __name__ == '__main__':
+    unittest.main()
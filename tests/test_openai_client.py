@@ -1,39 +1,143 @@
+import os
+import time
 import unittest
+from types import SimpleNamespace
+from unittest import mock
 from api.openai_client import OpenAIClient
+from api.call_policy import APICallError, CallPolicy, DeadlineExceeded
+from api.semantic_cache import SemanticCache, HashingEmbedder
+from tests.openai_stub import StubBehavior, start_shared_stub
 
 class TestOpenAIClient(unittest.TestCase):
-    
+    """Testes de integração com a API simulada (tests/openai_stub.py)."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = start_shared_stub()
+
     def setUp(self):
         """Configuração do ambiente de teste."""
+        self.stub.reset()
         self.client = OpenAIClient()
 
-    def test_generate_text(self):
-        """Teste para o método generate_text."""
+    def test_get_response(self):
+        """Teste para o método get_response."""
         prompt = "Teste de integração API"
-        response = self.client.generate_text(prompt, max_tokens=50)
-        
-        # Verifica se a resposta não é nula
-        self.assertIsNotNone(response, "A resposta da geração de texto deve ser não nula")
-        
-        # Verifica se a resposta contém o tipo esperado de conteúdo
-        self.assertTrue(isinstance(response, str) and len(response) > 0, "A resposta deve ser uma string não vazia")
-        
-        # Mensagem detalhada para sucesso
-        print("Teste de geração de texto bem-sucedido: resposta não nula e válida.")
-
-    def test_generate_text_empty_prompt(self):
+        response = self.client.get_response(prompt, max_tokens=50)
+        self.assertEqual(response, f"Resposta simulada: {prompt}")
+
+        endpoint, payload = self.stub.requests[-1]
+        self.assertEqual(endpoint, "chat")
+        self.assertEqual(payload["max_tokens"], 50)
+        self.assertTrue(payload["stream"])
+        self.assertEqual(payload["messages"][-1], {"role": "user", "content": prompt})
+
+    def test_get_response_empty_prompt(self):
         """Teste para verificar o comportamento com prompt vazio."""
-        prompt = ""
-        response = self.client.generate_text(prompt, max_tokens=50)
-        self.assertIsNotNone(response, "Mesmo com prompt vazio, a resposta não deve ser nula")
-        print("Teste com prompt vazio bem-sucedido.")
-
-    def test_generate_text_large_tokens(self):
-        """Teste para verificar o comportamento com um número alto de tokens."""
-        prompt = "Teste de limite de tokens"
-        response = self.client.generate_text(prompt, max_tokens=1000)
-        self.assertIsNotNone(response, "A resposta não deve ser nula mesmo com muitos tokens")
-        print("Teste com muitos tokens bem-sucedido.")
+        response = self.client.get_response("", max_tokens=50)
+        self.assertTrue(response, "Mesmo com prompt vazio, a resposta não deve ser vazia")
+
+    def test_get_response_keeps_conversation(self):
+        """O segundo turno é enviado com o histórico do primeiro."""
+        first = self.client.get_response("Primeira pergunta")
+        self.client.get_response("Segunda pergunta")
+        messages = self.stub.requests[-1][1]["messages"]
+        self.assertIn({"role": "assistant", "content": first}, messages)
+
+    def test_get_response_retries_transient_error(self):
+        """Um erro 503 com Retry-After é repetido dentro do prazo da etapa."""
+        self.stub.inject_error("chat", status=503, retry_after=0)
+        self.assertEqual(self.client.get_response("Oi"), "Resposta simulada: Oi")
+        self.assertEqual(len(self.stub.requests), 2)
+
+    def test_closing_stream_discards_turn(self):
+        """Um turno interrompido encerra a requisição e não entra no histórico."""
+        stream = self.client.stream_response("Conte uma história longa")
+        next(stream)
+        stream.close()
+        self.assertEqual(len(self.client.conversation), 0)
+
+    def test_stalled_stream_hits_deadline(self):
+        """Um corpo SSE travado depois do primeiro evento termina no prazo da etapa."""
+        self.stub.configure(StubBehavior(stall_seconds=3.0))
+        self.addCleanup(self.stub.configure, StubBehavior())
+        policy = CallPolicy("llm", deadline=0.5, max_attempts=1)
+        started = time.monotonic()
+        with mock.patch.dict("api.call_policy._policies", {"llm": policy}):
+            with self.assertRaises(DeadlineExceeded):
+                self.client.get_response("Oi")
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertEqual(policy.breaker.failures, 1)
+        self.assertEqual(len(self.client.conversation), 0)
+
+    def test_generate_image(self):
+        url = self.client.generate_image("Um gato astronauta")
+        self.assertTrue(url.startswith(self.stub.base_url.rsplit("/v1", 1)[0]))
+        self.assertEqual(url, self.client.generate_image("Um gato astronauta"))
+
+
+def _chunk(content):
+    """Cria um chunk de streaming no formato da API de chat."""
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=content))])
+
+
+class TestOpenAIClientStreaming(unittest.TestCase):
+    """Testes do modo streaming com o cliente HTTP simulado."""
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"}):
+            self.client = OpenAIClient()
+        # Um stream novo a cada chamada
+        self.create = mock.Mock(side_effect=lambda **kwargs: iter([
+            _chunk("Olá"), _chunk(None), SimpleNamespace(choices=[]), _chunk(", mundo! ")
+        ]))
+        self.client.client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        )
+
+    def test_stream_response_yields_deltas(self):
+        deltas = list(self.client.stream_response("Oi"))
+        self.assertEqual(deltas, ["Olá", ", mundo! "])
+        self.assertTrue(self.create.call_args.kwargs["stream"])
+
+    def test_get_response_joins_stream(self):
+        self.assertEqual(self.client.get_response("Oi"), "Olá, mundo!")
+
+    def test_get_response_raises_api_call_error(self):
+        self.create.side_effect = RuntimeError("falha de rede")
+        with self.assertRaises(APICallError) as context:
+            self.client.get_response("Oi")
+        self.assertEqual(context.exception.stage, "llm")
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_semantic_cache_skips_api(self):
+        self.client.semantic_cache = SemanticCache(HashingEmbedder(), threshold=0.9)
+        self.assertEqual(self.client.get_response("Bom dia!"), "Olá, mundo!")
+        self.client.conversation.clear()
+        self.assertEqual(self.client.get_response("bom dia"), "Olá, mundo!")
+        self.assertEqual(self.create.call_count, 1)
+
+    def test_semantic_cache_is_scoped_to_context(self):
+        self.client.semantic_cache = SemanticCache(HashingEmbedder(), threshold=0.9)
+        self.client.get_response("Como está o tempo hoje?")
+        self.client.conversation.clear()
+        self.client.get_response("Bom dia!")
+        # Depois de outro turno, a pergunta semelhante vai à API e entra no cache com o seu contexto
+        self.client.get_response("Como está o tempo hoje?")
+        self.assertEqual(self.create.call_count, 3)
+        self.assertEqual(len(self.client.semantic_cache), 3)
+
+    def test_semantic_cache_hits_on_later_turns(self):
+        self.client.semantic_cache = SemanticCache(HashingEmbedder(), threshold=0.9)
+        self.client.get_response("Bom dia!")
+        self.client.get_response("Como está o tempo hoje?")
+        self.client.conversation.clear()
+        self.client.get_response("bom dia")
+        # O segundo turno tem o mesmo contexto (o primeiro turno) e também é respondido pelo cache
+        self.assertEqual(self.client.get_response("como esta o tempo hoje"), "Olá, mundo!")
+        self.assertEqual(self.create.call_count, 2)
+        self.assertEqual(self.client.semantic_cache.hits, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
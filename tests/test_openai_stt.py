@@ -1,28 +1,71 @@
 # tests/test_openai_STT.py
 
-import unittest
 import os
+import sys
+import math
+import wave
+import struct
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
 from api.openai_stt import transcribe_audio
+from api.call_policy import APICallError
+from tests.openai_stub import start_shared_stub, DEFAULT_TRANSCRIPT
+
+
+def write_test_audio(path, seconds=1.0, sample_rate=16000):
+    """Grava um WAV sintético (tom de 440 Hz) para os testes."""
+    count = int(seconds * sample_rate)
+    samples = (int(8000 * math.sin(2 * math.pi * 440 * index / sample_rate)) for index in range(count))
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(struct.pack(f"<{count}h", *samples))
+
 
 class TestOpenAISTT(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = start_shared_stub()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.test_audio_path = os.path.join(cls.directory.name, "test_audio.wav")
+        write_test_audio(cls.test_audio_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def setUp(self):
+        self.stub.reset()
+
     def test_transcribe_audio(self):
-        # Caminho para um arquivo de áudio de teste
-        test_audio_path = "resources/audios/test_audio.wav"
-        
-        # Verifique se o arquivo de teste existe
-        self.assertTrue(os.path.exists(test_audio_path), "Arquivo de áudio de teste não encontrado")
-        
         # Teste a transcrição
-        transcription = transcribe_audio(test_audio_path)
-        
-        # Verifique se a transcrição não está vazia
-        self.assertTrue(transcription, "A transcrição não deve estar vazia")
-        
+        transcription = transcribe_audio(self.test_audio_path)
+        self.assertEqual(transcription, DEFAULT_TRANSCRIPT)
+
         # Teste com diferentes idiomas
         languages = ['en', 'de', 'es', 'pt']
         for lang in languages:
-            transcription = transcribe_audio(test_audio_path, language=lang)
+            transcription, detected = transcribe_audio(self.test_audio_path, language=lang, verbose=True)
             self.assertTrue(transcription, f"A transcrição para {lang} não deve estar vazia")
+            self.assertEqual(detected, lang)
+            self.assertEqual(self.stub.requests[-1][1]["language"], lang)
+
+    def test_transcribe_audio_resends_file_on_retry(self):
+        self.stub.inject_error("transcriptions", status=500, retry_after=0)
+        self.assertEqual(transcribe_audio(self.test_audio_path), DEFAULT_TRANSCRIPT)
+        first, second = (payload["file"] for _, payload in self.stub.requests)
+        self.assertEqual(first, second)
+
+    def test_transcribe_audio_raises_on_client_error(self):
+        self.stub.inject_error("transcriptions", status=400)
+        with self.assertRaises(APICallError) as context:
+            transcribe_audio(self.test_audio_path)
+        self.assertEqual(context.exception.status_code, 400)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
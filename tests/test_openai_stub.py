@@ -0,0 +1,79 @@
+# tests/test_openai_stub.py
+
+import os
+import sys
+import time
+import random
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.client_registry import ClientRegistry
+from tests.openai_stub import OpenAIStubServer, StubBehavior, Latency
+
+
+class TestOpenAIStubServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = OpenAIStubServer(StubBehavior(seed=1)).start()
+        self.addCleanup(self.server.stop)
+        self.registry = ClientRegistry(api_key="test-key", base_url=self.server.base_url)
+        self.addCleanup(self.registry.close)
+        self.client = self.registry.client
+
+    def chat(self, **options):
+        return self.client.chat.completions.create(
+            model="gpt-4", messages=[{"role": "user", "content": "um dois três quatro"}], **options)
+
+    def test_streaming_is_paced_by_token_rate(self):
+        self.server.configure(StubBehavior(tokens_per_second=100, latency=Latency.fixed(50)))
+        started = time.perf_counter()
+        arrivals = []
+        for chunk in self.chat(stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                arrivals.append((time.perf_counter() - started, chunk.choices[0].delta.content))
+        text = "".join(content for _, content in arrivals)
+        self.assertEqual(text, "Resposta simulada: um dois três quatro")
+        # Primeiro token após a latência; os 6 tokens em ritmo de 100 por segundo
+        self.assertGreaterEqual(arrivals[0][0], 0.05)
+        self.assertGreaterEqual(arrivals[-1][0] - arrivals[0][0], 0.045)
+
+    def test_non_streaming_response(self):
+        response = self.chat()
+        self.assertEqual(response.choices[0].message.content, "Resposta simulada: um dois três quatro")
+
+    def test_error_rate_is_deterministic(self):
+        def outcomes():
+            self.server.configure(StubBehavior(seed=7, error_rate={"embeddings": 0.5}))
+            results = []
+            for _ in range(10):
+                try:
+                    self.client.embeddings.create(model="text-embedding-3-small", input=["oi"])
+                    results.append(True)
+                except Exception as e:
+                    self.assertEqual(e.status_code, 500)
+                    results.append(False)
+            return results
+
+        first = outcomes()
+        self.assertEqual(first, outcomes())
+        self.assertIn(True, first)
+        self.assertIn(False, first)
+
+    def test_embeddings_are_deterministic(self):
+        first = self.client.embeddings.create(model="text-embedding-3-small", input=["oi", "olá"])
+        second = self.client.embeddings.create(model="text-embedding-3-small", input=["oi"])
+        self.assertEqual(first.data[0].embedding, second.data[0].embedding)
+        self.assertNotEqual(first.data[0].embedding, first.data[1].embedding)
+
+    def test_latency_distributions(self):
+        rng = random.Random(0)
+        self.assertEqual(Latency.fixed(20).sample(rng), 0.02)
+        samples = [Latency.uniform(10, 30).sample(rng) for _ in range(100)]
+        self.assertTrue(all(0.01 <= sample <= 0.03 for sample in samples))
+        samples = sorted(Latency.lognormal(100, sigma=0.5).sample(rng) for _ in range(1001))
+        self.assertAlmostEqual(samples[500], 0.1, delta=0.02)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# tests/test_render_scheduler.py
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtWidgets import QApplication
+from gui.transcript import TranscriptView
+from gui.render_scheduler import RenderScheduler
+
+
+class TestRenderScheduler(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.view = TranscriptView()
+        self.view.resize(400, 300)
+        self.scheduler = RenderScheduler(self.view)
+        self.model = self.view.transcript
+        self.inserts = []
+        self.changes = []
+        self.model.rowsInserted.connect(lambda parent, first, last: self.inserts.append((first, last)))
+        self.model.dataChanged.connect(lambda top_left, bottom_right, roles: self.changes.append(top_left.row()))
+
+    def tearDown(self):
+        self.view.close_transcript()
+        self.view.close()
+
+    def wait_frame(self):
+        loop = QEventLoop()
+        QTimer.singleShot(50, loop.quit)
+        loop.exec()
+
+    def test_updates_are_deferred_to_the_next_frame(self):
+        self.scheduler.append("Sistema", "Olá", "#444444")
+        self.assertEqual(self.model.rowCount(), 0)
+        self.assertTrue(self.scheduler.pending)
+        self.wait_frame()
+        self.assertFalse(self.scheduler.pending)
+        self.assertEqual(self.model.message(0).text, "Olá")
+
+    def test_burst_of_messages_is_one_insertion(self):
+        for i in range(10):
+            self.scheduler.append("Erro", f"falha {i}")
+        self.scheduler.flush()
+        self.assertEqual(self.inserts, [(0, 9)])
+        self.assertEqual(self.scheduler.stats()["frames"], 1)
+        self.assertEqual(self.scheduler.stats()["coalesced"], 9)
+
+    def test_deltas_merge_into_pending_bubble(self):
+        self.scheduler.append("Gysin IA", "", "#F0FFF0")
+        for delta in ("Olá", ", tudo", " bem?"):
+            self.scheduler.append_to_last(delta)
+        self.scheduler.flush()
+        self.assertEqual(self.inserts, [(0, 0)])
+        self.assertEqual(self.changes, [])
+        self.assertEqual(self.model.message(0).text, "Olá, tudo bem?")
+
+    def test_deltas_follow_their_bubble(self):
+        bubble = self.scheduler.append("Gysin IA", "Olá", "#F0FFF0")
+        self.scheduler.append("Sistema", "aviso")
+        self.scheduler.append_to(bubble, ", tudo")
+        self.scheduler.flush()
+        self.scheduler.append("Você", "oi")
+        self.scheduler.append_to(bubble, " bem?")
+        self.scheduler.flush()
+        self.assertEqual([self.model.message(row).text for row in range(3)],
+                         ["Olá, tudo bem?", "aviso", "oi"])
+        self.assertEqual(self.changes, [0])
+
+    def test_deltas_to_shown_bubble_are_one_edit(self):
+        self.scheduler.append("Gysin IA", "Olá")
+        self.scheduler.flush()
+        for delta in (",", " tudo", " bem?"):
+            self.scheduler.append_to_last(delta)
+        self.scheduler.append("Sistema", "fim")
+        self.scheduler.flush()
+        self.assertEqual(self.changes, [0])
+        self.assertEqual(self.inserts, [(0, 0), (1, 1)])
+        self.assertEqual(self.model.message(0).text, "Olá, tudo bem?")
+        stats = self.scheduler.stats()
+        self.assertEqual(stats["max_per_frame"], 4)
+        self.assertEqual(stats["mean_per_frame"], 2.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
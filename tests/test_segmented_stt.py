@@ -0,0 +1,111 @@
+# tests/test_segmented_stt.py
+
+import os
+import sys
+import time
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.segmented_stt import stitch, PauseSegmenter, SegmentedTranscriber
+
+RATE = 16000
+
+
+def noise(seconds, amplitude=60, seed=0):
+    """Ruído de fundo de baixa amplitude."""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, amplitude, int(RATE * seconds)).astype(np.int16)
+
+
+def voice(seconds, amplitude=6000, frequency=180):
+    """Tom harmônico que imita um trecho vozeado."""
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16) + noise(seconds, seed=1)
+
+
+def words(count):
+    """Fala contínua: trechos vozeados de 0,5 s separados por 0,1 s (sem pausas)."""
+    return np.concatenate([np.concatenate((voice(0.5), noise(0.1))) for _ in range(count)])
+
+
+def feed_in_chunks(target, samples, chunk=1024):
+    """Alimenta o segmentador em blocos; retorna os trechos fechados."""
+    segments = []
+    for offset in range(0, len(samples), chunk):
+        segments.extend(target.feed(samples[offset:offset + chunk]) or [])
+    return segments
+
+
+class TestStitch(unittest.TestCase):
+
+    def test_removes_overlap(self):
+        self.assertEqual(stitch(["Qual é a previsão", "previsão do tempo amanhã?"]),
+                         "Qual é a previsão do tempo amanhã?")
+
+    def test_overlap_ignores_case_and_punctuation(self):
+        self.assertEqual(stitch(["Bom dia, tudo bem.", "Tudo bem? Sim."]), "Bom dia, tudo bem. Sim.")
+
+    def test_keeps_distinct_texts_and_skips_empty(self):
+        self.assertEqual(stitch(["Primeiro trecho.", "", "Segundo trecho."]),
+                         "Primeiro trecho. Segundo trecho.")
+
+
+class TestPauseSegmenter(unittest.TestCase):
+
+    def test_cuts_at_pauses_after_minimum(self):
+        segmenter = PauseSegmenter(RATE, min_segment_ms=2000)
+        audio = np.concatenate((noise(0.5), voice(2.5), noise(0.6), voice(0.5), noise(0.2),
+                                voice(2.0), noise(0.6)))
+        segments = feed_in_chunks(segmenter, audio)
+        # A pausa curta (0,2 s) e a pausa antes do mínimo não cortam
+        self.assertEqual(len(segments), 2)
+        self.assertAlmostEqual(len(segments[0]) / RATE, 2.8, delta=0.1)
+        self.assertIsNone(segmenter.flush())
+
+    def test_forced_cut_with_overlap(self):
+        segmenter = PauseSegmenter(RATE, min_segment_ms=1000, max_segment_ms=3000, overlap_ms=300)
+        segments = feed_in_chunks(segmenter, np.concatenate((noise(0.5), words(7), noise(0.2))))
+        self.assertEqual(len(segments), 1)
+        # Corte forçado aos 3 s, com a margem de 0,15 s antes do início da fala
+        self.assertAlmostEqual(len(segments[0]) / RATE, 2.65, delta=0.05)
+        last = segmenter.flush()
+        # Do início da sobreposição (2,7 s) ao fim da fala (4,6 s) mais a margem final
+        self.assertAlmostEqual(len(last) / RATE, 2.05, delta=0.1)
+
+    def test_silence_only(self):
+        segmenter = PauseSegmenter(RATE)
+        self.assertEqual(feed_in_chunks(segmenter, noise(3.0)), [])
+        self.assertIsNone(segmenter.flush())
+
+
+class TestSegmentedTranscriber(unittest.TestCase):
+
+    def test_transcribes_during_recording_in_order(self):
+        started = []
+        lock = threading.Lock()
+
+        def transcribe(audio):
+            with lock:
+                index = len(started)
+                started.append(time.monotonic())
+            # Trechos anteriores demoram mais: a ordem não pode depender do término
+            time.sleep(0.1 if index == 0 else 0.01)
+            return f"trecho{index}"
+
+        transcriber = SegmentedTranscriber(transcribe, RATE,
+                                           segmenter=PauseSegmenter(RATE, min_segment_ms=1000))
+        feed_in_chunks(transcriber, noise(0.5))
+        for _ in range(2):
+            feed_in_chunks(transcriber, np.concatenate((voice(1.2), noise(0.5))))
+        feed_in_chunks(transcriber, np.concatenate((voice(1.2), noise(0.2))))
+        # Os dois primeiros trechos já foram enviados antes do fim da gravação
+        self.assertEqual(transcriber.segment_count, 2)
+        self.assertEqual(transcriber.finish(), "trecho0 trecho1 trecho2")
+
+
+if __name__ == '__main__':
+    unittest.main()
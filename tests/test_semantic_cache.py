@@ -0,0 +1,105 @@
+# tests/test_semantic_cache.py
+
+import os
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.semantic_cache import HashingEmbedder, OpenAIEmbedder, SemanticCache
+
+
+class TestHashingEmbedder(unittest.TestCase):
+
+    def test_vectors_are_normalized_and_stable(self):
+        embedder = HashingEmbedder(dim=256)
+        vectors = embedder.embed(["Bom dia!", "bom dia", ""])
+        self.assertEqual(vectors.shape, (3, 256))
+        self.assertAlmostEqual(float(np.linalg.norm(vectors[0])), 1.0, places=5)
+        np.testing.assert_allclose(vectors[0], vectors[1])
+        self.assertFalse(vectors[2].any())
+
+    def test_similar_prompts_score_higher(self):
+        embedder = HashingEmbedder()
+        base, similar, other = embedder.embed(["Que horas são?", "que horas sao agora", "Conte uma piada"])
+        self.assertGreater(base @ similar, base @ other)
+
+
+class TestOpenAIEmbedder(unittest.TestCase):
+
+    def test_embed_uses_call_policy_timeout(self):
+        calls = []
+
+        def create(**kwargs):
+            calls.append(kwargs)
+            return SimpleNamespace(data=[SimpleNamespace(embedding=[3.0, 4.0])])
+
+        client = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+        vectors = OpenAIEmbedder(client=client).embed(iter(["olá"]))
+        np.testing.assert_allclose(vectors, [[0.6, 0.8]])
+        self.assertEqual(calls[0]["input"], ["olá"])
+        self.assertGreater(calls[0]["timeout"], 0)
+
+
+class TestSemanticCache(unittest.TestCase):
+
+    def setUp(self):
+        self.embedder = HashingEmbedder(dim=256)
+
+    def test_lookup_respects_threshold(self):
+        cache = SemanticCache(self.embedder, threshold=0.9)
+        cache.add("Bom dia, Gysin!", "Bom dia! Como posso ajudar?")
+        self.assertEqual(cache.lookup("bom dia gysin"), "Bom dia! Como posso ajudar?")
+        self.assertIsNone(cache.lookup("Qual é a capital da Suíça?"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lookup_is_scoped_to_context(self):
+        cache = SemanticCache(self.embedder, threshold=0.9)
+        cache.add("E amanhã?", "Amanhã vai chover.", context="user: Como está o tempo hoje?")
+        self.assertIsNone(cache.lookup("E amanhã?"))
+        self.assertIsNone(cache.lookup("E amanhã?", context="user: Que dia é hoje?"))
+        self.assertEqual(cache.lookup("e amanha", context="user: Como está o tempo hoje?"),
+                         "Amanhã vai chover.")
+
+    def test_search_returns_top_k_in_order(self):
+        cache = SemanticCache(self.embedder)
+        for prompt in ["Bom dia", "Boa tarde", "Boa noite", "Conte uma piada"]:
+            cache.add(prompt, prompt.upper())
+        results = cache.search("Boa noite!", k=2)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0][1], "Boa noite")
+        self.assertGreaterEqual(results[0][0], results[1][0])
+
+    def test_capacity_evicts_least_recently_used(self):
+        cache = SemanticCache(self.embedder, threshold=0.99, capacity=2)
+        cache.add("primeira pergunta", "1")
+        cache.add("segunda pergunta", "2")
+        self.assertEqual(cache.lookup("primeira pergunta"), "1")
+        cache.add("terceira pergunta", "3")
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.lookup("primeira pergunta"), "1")
+        self.assertIsNone(cache.lookup("segunda pergunta"))
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "cache")
+            cache = SemanticCache(self.embedder, path=path)
+            cache.add("Que horas são?", "Não tenho acesso ao relógio.")
+            cache.add("E amanhã?", "Amanhã vai chover.", context="user: Vai chover hoje?")
+            cache.save()
+
+            restored = SemanticCache(self.embedder, path=path)
+            self.assertEqual(len(restored), 2)
+            self.assertEqual(restored.lookup("que horas sao"), "Não tenho acesso ao relógio.")
+            self.assertEqual(restored.lookup("E amanhã?", context="user: Vai chover hoje?"), "Amanhã vai chover.")
+
+            incompatible = SemanticCache(HashingEmbedder(dim=128), path=path)
+            self.assertEqual(len(incompatible), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
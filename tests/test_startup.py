@@ -0,0 +1,53 @@
+# tests/test_startup.py
+
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.startup_profile import StartupProfile, FIRST_PAINT, HEAVY_MODULES
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class TestLazyImports(unittest.TestCase):
+
+    def loaded_after_import(self, module):
+        """Importa um módulo em um processo novo e retorna os módulos pesados carregados."""
+        code = (f"import sys, json; import {module}; "
+                f"print(json.dumps([m for m in {list(HEAVY_MODULES)!r} if m in sys.modules]))")
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                                text=True, check=True, env={**os.environ, "QT_QPA_PLATFORM": "offscreen"})
+        return json.loads(output.stdout.strip().splitlines()[-1])
+
+    def test_main_window_defers_heavy_modules(self):
+        self.assertEqual(self.loaded_after_import("gui.main_window"), [])
+
+    def test_api_modules_do_not_create_clients_on_import(self):
+        loaded = self.loaded_after_import("api.openai_stt, api.openai_tts")
+        self.assertNotIn("openai", loaded)
+
+
+class TestStartupProfile(unittest.TestCase):
+
+    def test_marks_and_report(self):
+        profile = StartupProfile(start=0.0)
+        profile.mark("importações")
+        profile.mark(FIRST_PAINT)
+        self.assertIsNotNone(profile.elapsed(FIRST_PAINT))
+        self.assertIsNone(profile.elapsed("api pronto"))
+        report = profile.report(budget_ms=float("inf"))
+        self.assertIn("importações", report)
+        self.assertIn("dentro do orçamento", report)
+
+    def test_report_flags_budget_overrun(self):
+        profile = StartupProfile(start=0.0)
+        profile.marks.append((FIRST_PAINT, 450.0))
+        self.assertIn("ACIMA DO ORÇAMENTO", profile.report(budget_ms=300))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+# tests/test_stt_backends.py
+
+import os
+import sys
+import json
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+os.environ.setdefault('OPENAI_API_KEY', 'sk-test')
+
+from api.stt_backends import VoskSTTStream, OpenAISTTBackend, select_backends
+
+
+class FakeRecognizer:
+    """Reconhecedor que devolve uma sequência de eventos (parcial ou final)."""
+
+    def __init__(self, events, final=""):
+        self.events = list(events)
+        self.final = final
+
+    def AcceptWaveform(self, data):
+        self.current = self.events.pop(0)
+        return self.current[0] == "final"
+
+    def Result(self):
+        return json.dumps({"text": self.current[1]})
+
+    def PartialResult(self):
+        return json.dumps({"partial": self.current[1]})
+
+    def FinalResult(self):
+        return json.dumps({"text": self.final})
+
+
+class TestVoskSTTStream(unittest.TestCase):
+
+    def test_partials_and_final_text(self):
+        recognizer = FakeRecognizer(
+            [("partial", "qual"), ("partial", "qual"), ("partial", "qual é"),
+             ("final", "qual é a hora"), ("partial", "em zurique")],
+            final="em zurique"
+        )
+        stream = VoskSTTStream(recognizer)
+        frame = np.zeros(1024, dtype=np.int16)
+        hypotheses = [stream.feed(frame) for _ in range(5)]
+        self.assertEqual(hypotheses, ["qual", None, "qual é", "qual é a hora", "qual é a hora em zurique"])
+        self.assertEqual(stream.finish(), "qual é a hora em zurique")
+
+
+class TestSelectBackends(unittest.TestCase):
+
+    def test_openai_mode(self):
+        final, live = select_backends("pt", mode="openai")
+        self.assertEqual(final.name, "openai")
+        self.assertIsNone(live)
+
+    def test_vosk_mode(self):
+        final, live = select_backends("pt", mode="vosk")
+        self.assertIs(final, live)
+        self.assertEqual(final.name, "vosk")
+
+    def test_hybrid_mode(self):
+        final, live = select_backends("en", mode="hybrid")
+        self.assertEqual((final.name, live.name), ("openai", "vosk"))
+
+    def test_unsupported_language_uses_openai(self):
+        final, live = select_backends("ja", mode="vosk")
+        self.assertEqual(final.name, "openai")
+        self.assertIsNone(live)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            select_backends("pt", mode="inexistente")
+
+
+class TestOpenAISTTBackend(unittest.TestCase):
+
+    def test_passes_timeout(self):
+        with patch('api.openai_stt.transcribe_audio', return_value=("olá", "pt")) as transcribe:
+            text = OpenAISTTBackend(timeout=5).transcribe("audio.wav", "pt")
+        self.assertEqual(text, "olá")
+        self.assertEqual(text.language, "pt")
+        transcribe.assert_called_once_with("audio.wav", language="pt", timeout=5, verbose=True)
+
+    def test_auto_detect_reports_whisper_language(self):
+        with patch('api.openai_stt.transcribe_audio', return_value=("hello", "en")) as transcribe:
+            text = OpenAISTTBackend(auto_detect=True).transcribe("audio.wav", "pt")
+        self.assertEqual(text.language, "en")
+        self.assertIsNone(transcribe.call_args.kwargs["language"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# tests/test_telemetry.py
+
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+import urllib.request
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.telemetry import Telemetry, NULL_SPAN, SPAN_METRIC, notify_first
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.trace_path = os.path.join(self.directory.name, "trace.jsonl")
+        self.telemetry = Telemetry(trace_path=self.trace_path)
+        self.addCleanup(self.telemetry.close)
+
+    def read_trace(self):
+        self.telemetry.close()
+        with open(self.trace_path, encoding="utf-8") as trace_file:
+            return [json.loads(line) for line in trace_file]
+
+    def test_spans_are_nested_and_exported(self):
+        with self.telemetry.span("turn", language="pt") as turn:
+            with self.telemetry.span("stt.transcribe") as stt:
+                stt.set(chars=12)
+        records = self.read_trace()
+        self.assertEqual([record["name"] for record in records], ["stt.transcribe", "turn"])
+        self.assertEqual(records[0]["parent_id"], turn.span_id)
+        self.assertIsNone(records[1]["parent_id"])
+        self.assertEqual(records[0]["attributes"], {"chars": 12})
+        self.assertEqual(records[1]["attributes"], {"language": "pt"})
+        self.assertGreaterEqual(records[1]["duration_ms"], records[0]["duration_ms"])
+
+    def test_span_records_error_and_ends_once(self):
+        with self.assertRaises(ValueError):
+            with self.telemetry.span("falha"):
+                raise ValueError()
+        span = self.telemetry.span("manual")
+        span.end()
+        span.end()
+        records = self.read_trace()
+        self.assertEqual(records[0]["attributes"], {"error": "ValueError"})
+        self.assertEqual(len(records), 2)
+
+    def test_prometheus_exposition(self):
+        self.telemetry.count("turns_total", trigger="wake_word")
+        self.telemetry.count("turns_total", trigger="wake_word")
+        self.telemetry.observe("ttft_ms", 80)
+        self.telemetry.observe("ttft_ms", 700)
+        text = self.telemetry.render_prometheus()
+        self.assertIn("# TYPE gysin_turns_total counter", text)
+        self.assertIn('gysin_turns_total{trigger="wake_word"} 2', text)
+        self.assertIn('gysin_ttft_ms_bucket{le="100"} 1', text)
+        self.assertIn('gysin_ttft_ms_bucket{le="1000"} 2', text)
+        self.assertIn('gysin_ttft_ms_bucket{le="+Inf"} 2', text)
+        self.assertIn("gysin_ttft_ms_sum 780.000", text)
+
+        path = os.path.join(self.directory.name, "metrics.prom")
+        self.telemetry.dump_metrics(path)
+        with open(path, encoding="utf-8") as metrics_file:
+            self.assertEqual(metrics_file.read(), text)
+
+    def test_metrics_endpoint(self):
+        self.telemetry.observe("ttfa_ms", 420)
+        port = self.telemetry.serve_metrics(0)
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            body = response.read().decode("utf-8")
+        self.assertIn("gysin_ttfa_ms_count 1", body)
+
+    def test_latest_values(self):
+        with self.telemetry.span("audio.record"):
+            pass
+        self.telemetry.observe("ttft_ms", 120)
+        self.telemetry.observe("ttft_ms", 95)
+        latest = self.telemetry.latest()
+        self.assertEqual(latest["ttft_ms"], 95)
+        self.assertIn("span:audio.record", latest)
+
+    def test_disabled_is_a_no_op(self):
+        telemetry = Telemetry()
+        span = telemetry.span("turn")
+        self.assertIs(span, NULL_SPAN)
+        with span:
+            span.set(chars=1)
+        telemetry.count("turns_total")
+        telemetry.observe("ttft_ms", 10)
+        self.assertEqual(telemetry.counters, {})
+        self.assertEqual(telemetry.histograms, {})
+
+        started = time.perf_counter()
+        for _ in range(100000):
+            with telemetry.span("turn"):
+                pass
+        self.assertLess((time.perf_counter() - started) / 100000, 20e-6)
+
+    def test_span_durations_feed_histogram(self):
+        with self.telemetry.span("tts.stream"):
+            time.sleep(0.01)
+        histogram = self.telemetry.histograms[(SPAN_METRIC, (("span", "tts.stream"),))]
+        self.assertEqual(histogram.count, 1)
+        self.assertGreaterEqual(histogram.last, 10)
+
+    def test_notify_first(self):
+        calls = []
+        items = list(notify_first(iter([b"a", b"b"]), lambda: calls.append(len(calls))))
+        self.assertEqual(items, [b"a", b"b"])
+        self.assertEqual(calls, [0])
+        self.assertEqual(list(notify_first([], lambda: calls.append(1))), [])
+        self.assertEqual(calls, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,14 +2,31 @@
 
 import sys
 import os
+import tempfile
 import unittest
+from unittest import mock
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from api.openai_tts import text_to_speech
+from api import openai_tts
+from api.openai_tts import text_to_speech, stream_speech, TTSCache
+from tests.openai_stub import start_shared_stub, synthesize_pcm
 
 class TestTextToSpeech(unittest.TestCase):
 
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = start_shared_stub()
+
+    def setUp(self):
+        self.stub.reset()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        cache = TTSCache(os.path.join(self.directory.name, "cache"))
+        patcher = mock.patch.object(openai_tts, "tts_cache", cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_text_to_speech_multilingual(self):
         texts = {
             'pt-BR': "Olá, este é um teste em Português Brasileiro.",
@@ -19,10 +36,22 @@ class TestTextToSpeech(unittest.TestCase):
         }
 
         for lang_code, text in texts.items():
-            output_file = f"test_audio_{lang_code}.mp3"
+            output_file = os.path.join(self.directory.name, f"test_audio_{lang_code}.mp3")
             text_to_speech(text, output_file, language_code=lang_code)
             self.assertTrue(os.path.exists(output_file), f"Arquivo de áudio não foi criado para {lang_code}")
-            os.remove(output_file)  # Limpa o arquivo de teste após a verificação
+            self.assertGreater(os.path.getsize(output_file), 0)
+
+    def test_stream_speech(self):
+        text = "Olá, este é um teste."
+        audio = b"".join(stream_speech(text, language_code='pt'))
+        self.assertEqual(audio, synthesize_pcm(text))
+        self.assertEqual(self.stub.requests[-1][1]["response_format"], "pcm")
+
+    def test_empty_stream_is_not_cached(self):
+        with mock.patch("tests.openai_stub.synthesize_pcm", return_value=b""):
+            self.assertEqual(b"".join(stream_speech("Silêncio.", language_code='pt')), b"")
+        self.assertEqual(b"".join(stream_speech("Silêncio.", language_code='pt')), synthesize_pcm("Silêncio."))
+        self.assertEqual(len(self.stub.requests), 2)
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
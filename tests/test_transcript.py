@@ -0,0 +1,122 @@
+# tests/test_transcript.py
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+from gui.transcript import ChatMessage, TranscriptStore, TranscriptModel, TranscriptView
+
+
+class TestTranscriptStore(unittest.TestCase):
+
+    def setUp(self):
+        self.store = TranscriptStore(memory_size=10, page_size=5)
+
+    def tearDown(self):
+        self.store.close()
+
+    def fill(self, count):
+        for i in range(count):
+            self.store.append(ChatMessage("Você", f"mensagem {i}", "#E6F3FF"))
+
+    def test_spills_oldest_pages_to_disk(self):
+        self.fill(32)
+        self.assertEqual(len(self.store), 32)
+        self.assertEqual(self.store.spilled, 20)
+        self.assertEqual(len(os.listdir(self.store.directory)), 4)
+
+    def test_reads_back_spilled_messages(self):
+        self.fill(32)
+        message = self.store[3]
+        self.assertEqual(message.text, "mensagem 3")
+        self.assertEqual(message.background, "#E6F3FF")
+        self.assertEqual(self.store[-1].text, "mensagem 31")
+        with self.assertRaises(IndexError):
+            self.store[32]
+
+    def test_clear_and_close_remove_pages(self):
+        self.fill(32)
+        directory = self.store.directory
+        self.store.clear()
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(os.listdir(directory), [])
+        self.store.close()
+        self.assertFalse(os.path.exists(directory))
+
+    def test_keeps_external_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = TranscriptStore(memory_size=2, page_size=2, directory=directory)
+            for i in range(6):
+                store.append(ChatMessage("Sistema", str(i)))
+            store.close()
+            self.assertTrue(os.path.isdir(directory))
+
+
+class TestTranscriptModel(unittest.TestCase):
+
+    def setUp(self):
+        self.model = TranscriptModel(TranscriptStore(memory_size=10, page_size=5), max_rows=8)
+
+    def tearDown(self):
+        self.model.store.close()
+
+    def test_append_trims_rows_while_following_tail(self):
+        for i in range(20):
+            self.model.append_message("Você", f"mensagem {i}")
+        self.assertEqual(self.model.rowCount(), 8)
+        self.assertEqual(self.model.message(0).text, "mensagem 12")
+        self.assertEqual(self.model.data(self.model.index(7)), "Você: mensagem 19")
+
+    def test_load_older_reads_from_disk(self):
+        for i in range(30):
+            self.model.append_message("Você", f"mensagem {i}")
+        self.assertEqual(self.model.load_older(10), 10)
+        self.assertEqual(self.model.rowCount(), 18)
+        self.assertEqual(self.model.message(0).text, "mensagem 12")
+        self.model.load_older(100)
+        self.assertFalse(self.model.can_load_older())
+        self.assertEqual(self.model.message(0).text, "mensagem 0")
+
+    def test_no_trim_while_reading_history(self):
+        self.model.follow_tail = False
+        for i in range(20):
+            self.model.append_message("Você", f"mensagem {i}")
+        self.assertEqual(self.model.rowCount(), 20)
+
+    def test_append_to_last_updates_row(self):
+        changed = []
+        self.model.dataChanged.connect(lambda top_left, bottom_right, roles: changed.append(top_left.row()))
+        self.model.append_message("Gysin IA", "", "#F0FFF0")
+        self.model.append_to_last("Olá")
+        self.model.append_to_last(", tudo bem?")
+        self.assertEqual(self.model.message(0).text, "Olá, tudo bem?")
+        self.assertEqual(changed, [0, 0])
+
+
+class TestTranscriptView(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QApplication.instance() or QApplication([])
+
+    def test_view_follows_tail(self):
+        view = TranscriptView()
+        view.resize(400, 300)
+        view.show()
+        for i in range(50):
+            view.transcript.append_message("Você", f"mensagem {i} " * 10, "#E6F3FF")
+        self.app.processEvents()
+        scroll_bar = view.verticalScrollBar()
+        self.assertGreater(scroll_bar.maximum(), 0)
+        self.assertEqual(scroll_bar.value(), scroll_bar.maximum())
+        view.close_transcript()
+        view.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# tests/test_tts_cache.py
+
+import os
+import sys
+import time
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from api import openai_tts
+from api.openai_tts import TTSCache
+
+
+class TestTTSCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = TTSCache(self.temp_dir.name, max_bytes=1000, ttl_seconds=60)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_key_normalizes_text(self):
+        key_a = self.cache.make_key("Olá,  mundo!\n", "onyx", "tts-1", "pcm", 1.0)
+        key_b = self.cache.make_key("Olá, mundo!", "onyx", "tts-1", "pcm", 1)
+        key_c = self.cache.make_key("Olá, mundo!", "alloy", "tts-1", "pcm", 1.0)
+        self.assertEqual(key_a, key_b)
+        self.assertNotEqual(key_a, key_c)
+
+    def test_hit_and_miss_stats(self):
+        key = self.cache.make_key("Bom dia", "onyx", "tts-1", "pcm", 1.0)
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, b"audio")
+        self.assertEqual(self.cache.get(key), b"audio")
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["bytes_read"], 5)
+        self.assertEqual(stats["bytes_written"], 5)
+
+    def test_lru_eviction(self):
+        keys = [self.cache.make_key(f"texto {i}", "onyx", "tts-1", "pcm", 1.0) for i in range(3)]
+        self.cache.put(keys[0], b"a" * 400)
+        self.cache.put(keys[1], b"b" * 400)
+        # Marca o primeiro item como usado mais recentemente
+        os.utime(self.cache._path(keys[1]), (time.time() - 100, time.time()))
+        self.cache.get(keys[0])
+        self.cache.put(keys[2], b"c" * 400)
+
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_ttl_expiration(self):
+        key = self.cache.make_key("antigo", "onyx", "tts-1", "pcm", 1.0)
+        self.cache.put(key, b"audio")
+        old = time.time() - 120
+        os.utime(self.cache._path(key), (old, old))
+        self.assertIsNone(self.cache.get(key))
+        self.assertFalse(self.cache._path(key).exists())
+
+
+class TestStreamSpeechCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = TTSCache(self.temp_dir.name)
+        patcher = mock.patch.object(openai_tts, "tts_cache", self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_second_call_is_served_from_cache(self):
+        response = mock.MagicMock()
+        response.__enter__.return_value.iter_bytes.return_value = [b"\x01\x02", b"\x03\x04"]
+        create = mock.Mock(return_value=response)
+        with mock.patch.object(openai_tts.get_client().audio.speech.with_streaming_response, "create", create):
+            first = b"".join(openai_tts.stream_speech("Olá!", chunk_size=2))
+            second = b"".join(openai_tts.stream_speech("Olá!", chunk_size=2))
+
+        self.assertEqual(first, b"\x01\x02\x03\x04")
+        self.assertEqual(second, first)
+        self.assertEqual(create.call_count, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+# tests/test_tts_pipeline.py
+
+import os
+import sys
+import time
+import random
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.tts_pipeline import SentenceSegmenter, SpeechPipeline, split_text
+
+
+class TestSentenceSegmenter(unittest.TestCase):
+
+    def test_streamed_deltas_become_sentences(self):
+        segmenter = SentenceSegmenter()
+        text = "Olá! Tudo bem com você hoje? Eu estou ótima, obrigada. Posso ajudar"
+        segments = []
+        for i in range(0, len(text), 3):
+            segments.extend(segmenter.feed(text[i:i + 3]))
+        segments.extend(segmenter.flush())
+        self.assertEqual(segments, [
+            "Olá! Tudo bem com você hoje?",
+            "Eu estou ótima, obrigada.",
+            "Posso ajudar",
+        ])
+
+    def test_long_sentence_is_cut_at_clause(self):
+        segmenter = SentenceSegmenter(soft_max_chars=40)
+        segments = segmenter.feed("Primeiro fazemos isto, depois fazemos aquilo e por fim terminamos tudo")
+        self.assertEqual(segments, ["Primeiro fazemos isto,"])
+
+    def test_split_text_respects_api_limit(self):
+        sentence = "Esta é uma frase de teste com algumas palavras. "
+        text = sentence * 200
+        chunks = split_text(text, max_chars=1000)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) <= 1000 for chunk in chunks))
+        self.assertEqual(" ".join(chunks), text.strip())
+
+    def test_split_text_short_text_single_chunk(self):
+        self.assertEqual(split_text("Oi. Tudo bem?"), ["Oi. Tudo bem?"])
+
+    def test_split_text_without_spaces(self):
+        chunks = split_text("a" * 2500, max_chars=1000)
+        self.assertEqual([len(chunk) for chunk in chunks], [1000, 1000, 500])
+
+
+class TestSpeechPipeline(unittest.TestCase):
+
+    def test_plays_in_order_with_parallel_synthesis(self):
+        played = []
+
+        def synthesize(segment):
+            for word in segment.split():
+                time.sleep(random.uniform(0, 0.01))
+                yield word.upper()
+
+        pipeline = SpeechPipeline(synthesize, lambda chunks: played.append(" ".join(chunks)), max_workers=3)
+        for sentence in ["Primeira frase aqui. ", "Segunda frase aqui. ", "Terceira frase aqui"]:
+            pipeline.feed(sentence)
+        pipeline.close()
+        self.assertTrue(pipeline.wait(timeout=5))
+        self.assertEqual(played, ["PRIMEIRA FRASE AQUI.", "SEGUNDA FRASE AQUI.", "TERCEIRA FRASE AQUI"])
+
+    def test_synthesis_error_skips_segment(self):
+        played = []
+
+        def synthesize(segment):
+            if "falha" in segment:
+                raise RuntimeError("erro simulado")
+            return [segment]
+
+        pipeline = SpeechPipeline(synthesize, lambda chunks: played.append("".join(chunks)))
+        pipeline.feed("Uma frase que falha. Outra frase que funciona.")
+        pipeline.close()
+        self.assertTrue(pipeline.wait(timeout=5))
+        self.assertEqual(played, ["Outra frase que funciona."])
+
+    def test_cancel_stops_playback(self):
+        played = []
+        pipeline = SpeechPipeline(lambda segment: [segment], lambda chunks: (time.sleep(0.05), played.append(list(chunks))))
+        pipeline.feed("Frase número um. Frase número dois. Frase número três. ")
+        time.sleep(0.02)
+        pipeline.cancel()
+        self.assertTrue(pipeline.wait(timeout=5))
+        self.assertLess(len(played), 3)
+
+    def test_first_chunk_plays_before_synthesis_ends(self):
+        events = []
+
+        def synthesize(segment):
+            yield b"a"
+            time.sleep(0.1)
+            events.append("synthesis-end")
+            yield b"b"
+
+        def play(chunks):
+            for chunk in chunks:
+                events.append(chunk)
+
+        pipeline = SpeechPipeline(synthesize, play)
+        pipeline.feed("Uma frase qualquer.")
+        pipeline.close()
+        self.assertTrue(pipeline.wait(timeout=5))
+        self.assertEqual(events, [b"a", "synthesis-end", b"b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# tests/test_vosk_activation.py
+
+import os
+import sys
+import json
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.vosk_activation import VoskWakeWordDetector, detect_wake_word
+from utils.wake_word import BACKENDS, get_wake_word_detector
+
+
+class FakeRecognizer:
+    """Reconhecedor que devolve uma sequência de resultados parciais."""
+
+    def __init__(self, model, sample_rate, grammar):
+        self.grammar = json.loads(grammar)
+        self.partials = []
+        self.resets = 0
+
+    def AcceptWaveform(self, data):
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": self.partials.pop(0) if self.partials else ""})
+
+    def Reset(self):
+        self.resets += 1
+
+
+class TestVoskWakeWordDetector(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch('vosk.KaldiRecognizer', FakeRecognizer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.detector = VoskWakeWordDetector(model=None)
+        self.frame = np.zeros(800, dtype=np.int16)
+
+    def test_grammar_is_restricted(self):
+        self.assertEqual(self.detector.recognizer.grammar, ["bom dia", "[unk]"])
+
+    def test_detects_phrase_across_frames(self):
+        self.detector.recognizer.partials = ["", "bom", "bom dia"]
+        results = [self.detector.process(self.frame) for _ in range(3)]
+        self.assertEqual(results, [False, False, True])
+        self.assertEqual(self.detector.recognizer.resets, 1)
+
+    def test_ignores_unknown_speech(self):
+        self.detector.recognizer.partials = ["[unk]", "[unk] [unk]"]
+        self.assertFalse(self.detector.process(self.frame))
+        self.assertFalse(self.detector.process(self.frame.tobytes()))
+
+
+class TestDetectWakeWord(unittest.TestCase):
+
+    def test_model_error_is_raised(self):
+        # Uma falha não pode parecer "nenhuma detecção": o laço de escuta tentaria de novo sem pausa
+        with patch('utils.vosk_activation.load_model', side_effect=RuntimeError("modelo ausente")):
+            with self.assertRaises(RuntimeError):
+                detect_wake_word(SimpleNamespace(sample_rate=16000))
+
+
+class TestWakeWordBackend(unittest.TestCase):
+
+    def test_selects_vosk(self):
+        detect = get_wake_word_detector("vosk")
+        self.assertEqual(detect.__module__, "utils.vosk_activation")
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_wake_word_detector("inexistente")
+
+    def test_backends_resolve_off_main_thread(self):
+        # A interface resolve o mecanismo na thread de detecção, não na principal
+        results = {}
+
+        def resolve(backend):
+            try:
+                results[backend] = get_wake_word_detector(backend)
+            except Exception as e:
+                results[backend] = e
+
+        for backend in BACKENDS:
+            thread = threading.Thread(target=resolve, args=(backend,))
+            thread.start()
+            thread.join()
+        for backend, result in results.items():
+            with self.subTest(backend=backend):
+                if isinstance(result, ModuleNotFoundError):
+                    self.skipTest(f"dependência ausente: {result.name}")
+                self.assertTrue(callable(result), result)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# tests/test_workers.py
+
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtCore import QCoreApplication, QEventLoop, QThreadPool, QTimer
+from gui.workers import Worker
+
+
+class TestWorker(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def run_worker(self, fn, *args):
+        """Executa o worker e processa eventos até a finalização."""
+        events = []
+        worker = Worker(fn, *args)
+        worker.signals.progress.connect(lambda text: events.append(("progress", text)))
+        worker.signals.result.connect(lambda value: events.append(("result", value)))
+        worker.signals.error.connect(lambda message: events.append(("error", message)))
+
+        loop = QEventLoop()
+        worker.signals.finished.connect(loop.quit)
+        QTimer.singleShot(5000, loop.quit)
+        QThreadPool.globalInstance().start(worker)
+        loop.exec()
+        return events
+
+    def test_result_and_progress(self):
+        def job(value, progress_callback):
+            progress_callback("processando")
+            return value * 2
+
+        events = self.run_worker(job, 21)
+        self.assertIn(("progress", "processando"), events)
+        self.assertEqual(events[-1], ("result", 42))
+
+    def test_error_is_reported(self):
+        def job(progress_callback):
+            raise ValueError("falhou")
+
+        events = self.run_worker(job)
+        self.assertEqual(events, [("error", "falhou")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,11 +16,14 @@ import traceback
 import numpy as np
 import signal
 import sys
+import threading
 import os
-from dotenv import load_dotenv
+import time
+from utils.env import load_environment
+from utils.telemetry import telemetry
 
 # Carrega as variáveis de ambiente do arquivo .env
-load_dotenv()
+load_environment()
 
 # Configuração global de logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -62,14 +65,36 @@ def signal_handler(sig, frame):
     cleanup_audio(pa, stream, porcupine)
     sys.exit(0)
 
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
+def install_signal_handlers():
+    """
+    Instala a limpeza dos recursos em SIGINT/SIGTERM, para uso do módulo como script.
 
-def detect_wake_word():
+    Não é feito na importação: a interface importa este módulo na thread de detecção,
+    e ``signal.signal`` só pode ser chamado na thread principal.
+
+    :return: True se os manipuladores foram instalados, False fora da thread principal.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+    return True
+
+def detect_wake_word(subscription=None):
+    """
+    Escuta o microfone até a palavra-chave ser detectada.
+
+    :param subscription: Assinatura opcional do AudioCaptureService (16 kHz); sem ela,
+        um stream próprio é aberto e fechado a cada chamada.
+    :return: True quando a palavra-chave foi detectada, False em caso de erro.
+    """
     global pa, stream, porcupine
     porcupine = None
     pa = None
     stream = None
+    span = None
+    frames = 0
+    detected = False
     
     try:
         # Carrega a chave de acesso do Porcupine do arquivo .env
@@ -79,16 +104,31 @@ def detect_wake_word():
         
         # Inicializa o Porcupine com a palavra-chave desejada
         porcupine = pvporcupine.create(access_key=access_key, keywords=["jarvis"])
-        pa, stream = initialize_audio(porcupine)
+        if subscription is None:
+            pa, stream = initialize_audio(porcupine)
+        elif subscription.sample_rate != porcupine.sample_rate:
+            raise RuntimeError(f"O Porcupine requer áudio a {porcupine.sample_rate} Hz.")
         
         logging.info("Aguardando a palavra-chave...")
+        span = telemetry.span("wake_word.listen", backend="porcupine")
 
         while True:
             try:
-                pcm = stream.read(porcupine.frame_length, exception_on_overflow=False)
-                pcm = np.frombuffer(pcm, dtype=np.int16)
+                if subscription is not None:
+                    pcm = subscription.read(porcupine.frame_length)
+                    if pcm is None:
+                        return False
+                else:
+                    pcm = stream.read(porcupine.frame_length, exception_on_overflow=False)
+                    pcm = np.frombuffer(pcm, dtype=np.int16)
+                started = time.perf_counter()
                 result = porcupine.process(pcm)
+                frames += 1
                 if result >= 0:
+                    # Tempo de processamento do frame que disparou a detecção
+                    telemetry.observe("wake_word_process_ms", 1000 * (time.perf_counter() - started))
+                    telemetry.count("wake_word_detections_total", backend="porcupine")
+                    detected = True
                     logging.info("Palavra-chave detectada!")
                     return True
             except IOError as e:
@@ -101,5 +141,8 @@ def detect_wake_word():
     except Exception as e:
         logging.error(f"Ocorreu um erro inesperado: {e}. {traceback.format_exc()}")
     finally:
+        # Encerra o span também quando a assinatura é fechada ou ocorre um erro
+        if span is not None:
+            span.end(frames=frames, detected=detected)
         cleanup_audio(pa, stream, porcupine)
     return False
\ No newline at end of file
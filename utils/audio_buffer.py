@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: audio_buffer
+
+Este módulo implementa o buffer de áudio em memória compartilhado pela captura,
+pela transcrição e pela detecção de palavra-chave. As amostras ficam em um array
+NumPy int16 e são serializadas em WAV (ou FLAC) diretamente para um BytesIO, sem
+cópias intermediárias e sem arquivos temporários.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 15:40 (horário de Zurique)
+"""
+
+import io
+import wave
+import numpy as np
+
+try:
+    import soundfile
+except ImportError:  # Dependência opcional, necessária apenas para FLAC
+    soundfile = None
+
+# Bytes por amostra de áudio int16
+SAMPLE_WIDTH = 2
+
+
+class AudioBuffer:
+    """
+    Áudio PCM 16 bits em memória, com taxa de amostragem e número de canais.
+    """
+
+    def __init__(self, samples, sample_rate, channels=1):
+        """
+        Inicializa o buffer.
+
+        Args:
+            samples (np.ndarray): Amostras int16 intercaladas (1-D).
+            sample_rate (int): Taxa de amostragem em Hz.
+            channels (int, optional): Número de canais. Padrão é 1.
+        """
+        self.samples = np.asarray(samples, dtype=np.int16).reshape(-1)
+        self.sample_rate = sample_rate
+        self.channels = channels
+
+    @classmethod
+    def from_bytes(cls, data, sample_rate, channels=1):
+        """Cria um buffer a partir de bytes PCM int16 (sem cópia)."""
+        return cls(np.frombuffer(data, dtype=np.int16), sample_rate, channels)
+
+    @classmethod
+    def from_frames(cls, frames, sample_rate, channels=1):
+        """Cria um buffer a partir de uma lista de blocos PCM lidos do microfone."""
+        return cls.from_bytes(b''.join(frames), sample_rate, channels)
+
+    @classmethod
+    def from_wav(cls, source):
+        """
+        Lê um arquivo WAV PCM 16 bits.
+
+        Args:
+            source (str | file): Caminho ou objeto de arquivo binário.
+        """
+        with wave.open(source, 'rb') as wf:
+            if wf.getsampwidth() != SAMPLE_WIDTH:
+                raise ValueError("Apenas áudio WAV PCM de 16 bits é suportado.")
+            return cls.from_bytes(wf.readframes(wf.getnframes()), wf.getframerate(), wf.getnchannels())
+
+    def __len__(self):
+        """Número de frames (amostras por canal)."""
+        return len(self.samples) // self.channels
+
+    @property
+    def duration(self):
+        """Duração do áudio em segundos."""
+        return len(self) / self.sample_rate
+
+    @property
+    def nbytes(self):
+        """Tamanho do áudio PCM em bytes."""
+        return self.samples.nbytes
+
+    def to_wav(self, name="audio.wav"):
+        """
+        Serializa o áudio em WAV em memória.
+
+        Args:
+            name (str, optional): Nome atribuído ao BytesIO (usado pela API para inferir o formato).
+
+        Returns:
+            io.BytesIO: Arquivo WAV posicionado no início.
+        """
+        output = io.BytesIO()
+        with wave.open(output, 'wb') as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(SAMPLE_WIDTH)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(memoryview(np.ascontiguousarray(self.samples)).cast('B'))
+        output.seek(0)
+        output.name = name
+        return output
+
+    def to_flac(self, name="audio.flac"):
+        """
+        Serializa o áudio em FLAC em memória (requer o pacote opcional ``soundfile``).
+
+        Returns:
+            io.BytesIO: Arquivo FLAC posicionado no início.
+
+        Raises:
+            RuntimeError: Se o pacote ``soundfile`` não estiver instalado.
+        """
+        if soundfile is None:
+            raise RuntimeError("A codificação FLAC requer o pacote 'soundfile'.")
+        output = io.BytesIO()
+        soundfile.write(output, self.samples.reshape(-1, self.channels), self.sample_rate,
+                        format='FLAC', subtype='PCM_16')
+        output.seek(0)
+        output.name = name
+        return output
+
+    def save(self, path):
+        """Grava o áudio em um arquivo WAV (útil para depuração)."""
+        with open(path, 'wb') as output:
+            output.write(self.to_wav().getbuffer())
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: audio_capture
+
+Este módulo implementa o serviço de captura de áudio sempre ativo. Um único stream de
+entrada fica aberto e grava frames de tamanho fixo em um buffer circular; detector de
+palavra-chave, gravador e medidores de nível leem o mesmo áudio por assinaturas
+independentes. Uma assinatura pode começar alguns milissegundos no passado
+(pré-gravação), de modo que a gravação após a palavra-chave não perde as primeiras
+palavras.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 17:20 (horário de Zurique)
+"""
+
+import logging
+import threading
+import numpy as np
+
+# Taxa e tamanho de frame compatíveis com Porcupine, Vosk e Whisper
+CAPTURE_SAMPLE_RATE = 16000
+CAPTURE_FRAME_LENGTH = 512
+# Histórico mantido no buffer circular
+CAPTURE_BUFFER_SECONDS = 10
+
+
+class FrameSubscription:
+    """
+    Leitor independente do buffer circular do AudioCaptureService.
+
+    Cada assinatura guarda o seu próprio cursor (número de sequência do próximo frame);
+    se o leitor ficar mais de um buffer inteiro atrasado, os frames sobrescritos são
+    descartados e contados em ``dropped_frames``.
+    """
+
+    def __init__(self, service, cursor, frame_filter=None):
+        """
+        Args:
+            service (AudioCaptureService): Serviço de captura de origem.
+            cursor (int): Número de sequência do primeiro frame a ser lido.
+            frame_filter (callable, optional): Função aplicada a cada frame lido
+                (por exemplo, a supressão de eco).
+        """
+        self.service = service
+        self.frame_filter = frame_filter
+        self.sample_rate = service.sample_rate
+        self.frame_length = service.frame_length
+        self.cursor = cursor
+        self.dropped_frames = 0
+        self.closed = False
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+    def read_frame(self, timeout=None):
+        """
+        Lê o próximo frame, aguardando a captura se necessário.
+
+        Args:
+            timeout (float, optional): Tempo máximo de espera em segundos (None para sempre).
+
+        Returns:
+            np.ndarray: Frame int16 mono, ou None se o tempo esgotou ou a assinatura foi fechada.
+        """
+        if not self.service.wait_for(self, timeout):
+            return None
+        frame, skipped = self.service.get_frame(self.cursor)
+        self.dropped_frames += skipped
+        self.cursor += skipped + 1
+        if self.frame_filter is not None:
+            frame = self.frame_filter(frame)
+        return frame
+
+    def read(self, count, timeout=None):
+        """
+        Lê exatamente ``count`` amostras, juntando ou dividindo frames conforme necessário.
+
+        Args:
+            count (int): Número de amostras.
+            timeout (float, optional): Tempo máximo de espera por frame em segundos.
+
+        Returns:
+            np.ndarray: Amostras int16 mono, ou None se o tempo esgotou ou a assinatura foi fechada.
+        """
+        chunks = [self._remainder]
+        available = len(self._remainder)
+        while available < count:
+            frame = self.read_frame(timeout)
+            if frame is None:
+                self._remainder = np.concatenate(chunks)
+                return None
+            chunks.append(frame)
+            available += len(frame)
+        samples = np.concatenate(chunks)
+        self._remainder = samples[count:]
+        return samples[:count]
+
+    def close(self):
+        """Encerra a assinatura, liberando leitores bloqueados."""
+        self.closed = True
+        self.service.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+
+class AudioCaptureService:
+    """
+    Captura contínua do microfone para um buffer circular de frames de tamanho fixo.
+
+    O stream de entrada é o único escritor: cada frame é copiado para a posição
+    ``sequência % capacidade`` e só então a sequência é incrementada, publicando o
+    frame. Os leitores não bloqueiam o escritor; a condição serve apenas para
+    acordar assinaturas que aguardam novos frames.
+    """
+
+    def __init__(self, sample_rate=CAPTURE_SAMPLE_RATE, frame_length=CAPTURE_FRAME_LENGTH,
+                 buffer_seconds=CAPTURE_BUFFER_SECONDS):
+        """
+        Inicializa o serviço (o dispositivo só é aberto em ``start``).
+
+        Args:
+            sample_rate (int, optional): Taxa de amostragem em Hz. Padrão é 16000.
+            frame_length (int, optional): Amostras por frame. Padrão é 512.
+            buffer_seconds (float, optional): Histórico mantido no buffer. Padrão é 10.
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length
+        self.capacity = max(2, int(buffer_seconds * sample_rate / frame_length))
+        self._frames = np.zeros((self.capacity, frame_length), dtype=np.int16)
+        self._sequence = 0
+        self._pending = np.zeros(0, dtype=np.int16)
+        self._subscriptions = set()
+        self._condition = threading.Condition()
+        self._pa = None
+        self._stream = None
+        self._continue = None
+
+    @property
+    def running(self):
+        """Indica se o stream de entrada está aberto."""
+        return self._stream is not None
+
+    @property
+    def sequence(self):
+        """Número de frames já capturados."""
+        return self._sequence
+
+    def start(self):
+        """Abre o stream de entrada do microfone padrão (uma única vez)."""
+        if self._stream is not None:
+            return
+        import pyaudio
+        self._continue = pyaudio.paContinue
+        self._pa = pyaudio.PyAudio()
+        try:
+            self._stream = self._pa.open(
+                rate=self.sample_rate,
+                channels=1,
+                format=pyaudio.paInt16,
+                input=True,
+                frames_per_buffer=self.frame_length,
+                stream_callback=self._callback
+            )
+        except Exception:
+            self._pa.terminate()
+            self._pa = None
+            raise
+        logging.info(f"Captura de áudio iniciada ({self.sample_rate} Hz, frames de {self.frame_length}).")
+
+    def stop(self):
+        """Fecha o stream de entrada e libera as assinaturas bloqueadas."""
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._pa is not None:
+            self._pa.terminate()
+            self._pa = None
+        for subscription in list(self._subscriptions):
+            subscription.close()
+
+    def subscribe(self, preroll_ms=0, frame_filter=None):
+        """
+        Cria uma assinatura que começa ``preroll_ms`` milissegundos no passado.
+
+        Args:
+            preroll_ms (float, optional): Pré-gravação em milissegundos (limitada ao histórico).
+            frame_filter (callable, optional): Função aplicada a cada frame lido.
+
+        Returns:
+            FrameSubscription: Assinatura posicionada no frame inicial.
+        """
+        preroll_frames = int(np.ceil(preroll_ms * self.sample_rate / 1000 / self.frame_length))
+        with self._condition:
+            oldest = max(0, self._sequence - self.capacity + 1)
+            subscription = FrameSubscription(self, max(oldest, self._sequence - preroll_frames),
+                                             frame_filter)
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Remove uma assinatura e acorda os leitores bloqueados."""
+        with self._condition:
+            self._subscriptions.discard(subscription)
+            self._condition.notify_all()
+
+    def write(self, samples):
+        """
+        Acrescenta amostras capturadas, publicando cada frame completo.
+
+        Args:
+            samples (np.ndarray | bytes): Amostras int16 mono.
+        """
+        if isinstance(samples, (bytes, bytearray)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        if len(self._pending):
+            samples = np.concatenate((self._pending, samples))
+        count = len(samples) // self.frame_length
+        for i in range(count):
+            self._frames[self._sequence % self.capacity] = samples[i * self.frame_length:(i + 1) * self.frame_length]
+            self._sequence += 1
+        self._pending = samples[count * self.frame_length:].copy()
+        if count:
+            with self._condition:
+                self._condition.notify_all()
+
+    def wait_for(self, subscription, timeout=None):
+        """
+        Aguarda o próximo frame de uma assinatura.
+
+        Returns:
+            bool: True se o frame está disponível; False se o tempo esgotou ou a assinatura foi fechada.
+        """
+        def ready():
+            return subscription.closed or subscription.cursor < self._sequence
+
+        if not ready():
+            with self._condition:
+                self._condition.wait_for(ready, timeout)
+        return not subscription.closed and subscription.cursor < self._sequence
+
+    def get_frame(self, cursor):
+        """
+        Copia o frame ``cursor`` do buffer.
+
+        Returns:
+            tuple[np.ndarray, int]: Frame e número de frames pulados por terem sido sobrescritos.
+        """
+        skipped = max(0, self._sequence - self.capacity + 1 - cursor)
+        cursor += skipped
+        frame = self._frames[cursor % self.capacity].copy()
+        # Se o escritor alcançou a posição durante a cópia, usa o frame mais antigo ainda válido
+        overrun = self._sequence - self.capacity + 1 - cursor
+        if overrun > 0:
+            skipped += overrun
+            frame = self._frames[(cursor + overrun) % self.capacity].copy()
+        return frame, skipped
+
+    def _callback(self, in_data, frame_count, time_info, status):
+        """Callback do PyAudio: publica o bloco capturado."""
+        self.write(in_data)
+        return None, self._continue
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: audio_encoding
+
+Este módulo implementa a etapa de codificação entre a captura e a transcrição. O
+áudio é convertido para mono, reamostrado para 16 kHz (taxa nativa do Whisper) com
+operações vetorizadas em NumPy e, opcionalmente, comprimido (FLAC ou Opus/OGG) para
+reduzir o tamanho do upload. As métricas de bytes antes/depois são registradas.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 16:25 (horário de Zurique)
+"""
+
+import io
+import time
+import logging
+import numpy as np
+from utils.audio_buffer import AudioBuffer, soundfile
+
+# Taxa de amostragem usada internamente pelo Whisper
+STT_SAMPLE_RATE = 16000
+# Abaixo deste tamanho (PCM), a compressão não compensa o custo de codificação
+MIN_COMPRESS_BYTES = 32 * 1024
+# Número de coeficientes do filtro passa-baixa anti-aliasing
+FILTER_TAPS = 101
+
+
+def to_mono(buffer):
+    """
+    Converte o áudio para mono pela média dos canais.
+
+    Args:
+        buffer (AudioBuffer): Áudio de entrada.
+
+    Returns:
+        AudioBuffer: Áudio mono (o próprio buffer, se já for mono).
+    """
+    if buffer.channels == 1:
+        return buffer
+    frames = buffer.samples[:len(buffer) * buffer.channels].reshape(-1, buffer.channels)
+    mono = np.mean(frames, axis=1, dtype=np.float32)
+    return AudioBuffer(np.round(mono).astype(np.int16), buffer.sample_rate, 1)
+
+
+def _lowpass_kernel(cutoff, taps=FILTER_TAPS):
+    """Filtro FIR passa-baixa (sinc janelado) com frequência de corte normalizada (0 a 0,5)."""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = 2 * cutoff * np.sinc(2 * cutoff * n) * np.blackman(taps)
+    return (kernel / kernel.sum()).astype(np.float32)
+
+
+def resample(buffer, target_rate=STT_SAMPLE_RATE):
+    """
+    Reamostra um áudio mono para ``target_rate``.
+
+    Na redução da taxa, um filtro passa-baixa evita aliasing antes da interpolação.
+
+    Args:
+        buffer (AudioBuffer): Áudio mono de entrada.
+        target_rate (int, optional): Taxa de saída em Hz. Padrão é 16000.
+
+    Returns:
+        AudioBuffer: Áudio reamostrado (o próprio buffer, se a taxa já for a desejada).
+    """
+    if buffer.sample_rate == target_rate or not len(buffer):
+        return buffer
+    if buffer.channels != 1:
+        raise ValueError("A reamostragem requer áudio mono.")
+
+    samples = buffer.samples.astype(np.float32)
+    if target_rate < buffer.sample_rate:
+        # Corte em 90% da nova frequência de Nyquist, normalizado pela taxa original
+        cutoff = 0.45 * target_rate / buffer.sample_rate
+        samples = np.convolve(samples, _lowpass_kernel(cutoff), mode='same')
+
+    count = int(round(len(samples) * target_rate / buffer.sample_rate))
+    positions = np.arange(count, dtype=np.float64) * (buffer.sample_rate / target_rate)
+    resampled = np.interp(positions, np.arange(len(samples)), samples)
+    return AudioBuffer(np.clip(np.round(resampled), -32768, 32767).astype(np.int16), target_rate, 1)
+
+
+class EncodedAudio:
+    """
+    Resultado da codificação de um áudio para upload.
+    """
+
+    def __init__(self, file, audio_format, bytes_before, bytes_after, encode_seconds):
+        """
+        Args:
+            file (io.BytesIO): Arquivo codificado, posicionado no início.
+            audio_format (str): Formato do arquivo ("wav", "flac" ou "ogg").
+            bytes_before (int): Tamanho do PCM original, antes da conversão.
+            bytes_after (int): Tamanho do arquivo codificado.
+            encode_seconds (float): Tempo gasto na conversão e codificação.
+        """
+        self.file = file
+        self.format = audio_format
+        self.bytes_before = bytes_before
+        self.bytes_after = bytes_after
+        self.encode_seconds = encode_seconds
+
+    @property
+    def ratio(self):
+        """Fator de redução de tamanho (antes / depois)."""
+        return self.bytes_before / self.bytes_after if self.bytes_after else 0.0
+
+
+def choose_codec(buffer, codec='auto'):
+    """
+    Escolhe o formato de upload pela política de tamanho/latência.
+
+    No modo "auto", usa FLAC (sem perdas) quando disponível e o áudio é grande o
+    suficiente para compensar a codificação; caso contrário, WAV.
+
+    Args:
+        buffer (AudioBuffer): Áudio já convertido para a taxa de upload.
+        codec (str, optional): "auto", "wav", "flac" ou "opus". Padrão é "auto".
+
+    Returns:
+        str: Formato escolhido ("wav", "flac" ou "opus").
+    """
+    if codec != 'auto':
+        return codec
+    if soundfile is not None and buffer.nbytes >= MIN_COMPRESS_BYTES:
+        return 'flac'
+    return 'wav'
+
+
+def encode_for_upload(buffer, target_rate=STT_SAMPLE_RATE, codec='auto'):
+    """
+    Prepara um áudio para upload à API de transcrição.
+
+    Args:
+        buffer (AudioBuffer): Áudio capturado.
+        target_rate (int, optional): Taxa de saída em Hz. Padrão é 16000.
+        codec (str, optional): "auto", "wav", "flac" ou "opus". Padrão é "auto".
+
+    Returns:
+        EncodedAudio: Arquivo codificado e métricas de tamanho.
+    """
+    start = time.perf_counter()
+    converted = resample(to_mono(buffer), target_rate)
+    audio_format = choose_codec(converted, codec)
+
+    if audio_format == 'flac':
+        file = converted.to_flac()
+    elif audio_format == 'opus':
+        file = _to_opus(converted)
+        audio_format = 'ogg'
+    else:
+        file = converted.to_wav()
+
+    encoded = EncodedAudio(file, audio_format, buffer.nbytes, file.getbuffer().nbytes,
+                           time.perf_counter() - start)
+    logging.info(
+        f"Upload STT: {encoded.bytes_before} -> {encoded.bytes_after} bytes "
+        f"({encoded.ratio:.1f}x, {encoded.format}, {encoded.encode_seconds * 1000:.1f} ms)"
+    )
+    return encoded
+
+
+def _to_opus(buffer):
+    """Codifica o áudio em Opus/OGG em memória (requer ``soundfile`` com libsndfile >= 1.2)."""
+    if soundfile is None:
+        raise RuntimeError("A codificação Opus requer o pacote 'soundfile'.")
+    output = io.BytesIO()
+    soundfile.write(output, buffer.samples, buffer.sample_rate, format='OGG', subtype='OPUS')
+    output.seek(0)
+    output.name = "audio.ogg"
+    return output
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: audio_player
+
+Este módulo implementa a reprodução de áudio PCM em memória. Um único motor de
+reprodução (PlaybackEngine) mantém o stream de saída persistente e um pequeno conjunto
+de vozes; cada voz tem o seu buffer de jitter e o seu volume, e o callback do
+dispositivo mistura as vozes ativas. Os blocos recebidos (por exemplo, diretamente da
+resposta HTTP da síntese de voz) são tocados a partir do primeiro bloco, e sons curtos,
+como o de ativação, são decodificados para PCM uma única vez e tocados sem abrir
+arquivos nem criar reprodutores a cada uso.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 11:45 (horário de Zurique)
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+import numpy as np
+from utils.audio_buffer import AudioBuffer, soundfile
+from utils.audio_encoding import to_mono, resample
+
+# Bytes por amostra de áudio int16
+SAMPLE_WIDTH = 2
+# Vozes simultâneas do motor (fala do assistente, sons de aviso)
+MAX_VOICES = 4
+
+
+class JitterBuffer:
+    """
+    Fila de bytes PCM entre a rede e o dispositivo de saída.
+
+    A leitura só começa quando há áudio suficiente acumulado (pré-buffer) ou quando
+    o fim de um stream é sinalizado; na falta de dados, a leitura é completada com
+    silêncio e o buffer volta a aguardar o pré-buffer.
+    """
+
+    def __init__(self, prebuffer_bytes):
+        """
+        Inicializa o buffer.
+
+        Args:
+            prebuffer_bytes (int): Quantidade de bytes acumulados antes de iniciar a leitura.
+        """
+        self.prebuffer_bytes = prebuffer_bytes
+        self.underruns = 0
+        self._chunks = deque()
+        self._offset = 0
+        self._size = 0
+        self._primed = False
+        self._cond = threading.Condition()
+
+    @property
+    def pending(self):
+        """Quantidade de bytes aguardando reprodução."""
+        with self._cond:
+            return self._size
+
+    def write(self, data):
+        """Acrescenta um bloco de bytes ao final do buffer."""
+        if not data:
+            return
+        with self._cond:
+            self._chunks.append(bytes(data))
+            self._size += len(data)
+            if self._size >= self.prebuffer_bytes:
+                self._primed = True
+
+    def flush(self):
+        """Libera a leitura do restante do buffer sem aguardar o pré-buffer (fim de stream)."""
+        with self._cond:
+            if self._size:
+                self._primed = True
+            else:
+                self._cond.notify_all()
+
+    def clear(self):
+        """Descarta todo o áudio pendente."""
+        with self._cond:
+            self._chunks.clear()
+            self._offset = 0
+            self._size = 0
+            self._primed = False
+            self._cond.notify_all()
+
+    def fade_out(self, nbytes, channels=1):
+        """
+        Mantém apenas os próximos ``nbytes`` do áudio pendente, com volume decrescente até zero.
+
+        Args:
+            nbytes (int): Quantidade de áudio mantida para a rampa de saída.
+            channels (int, optional): Número de canais do áudio. Padrão é 1.
+        """
+        frame_size = SAMPLE_WIDTH * channels
+        with self._cond:
+            data = bytearray()
+            while len(data) < nbytes and self._chunks:
+                chunk = self._chunks.popleft()
+                data += chunk[self._offset:]
+                self._offset = 0
+            data = data[:min(nbytes, len(data)) // frame_size * frame_size]
+            self._chunks.clear()
+            self._offset = 0
+            self._size = 0
+            if data:
+                samples = np.frombuffer(data, dtype=np.int16).reshape(-1, channels)
+                ramp = np.linspace(1.0, 0.0, len(samples), dtype=np.float32)[:, None]
+                self._chunks.append((samples * ramp).astype(np.int16).tobytes())
+                self._size = len(data)
+                self._primed = True
+            else:
+                self._primed = False
+            self._cond.notify_all()
+
+    def read_into(self, out):
+        """
+        Preenche ``out`` com o áudio pendente, completando com silêncio. Não bloqueia.
+
+        Args:
+            out (buffer): Buffer de saída gravável (por exemplo, o do callback de áudio).
+
+        Returns:
+            int: Quantidade de bytes de áudio real copiados.
+        """
+        wanted = len(out)
+        copied = 0
+        with self._cond:
+            if self._primed:
+                while copied < wanted and self._chunks:
+                    chunk = self._chunks[0]
+                    count = min(wanted - copied, len(chunk) - self._offset)
+                    out[copied:copied + count] = chunk[self._offset:self._offset + count]
+                    copied += count
+                    self._offset += count
+                    if self._offset == len(chunk):
+                        self._chunks.popleft()
+                        self._offset = 0
+                self._size -= copied
+                if not self._size:
+                    if copied < wanted:
+                        self.underruns += 1
+                    self._primed = False
+                    self._cond.notify_all()
+        if copied < wanted:
+            out[copied:wanted] = bytes(wanted - copied)
+        return copied
+
+    def wait_drained(self, timeout=None):
+        """
+        Aguarda até que todo o áudio pendente tenha sido lido.
+
+        Returns:
+            bool: True se o buffer esvaziou dentro do tempo limite.
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: self._size == 0, timeout)
+
+
+def load_pcm(path, sample_rate, channels=1):
+    """
+    Decodifica um arquivo de áudio para PCM int16 na taxa e no número de canais indicados.
+
+    Arquivos WAV são lidos diretamente; os demais formatos (MP3, OGG, FLAC) requerem
+    o pacote ``soundfile``.
+
+    Args:
+        path (str): Caminho do arquivo.
+        sample_rate (int): Taxa de amostragem de saída.
+        channels (int, optional): Número de canais de saída. Padrão é 1.
+
+    Returns:
+        bytes: Amostras int16 intercaladas, little-endian.
+    """
+    if path.lower().endswith('.wav'):
+        buffer = AudioBuffer.from_wav(path)
+    else:
+        if soundfile is None:
+            raise RuntimeError(f"A decodificação de '{os.path.basename(path)}' requer o pacote 'soundfile'.")
+        data, rate = soundfile.read(path, dtype='int16', always_2d=True)
+        buffer = AudioBuffer(data.reshape(-1), rate, data.shape[1])
+    samples = resample(to_mono(buffer), sample_rate).samples
+    if channels > 1:
+        samples = np.repeat(samples, channels)
+    return samples.tobytes()
+
+
+class Voice:
+    """
+    Canal do motor de reprodução: buffer de jitter próprio e volume.
+    """
+
+    def __init__(self, index, prebuffer_bytes):
+        """
+        Args:
+            index (int): Posição da voz no motor.
+            prebuffer_bytes (int): Pré-buffer padrão da voz.
+        """
+        self.index = index
+        self.prebuffer_bytes = prebuffer_bytes
+        self.buffer = JitterBuffer(prebuffer_bytes)
+        self.volume = 1.0
+        self.in_use = False
+        # Vozes de sons curtos são devolvidas ao motor assim que terminam de tocar
+        self.auto_release = False
+
+    @property
+    def is_playing(self):
+        """Indica se há áudio aguardando reprodução."""
+        return self.buffer.pending > 0
+
+
+class PlaybackEngine:
+    """
+    Motor de reprodução: um stream de saída persistente compartilhado por um conjunto fixo de vozes.
+    """
+
+    def __init__(self, sample_rate=24000, channels=1, voices=MAX_VOICES, prebuffer_ms=100):
+        """
+        Inicializa o motor. O stream de saída é aberto no primeiro uso.
+
+        Args:
+            sample_rate (int, optional): Taxa de amostragem da saída. Padrão é 24000.
+            channels (int, optional): Número de canais. Padrão é 1.
+            voices (int, optional): Número de vozes simultâneas. Padrão é MAX_VOICES.
+            prebuffer_ms (int, optional): Pré-buffer padrão das vozes de stream. Padrão é 100.
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_size = SAMPLE_WIDTH * channels
+        prebuffer_bytes = int(sample_rate * prebuffer_ms / 1000) * self.frame_size
+        self.voices = [Voice(index, prebuffer_bytes) for index in range(voices)]
+        # Volume geral, aplicado sobre o volume de cada voz
+        self.volume = 1.0
+        # Sons curtos decodificados: {nome: bytes PCM}
+        self.cues = {}
+        # Nível (RMS, escala int16) do último bloco enviado ao dispositivo e o seu instante
+        self.output_level = 0.0
+        self.last_output_time = 0.0
+        self._stream = None
+        self._lock = threading.Lock()
+        self._voices_lock = threading.Lock()
+        # Buffers de mixagem reutilizados pelo callback (sem alocação por bloco)
+        self._scratch = bytearray()
+        self._mix = np.zeros(0, dtype=np.float32)
+        self._silence = b''
+
+    @property
+    def active_voices(self):
+        """Número de vozes em uso."""
+        return sum(voice.in_use for voice in self.voices)
+
+    def acquire(self, prebuffer=True, volume=1.0):
+        """
+        Reserva uma voz livre.
+
+        Args:
+            prebuffer (bool, optional): Se falso, a voz toca sem aguardar o pré-buffer
+                (áudio já completo em memória). Padrão é True.
+            volume (float, optional): Volume da voz (0 a 1). Padrão é 1.0.
+
+        Returns:
+            Voice | None: Voz reservada, ou None se todas estiverem em uso.
+        """
+        with self._voices_lock:
+            for voice in self.voices:
+                if not voice.in_use:
+                    voice.buffer.clear()
+                    voice.buffer.prebuffer_bytes = voice.prebuffer_bytes if prebuffer else 0
+                    voice.volume = volume
+                    voice.auto_release = False
+                    voice.in_use = True
+                    return voice
+        logging.warning("Nenhuma voz de reprodução livre.")
+        return None
+
+    def release(self, voice):
+        """Devolve uma voz ao motor, descartando o áudio pendente."""
+        with self._voices_lock:
+            voice.buffer.clear()
+            voice.auto_release = False
+            voice.in_use = False
+
+    def load_cue(self, name, path):
+        """
+        Decodifica um som curto para PCM e o mantém em memória.
+
+        Args:
+            name (str): Nome do som (usado em ``play_cue``).
+            path (str): Caminho do arquivo de áudio.
+
+        Returns:
+            bool: True se o som foi carregado.
+        """
+        try:
+            self.cues[name] = load_pcm(path, self.sample_rate, self.channels)
+        except (OSError, RuntimeError, ValueError) as e:
+            logging.error(f"Não foi possível carregar o som '{name}' de {path}: {e}")
+            return False
+        return True
+
+    def play_cue(self, name, volume=1.0):
+        """
+        Toca um som carregado por ``load_cue`` em uma voz livre, sem bloquear.
+
+        O áudio já está em memória: a reprodução começa no próximo bloco do dispositivo,
+        e a voz é liberada automaticamente ao terminar.
+
+        Args:
+            name (str): Nome do som.
+            volume (float, optional): Volume do som (0 a 1). Padrão é 1.0.
+
+        Returns:
+            Voice | None: Voz que toca o som, ou None se o som não foi carregado ou não há voz livre.
+        """
+        pcm = self.cues.get(name)
+        if pcm is None:
+            logging.warning(f"Som '{name}' não carregado.")
+            return None
+        self.ensure_stream()
+        voice = self.acquire(prebuffer=False, volume=volume)
+        if voice is None:
+            return None
+        voice.buffer.write(pcm)
+        voice.buffer.flush()
+        # Marcada apenas depois da escrita, para o callback não liberar a voz ainda vazia
+        voice.auto_release = True
+        return voice
+
+    def close(self):
+        """Fecha o stream de saída e descarta o áudio pendente de todas as vozes."""
+        for voice in self.voices:
+            if voice.auto_release:
+                self.release(voice)
+            else:
+                voice.buffer.clear()
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+
+    def ensure_stream(self):
+        """Abre o stream de saída, se necessário (também chamado pelo ``PCMPlayer``)."""
+        with self._lock:
+            if self._stream is None:
+                self._stream = self._open_stream()
+                self._stream.start()
+                logging.info("Stream de saída de áudio aberto.")
+
+    def _open_stream(self):
+        """Cria o stream de saída do dispositivo padrão."""
+        # Importado sob demanda: o PortAudio só é carregado quando há áudio a tocar
+        import sounddevice as sd
+        return sd.RawOutputStream(
+            samplerate=self.sample_rate,
+            channels=self.channels,
+            dtype='int16',
+            latency='low',
+            callback=self._callback
+        )
+
+    def _callback(self, outdata, frames, time_info, status):
+        """Callback do dispositivo: mistura as vozes ativas na saída e mede o nível."""
+        if status:
+            logging.debug(f"Status do stream de saída: {status}")
+        active = [voice for voice in self.voices if voice.in_use]
+        if len(active) == 1 and active[0].volume == 1.0 and self.volume == 1.0:
+            # Caso comum (apenas a fala): cópia direta, sem mixagem
+            copied = active[0].buffer.read_into(outdata)
+        else:
+            copied = self._mix_into(outdata, active)
+        for voice in active:
+            if voice.auto_release and not voice.buffer.pending:
+                self.release(voice)
+        if copied:
+            self._update_level(outdata[:copied])
+
+    def _mix_into(self, outdata, voices):
+        """Soma as vozes com os seus volumes, limitando o resultado à faixa int16."""
+        wanted = len(outdata)
+        if len(self._scratch) != wanted:
+            self._scratch = bytearray(wanted)
+            self._mix = np.zeros(wanted // SAMPLE_WIDTH, dtype=np.float32)
+            self._silence = bytes(wanted)
+        mix = self._mix
+        mix.fill(0.0)
+        copied = 0
+        for voice in voices:
+            count = voice.buffer.read_into(self._scratch)
+            if count:
+                samples = np.frombuffer(self._scratch, dtype=np.int16, count=count // SAMPLE_WIDTH)
+                mix[:len(samples)] += samples * (voice.volume * self.volume)
+                copied = max(copied, count)
+        if copied:
+            np.clip(mix, -32768, 32767, out=mix)
+            np.copyto(np.frombuffer(outdata, dtype=np.int16, count=len(mix)), mix, casting='unsafe')
+        else:
+            outdata[:wanted] = self._silence
+        return copied
+
+    def _update_level(self, data):
+        """Registra o nível (RMS) do áudio enviado ao dispositivo, usado pela supressão de eco."""
+        samples = np.frombuffer(data, dtype=np.int16, count=len(data) // SAMPLE_WIDTH).astype(np.float32)
+        self.output_level = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+        self.last_output_time = time.monotonic()
+
+
+class PCMPlayer:
+    """
+    Reprodutor de streams de áudio PCM 16 bits, tocados em uma voz do motor de reprodução.
+    """
+
+    def __init__(self, sample_rate=24000, channels=1, prebuffer_ms=100, fade_ms=30, engine=None):
+        """
+        Inicializa o reprodutor. O stream de saída é aberto no primeiro uso.
+
+        Args:
+            sample_rate (int, optional): Taxa de amostragem do áudio. Padrão é 24000.
+            channels (int, optional): Número de canais. Padrão é 1.
+            prebuffer_ms (int, optional): Áudio acumulado antes de iniciar a reprodução. Padrão é 100.
+            fade_ms (int, optional): Duração da rampa de volume ao interromper. Padrão é 30.
+            engine (PlaybackEngine, optional): Motor compartilhado. Se omitido, o reprodutor
+                cria (e fecha) o seu próprio.
+        """
+        self._owns_engine = engine is None
+        if engine is None:
+            engine = PlaybackEngine(sample_rate, channels, voices=1, prebuffer_ms=prebuffer_ms)
+        self.engine = engine
+        self.sample_rate = engine.sample_rate
+        self.channels = engine.channels
+        self.frame_size = engine.frame_size
+        self.fade_ms = fade_ms
+        self.voice = engine.acquire()
+        if self.voice is None:
+            raise RuntimeError("O motor de reprodução não tem vozes livres.")
+        self.voice.buffer.prebuffer_bytes = int(self.sample_rate * prebuffer_ms / 1000) * self.frame_size
+        self.buffer = self.voice.buffer
+        self._generation = 0
+
+    @property
+    def output_level(self):
+        """Nível (RMS, escala int16) do último bloco enviado ao dispositivo."""
+        return self.engine.output_level
+
+    @property
+    def last_output_time(self):
+        """Instante (relógio monotônico) do último bloco enviado ao dispositivo."""
+        return self.engine.last_output_time
+
+    @property
+    def is_playing(self):
+        """Indica se há áudio aguardando reprodução."""
+        return self.buffer.pending > 0
+
+    def play_stream(self, chunks):
+        """
+        Reproduz um stream de blocos PCM e retorna quando todo o áudio tiver sido tocado.
+
+        A reprodução começa assim que o pré-buffer é preenchido, enquanto os blocos
+        seguintes ainda estão chegando.
+
+        Args:
+            chunks (iterable[bytes]): Blocos de amostras int16 intercaladas, little-endian.
+        """
+        self.engine.ensure_stream()
+        generation = self._generation
+        total = 0
+        for chunk in chunks:
+            if generation != self._generation:
+                # Interrompido por stop(): o restante do stream é descartado
+                return
+            self.buffer.write(chunk)
+            total += len(chunk)
+        # Completa a última amostra caso o stream termine no meio de um frame
+        if total % self.frame_size:
+            self.buffer.write(bytes(self.frame_size - total % self.frame_size))
+        self.buffer.flush()
+        self.buffer.wait_drained()
+
+    def play(self, pcm):
+        """
+        Reproduz um bloco de áudio PCM completo.
+
+        Args:
+            pcm (bytes): Amostras int16 intercaladas, little-endian.
+        """
+        self.play_stream([pcm])
+
+    def stop(self, fade=True):
+        """
+        Interrompe a reprodução atual, descartando o áudio pendente.
+
+        Args:
+            fade (bool, optional): Se verdadeiro, encerra com uma rampa de ``fade_ms``
+                milissegundos em vez de um corte seco. Padrão é True.
+        """
+        self._generation += 1
+        if fade and self.fade_ms:
+            fade_bytes = int(self.sample_rate * self.fade_ms / 1000) * self.frame_size
+            self.buffer.fade_out(fade_bytes, self.channels)
+        else:
+            self.buffer.clear()
+
+    def close(self):
+        """Descarta o áudio pendente e, se o motor for próprio, fecha o stream de saída."""
+        self._generation += 1
+        self.buffer.clear()
+        if self._owns_engine:
+            self.engine.close()
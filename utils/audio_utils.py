@@ -1,38 +1,247 @@
-import pyaudio
-import wave
+import numpy as np
+from utils.audio_buffer import AudioBuffer
+from utils.telemetry import telemetry
 
-def record_audio(output_filename="resources/audios/user_audio.wav", duration=5):
-    """Grava áudio do microfone e salva em um arquivo WAV."""
+# Taxa de amostragem da gravação com stream próprio (sem a captura compartilhada)
+RECORD_SAMPLE_RATE = 44100
+
+
+class EnergyVAD:
+    """
+    Detector de atividade de voz (VAD) por energia e taxa de cruzamentos por zero.
+
+    Cada bloco de áudio é dividido em frames e classificado de forma vetorizada com
+    NumPy. O limiar de energia acompanha um piso de ruído adaptativo, atualizado com
+    os frames classificados como silêncio.
+    """
+
+    def __init__(self, sample_rate, frame_ms=20, threshold_ratio=3.0, min_rms=200.0,
+                 zcr_max=0.25, noise_adapt=0.05):
+        """
+        Inicializa o detector.
+
+        :param sample_rate: Taxa de amostragem do áudio.
+        :param frame_ms: Duração de cada frame de análise em milissegundos.
+        :param threshold_ratio: Razão mínima entre a energia (RMS) do frame e o piso de ruído.
+        :param min_rms: RMS mínimo absoluto (escala int16) para considerar voz.
+        :param zcr_max: Taxa máxima de cruzamentos por zero para frames de energia moderada.
+        :param noise_adapt: Taxa de adaptação do piso de ruído (0 a 1).
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.frame_ms = frame_ms
+        self.threshold_ratio = threshold_ratio
+        self.min_rms = min_rms
+        self.zcr_max = zcr_max
+        self.noise_adapt = noise_adapt
+        self.noise_floor = None
+        self._remainder = np.zeros(0, dtype=np.int16)
+
+    def process(self, samples):
+        """
+        Classifica os frames completos de um bloco de áudio.
+
+        Amostras que não completam um frame são guardadas para o próximo bloco.
+
+        :param samples: Amostras int16 mono.
+        :return: Array booleano com um valor por frame (True = voz).
+        """
+        samples = np.concatenate((self._remainder, samples))
+        count = len(samples) // self.frame_length
+        self._remainder = samples[count * self.frame_length:]
+        if count == 0:
+            return np.zeros(0, dtype=bool)
+
+        frames = samples[:count * self.frame_length].reshape(count, self.frame_length).astype(np.float32)
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        zcr = np.mean(np.signbit(frames[:, 1:]) != np.signbit(frames[:, :-1]), axis=1)
+
+        if self.noise_floor is None:
+            self.noise_floor = max(float(np.min(rms)), 1.0)
+
+        threshold = max(self.noise_floor * self.threshold_ratio, self.min_rms)
+        # Frames muito energéticos são voz; os moderados precisam de ZCR baixa (rejeita chiado)
+        speech = (rms > threshold) & ((zcr < self.zcr_max) | (rms > 2 * threshold))
+
+        silence = rms[~speech]
+        if silence.size:
+            target = float(np.mean(silence))
+            rate = self.noise_adapt
+        else:
+            # Sem silêncio no bloco: aproxima lentamente do frame mais baixo (ruído que aumentou)
+            target = float(np.min(rms))
+            rate = self.noise_adapt / 5
+        self.noise_floor = max((1 - rate) * self.noise_floor + rate * target, 1.0)
+        return speech
+
+
+class SpeechEndpointer:
+    """
+    Detecta o início e o fim da fala em um stream de áudio.
+
+    A gravação termina após ``hangover_ms`` de silêncio depois da fala, ao atingir
+    ``max_duration`` segundos ou quando nenhuma fala começa em ``no_speech_timeout``
+    segundos. O áudio final é recortado, removendo o silêncio inicial e final.
+    """
+
+    def __init__(self, sample_rate, vad=None, hangover_ms=300, min_speech_ms=60, padding_ms=150,
+                 max_duration=30.0, no_speech_timeout=8.0):
+        """
+        Inicializa o detector de fim de fala.
+
+        :param sample_rate: Taxa de amostragem do áudio.
+        :param vad: Detector de voz com ``frame_length`` e ``process(samples)``; padrão é EnergyVAD.
+        :param hangover_ms: Silêncio após a fala que encerra a gravação (padrão 300 ms).
+        :param min_speech_ms: Voz contínua necessária para considerar que a fala começou.
+        :param padding_ms: Margem mantida antes e depois da fala no recorte.
+        :param max_duration: Duração máxima da gravação em segundos.
+        :param no_speech_timeout: Tempo máximo de espera pelo início da fala em segundos.
+        """
+        self.sample_rate = sample_rate
+        self.vad = vad or EnergyVAD(sample_rate)
+        frame_ms = 1000 * self.vad.frame_length / sample_rate
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+        self.min_speech_frames = max(1, round(min_speech_ms / frame_ms))
+        self.padding_samples = int(sample_rate * padding_ms / 1000)
+        self.max_samples = int(sample_rate * max_duration)
+        self.no_speech_samples = int(sample_rate * no_speech_timeout)
+        self.done = False
+        self._chunks = []
+        self._total_samples = 0
+        self._frame_index = 0
+        self._speech_run = 0
+        self._silence_run = 0
+        self._first_speech_frame = None
+        self._last_speech_frame = None
+
+    @property
+    def speech_detected(self):
+        """Indica se o início da fala já foi detectado."""
+        return self._first_speech_frame is not None
+
+    def feed(self, samples):
+        """
+        Processa um bloco de áudio.
+
+        :param samples: Amostras int16 mono.
+        :return: True quando a gravação deve terminar.
+        """
+        if self.done:
+            return True
+        self._chunks.append(samples)
+        self._total_samples += len(samples)
+
+        for is_speech in self.vad.process(samples):
+            if is_speech:
+                self._speech_run += 1
+                self._silence_run = 0
+                if self._first_speech_frame is None and self._speech_run >= self.min_speech_frames:
+                    self._first_speech_frame = self._frame_index - self._speech_run + 1
+                if self._first_speech_frame is not None:
+                    self._last_speech_frame = self._frame_index
+            else:
+                self._speech_run = 0
+                self._silence_run += 1
+                if self.speech_detected and self._silence_run >= self.hangover_frames:
+                    self.done = True
+            self._frame_index += 1
+
+        if self._total_samples >= self.max_samples:
+            self.done = True
+        elif not self.speech_detected and self._total_samples >= self.no_speech_samples:
+            self.done = True
+        return self.done
+
+    def audio(self):
+        """
+        Retorna o áudio recortado ao redor da fala.
+
+        :return: Amostras int16 mono (vazio se nenhuma fala foi detectada).
+        """
+        if not self.speech_detected:
+            return np.zeros(0, dtype=np.int16)
+        samples = np.concatenate(self._chunks)
+        frame_length = self.vad.frame_length
+        start = max(0, self._first_speech_frame * frame_length - self.padding_samples)
+        end = min(len(samples), (self._last_speech_frame + 1) * frame_length + self.padding_samples)
+        return samples[start:end]
+
+
+def record_audio(output_filename=None, duration=None, max_duration=30.0, subscription=None, on_chunk=None):
+    """
+    Grava áudio do microfone em memória.
+
+    Sem ``duration``, a gravação usa detecção de atividade de voz: termina assim que
+    o usuário para de falar, e o silêncio inicial e final é removido. Com ``duration``,
+    grava exatamente o tempo informado.
+
+    :param output_filename: Caminho opcional para salvar também um arquivo WAV.
+    :param duration: Duração fixa em segundos; None para encerrar pelo fim da fala.
+    :param max_duration: Duração máxima em segundos no modo de detecção de voz.
+    :param subscription: Assinatura opcional do AudioCaptureService; o áudio é lido da
+        captura compartilhada (incluindo a pré-gravação) em vez de um stream próprio.
+    :param on_chunk: Função opcional chamada com cada bloco lido (amostras int16), por
+        exemplo, para a transcrição em streaming.
+    :return: AudioBuffer com o áudio gravado (vazio se nenhuma fala foi detectada).
+    """
     chunk = 1024
-    sample_format = pyaudio.paInt16
     channels = 1
-    rate = 44100
+    rate = RECORD_SAMPLE_RATE
 
-    p = pyaudio.PyAudio()
+    p = None
+    stream = None
+    if subscription is not None:
+        rate = subscription.sample_rate
 
-    print("Gravando...")
+        def read_chunk():
+            samples = subscription.read(chunk)
+            if samples is None:
+                raise RuntimeError("Captura de áudio encerrada durante a gravação.")
+            return samples
+    else:
+        # Importado apenas quando um stream próprio é aberto
+        import pyaudio
+        p = pyaudio.PyAudio()
+        stream = p.open(format=pyaudio.paInt16,
+                        channels=channels,
+                        rate=rate,
+                        frames_per_buffer=chunk,
+                        input=True)
+
+        def read_chunk():
+            return np.frombuffer(stream.read(chunk, exception_on_overflow=False), dtype=np.int16)
 
-    stream = p.open(format=sample_format,
-                    channels=channels,
-                    rate=rate,
-                    frames_per_buffer=chunk,
-                    input=True)
+    if on_chunk is not None:
+        read_raw = read_chunk
 
-    frames = []
+        def read_chunk():
+            samples = read_raw()
+            on_chunk(samples)
+            return samples
 
-    for _ in range(0, int(rate / chunk * duration)):
-        data = stream.read(chunk)
-        frames.append(data)
+    print("Gravando...")
 
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
+    span = telemetry.span("audio.record", mode="fixed" if duration is not None else "vad",
+                          shared=subscription is not None)
+    audio = None
+    try:
+        if duration is not None:
+            frames = [read_chunk() for _ in range(0, int(rate / chunk * duration))]
+            audio = AudioBuffer(np.concatenate(frames), rate, channels)
+        else:
+            endpointer = SpeechEndpointer(rate, max_duration=max_duration)
+            while not endpointer.feed(read_chunk()):
+                pass
+            audio = AudioBuffer(endpointer.audio(), rate, channels)
+    finally:
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+            p.terminate()
+        span.end(seconds=round(audio.duration, 3) if audio is not None else 0.0)
 
     print("Gravação finalizada.")
 
-    wf = wave.open(output_filename, 'wb')
-    wf.setnchannels(channels)
-    wf.setsampwidth(p.get_sample_size(sample_format))
-    wf.setframerate(rate)
-    wf.writeframes(b''.join(frames))
-    wf.close()
\ No newline at end of file
+    if output_filename is not None:
+        audio.save(output_filename)
+    return audio
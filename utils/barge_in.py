@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: barge_in
+
+Este módulo permite que o usuário interrompa a fala do assistente. A supressão de eco
+(EchoGate) silencia os frames do microfone enquanto o áudio reproduzido é mais alto
+que o microfone, para que os detectores não reajam à própria voz do assistente; o
+monitor de interrupção (BargeInMonitor) observa o microfone durante a reprodução e
+avisa quando o usuário começa a falar.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 17:55 (horário de Zurique)
+"""
+
+import time
+import logging
+import threading
+import numpy as np
+from utils.audio_utils import EnergyVAD
+
+
+class EchoGate:
+    """
+    Supressão de eco simples por comparação de níveis.
+
+    Enquanto o reprodutor está tocando (ou tocou há menos de ``hold_ms``), um frame do
+    microfone só passa se o seu nível superar o nível de saída multiplicado por
+    ``ratio``; caso contrário, é substituído por silêncio, mantendo a continuidade do
+    stream para os reconhecedores.
+    """
+
+    def __init__(self, player, ratio=1.0, hold_ms=150):
+        """
+        Inicializa a supressão de eco.
+
+        Args:
+            player (PCMPlayer): Reprodutor cujo nível de saída é usado como referência.
+            ratio (float, optional): Razão mínima entre o nível do microfone e o de saída. Padrão é 1.0.
+            hold_ms (float, optional): Tempo após a reprodução em que a supressão continua ativa
+                (latência do dispositivo e reverberação). Padrão é 150.
+        """
+        self.player = player
+        self.ratio = ratio
+        self.hold_seconds = hold_ms / 1000
+        self.suppressed_frames = 0
+
+    @property
+    def active(self):
+        """Indica se a reprodução está (ou esteve há pouco) ativa."""
+        return (self.player.is_playing
+                or time.monotonic() - self.player.last_output_time < self.hold_seconds)
+
+    def allows(self, frame):
+        """
+        Indica se um frame do microfone deve ser entregue aos detectores.
+
+        Args:
+            frame (np.ndarray): Amostras int16 mono.
+
+        Returns:
+            bool: False se o frame provavelmente contém apenas o eco da reprodução.
+        """
+        if not self.active:
+            return True
+        samples = frame.astype(np.float32)
+        mic_level = float(np.sqrt(np.mean(samples * samples))) if samples.size else 0.0
+        return mic_level > self.player.output_level * self.ratio
+
+    def __call__(self, frame):
+        """Retorna o frame, ou silêncio se ele foi suprimido (uso como ``frame_filter``)."""
+        if self.allows(frame):
+            return frame
+        self.suppressed_frames += 1
+        return np.zeros_like(frame)
+
+
+class BargeInMonitor:
+    """
+    Detecta o início da fala do usuário enquanto o assistente está falando.
+
+    Lê uma assinatura da captura compartilhada em uma thread própria, aplica a
+    supressão de eco e o detector de voz e chama ``on_barge_in`` quando há voz
+    contínua por ``min_speech_ms`` durante a reprodução.
+    """
+
+    def __init__(self, capture, player, on_barge_in, gate=None, min_speech_ms=200, vad=None):
+        """
+        Inicializa o monitor.
+
+        Args:
+            capture (AudioCaptureService): Captura de áudio compartilhada.
+            player (PCMPlayer): Reprodutor monitorado.
+            on_barge_in (callable): Função chamada (na thread do monitor) ao detectar a interrupção.
+            gate (EchoGate, optional): Supressão de eco; padrão é um EchoGate sobre ``player``.
+            min_speech_ms (float, optional): Voz contínua necessária para interromper. Padrão é 200.
+            vad (EnergyVAD, optional): Detector de voz; padrão é EnergyVAD na taxa da captura.
+        """
+        self.capture = capture
+        self.player = player
+        self.on_barge_in = on_barge_in
+        self.gate = gate or EchoGate(player)
+        self.vad = vad or EnergyVAD(capture.sample_rate)
+        frame_ms = 1000 * self.vad.frame_length / capture.sample_rate
+        self.min_speech_frames = max(1, round(min_speech_ms / frame_ms))
+        self._speech_run = 0
+        self._triggered = False
+        self._subscription = None
+        self._thread = None
+
+    def start(self):
+        """Inicia o monitoramento em uma thread daemon."""
+        if self._thread is not None:
+            return
+        self._subscription = self.capture.subscribe(frame_filter=self.gate)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Encerra o monitoramento."""
+        if self._subscription is not None:
+            self._subscription.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        self._thread = None
+        self._subscription = None
+
+    def process(self, frame):
+        """
+        Processa um frame do microfone (já filtrado pela supressão de eco).
+
+        Args:
+            frame (np.ndarray): Amostras int16 mono.
+
+        Returns:
+            bool: True se a interrupção foi detectada neste frame.
+        """
+        # O detector processa todos os frames para manter o piso de ruído atualizado
+        speech = self.vad.process(frame)
+        if not self.gate.active:
+            # Fora da reprodução não há o que interromper
+            self._speech_run = 0
+            self._triggered = False
+            return False
+        for is_speech in speech:
+            self._speech_run = self._speech_run + 1 if is_speech else 0
+        if not self._triggered and self._speech_run >= self.min_speech_frames:
+            # Dispara uma única vez por reprodução
+            self._triggered = True
+            return True
+        return False
+
+    def _run(self):
+        """Laço do monitor: lê frames até a assinatura ser fechada."""
+        subscription = self._subscription
+        while not subscription.closed:
+            frame = subscription.read_frame(timeout=0.1)
+            if frame is None:
+                continue
+            if self.process(frame):
+                logging.info("Interrupção detectada: o usuário começou a falar.")
+                try:
+                    self.on_barge_in()
+                except Exception as e:
+                    logging.error(f"Erro ao tratar a interrupção: {e}")
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: env
+
+Este módulo carrega as variáveis de ambiente do arquivo .env uma única vez por
+processo, qualquer que seja o módulo que precise delas primeiro.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 21:20 (horário de Zurique)
+"""
+
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_environment():
+    """
+    Carrega o arquivo .env na primeira chamada; as chamadas seguintes não fazem nada.
+    """
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: startup_profile
+
+Este módulo registra os marcos da inicialização da aplicação (importações, criação
+da janela, primeira pintura e prontidão de cada subsistema) em milissegundos desde
+o início do processo, e gera um relatório com o orçamento da primeira pintura e os
+módulos pesados já importados, para que regressões no tempo de abertura apareçam.
+Com STARTUP_PROFILE=1, o relatório é exibido quando todos os subsistemas ficam prontos.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 21:20 (horário de Zurique)
+"""
+
+import sys
+import time
+import logging
+import threading
+
+# Tempo máximo até a primeira pintura da janela
+FIRST_PAINT_BUDGET_MS = 300
+# Módulos de importação lenta que não devem ser carregados antes da primeira pintura
+HEAVY_MODULES = ("openai", "numpy", "pyaudio", "pvporcupine", "sounddevice", "langdetect", "vosk")
+FIRST_PAINT = "primeira pintura"
+
+
+def loaded_heavy_modules(modules=HEAVY_MODULES):
+    """Retorna os módulos pesados que já foram importados."""
+    return [name for name in modules if name in sys.modules]
+
+
+class StartupProfile:
+    """
+    Registro dos marcos da inicialização.
+    """
+
+    def __init__(self, start=None):
+        """
+        Inicializa o registro.
+
+        Args:
+            start (float, optional): Instante inicial (``time.perf_counter``); padrão é agora.
+        """
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+        self.heavy_at_first_paint = None
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """
+        Registra um marco.
+
+        Args:
+            name (str): Nome do marco.
+
+        Returns:
+            float: Milissegundos desde o início.
+        """
+        elapsed = 1000 * (time.perf_counter() - self.start)
+        with self._lock:
+            self.marks.append((name, elapsed))
+            if name == FIRST_PAINT:
+                self.heavy_at_first_paint = loaded_heavy_modules()
+        logging.info(f"Inicialização: {name} em {elapsed:.1f} ms.")
+        return elapsed
+
+    def elapsed(self, name):
+        """Retorna o tempo do primeiro registro de um marco, ou None."""
+        with self._lock:
+            return next((elapsed for mark, elapsed in self.marks if mark == name), None)
+
+    def report(self, budget_ms=FIRST_PAINT_BUDGET_MS):
+        """
+        Gera o relatório da inicialização.
+
+        Args:
+            budget_ms (float, optional): Orçamento da primeira pintura. Padrão é 300.
+
+        Returns:
+            str: Relatório com um marco por linha.
+        """
+        with self._lock:
+            marks = list(self.marks)
+        lines = ["Perfil de inicialização:"]
+        lines += [f"  {elapsed:8.1f} ms  {name}" for name, elapsed in marks]
+        first_paint = self.elapsed(FIRST_PAINT)
+        if first_paint is not None:
+            status = "dentro do orçamento" if first_paint <= budget_ms else "ACIMA DO ORÇAMENTO"
+            lines.append(f"  Primeira pintura: {first_paint:.1f} ms ({status} de {budget_ms} ms)")
+            if self.heavy_at_first_paint:
+                lines.append(f"  Módulos pesados antes da primeira pintura: {', '.join(self.heavy_at_first_paint)}")
+        return "\n".join(lines)
+
+
+# Registro compartilhado; o início é a primeira importação deste módulo (em main.py)
+startup_profile = StartupProfile()
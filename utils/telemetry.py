@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: telemetry
+
+Este módulo fornece a instrumentação das sessões: spans (trechos com início e duração
+em relógio monotônico, aninhados por thread), contadores e histogramas. Os spans
+concluídos podem ser exportados em JSONL, e as métricas, no formato de texto do
+Prometheus (arquivo ou endpoint HTTP /metrics). Os últimos valores de cada métrica
+alimentam o painel de latência da janela.
+
+Configuração (variáveis de ambiente):
+    TELEMETRY=1                 habilita a instrumentação (métricas em memória)
+    TELEMETRY_TRACE=arquivo     exporta os spans em JSONL (habilita)
+    TELEMETRY_METRICS=arquivo   grava as métricas no formato do Prometheus ao encerrar (habilita)
+    TELEMETRY_METRICS_PORT=9464 serve as métricas em http://127.0.0.1:9464/metrics (habilita)
+    TELEMETRY_OVERLAY=1         exibe o painel de latência na janela (habilita)
+
+Desabilitada, cada chamada custa apenas a verificação de um atributo: ``span`` devolve
+um span nulo compartilhado e ``count``/``observe`` retornam imediatamente.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 18/10/2026 00:20 (horário de Zurique)
+"""
+
+import os
+import re
+import json
+import time
+import logging
+import itertools
+import threading
+from utils.env import load_environment
+
+load_environment()
+
+# Limites dos histogramas, em milissegundos
+DEFAULT_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+METRIC_PREFIX = "gysin_"
+SPAN_METRIC = "span_duration_ms"
+
+
+class Span:
+    """
+    Trecho cronometrado. Use como gerenciador de contexto ou chame ``end`` explicitamente.
+    """
+
+    __slots__ = ("telemetry", "name", "attributes", "span_id", "parent_id", "start", "duration_ms")
+
+    def __init__(self, telemetry, name, attributes, span_id, parent_id):
+        self.telemetry = telemetry
+        self.name = name
+        self.attributes = attributes
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start = time.perf_counter()
+        self.duration_ms = None
+
+    def set(self, **attributes):
+        """Acrescenta atributos ao span."""
+        self.attributes.update(attributes)
+
+    def elapsed_ms(self):
+        """Milissegundos desde o início do span."""
+        return 1000 * (time.perf_counter() - self.start)
+
+    def end(self, **attributes):
+        """Encerra o span (apenas a primeira chamada tem efeito)."""
+        if self.duration_ms is not None:
+            return
+        self.duration_ms = self.elapsed_ms()
+        if attributes:
+            self.attributes.update(attributes)
+        self.telemetry._finish(self)
+
+    def __enter__(self):
+        self.telemetry._push(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.telemetry._pop(self)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self.end()
+
+
+class _NullSpan:
+    """Span da instrumentação desabilitada: todas as operações são vazias."""
+
+    __slots__ = ()
+    name = None
+    duration_ms = None
+
+    def set(self, **attributes):
+        pass
+
+    def elapsed_ms(self):
+        return 0.0
+
+    def end(self, **attributes):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Histogram:
+    """Histograma com limites fixos (contagens cumulativas no formato do Prometheus)."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.last = None
+
+    def observe(self, value):
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+        self.last = value
+
+
+def _metric_name(name):
+    return METRIC_PREFIX + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in items) + "}"
+
+
+def notify_first(iterable, callback):
+    """Repassa os itens de ``iterable``, chamando ``callback()`` antes do primeiro."""
+    iterator = iter(iterable)
+    for item in iterator:
+        callback()
+        yield item
+        break
+    yield from iterator
+
+
+class Telemetry:
+    """
+    Registro de spans, contadores e histogramas de um processo.
+    """
+
+    def __init__(self, enabled=False, trace_path=None, buckets=DEFAULT_BUCKETS):
+        """
+        Inicializa o registro.
+
+        Args:
+            enabled (bool, optional): Habilita a instrumentação. Padrão é False.
+            trace_path (str, optional): Arquivo JSONL que recebe os spans concluídos.
+            buckets (tuple, optional): Limites dos histogramas em milissegundos.
+        """
+        self.enabled = enabled or trace_path is not None
+        self.trace_path = trace_path
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._trace_file = None
+        # Referência para converter o relógio monotônico em horário (nos traces)
+        self._epoch = (time.time(), time.perf_counter())
+        self._server = None
+
+    @classmethod
+    def from_environment(cls):
+        """Cria o registro a partir das variáveis TELEMETRY*."""
+        enabled = (os.getenv('TELEMETRY') == '1' or os.getenv('TELEMETRY_OVERLAY') == '1'
+                   or bool(os.getenv('TELEMETRY_METRICS') or os.getenv('TELEMETRY_METRICS_PORT')))
+        return cls(enabled=enabled, trace_path=os.getenv('TELEMETRY_TRACE') or None)
+
+    def span(self, name, **attributes):
+        """
+        Inicia um span.
+
+        Args:
+            name (str): Nome do span (por exemplo, "stt.transcribe").
+            **attributes: Atributos registrados no trace.
+
+        Returns:
+            Span: Span iniciado (o span nulo se a instrumentação estiver desabilitada).
+        """
+        if not self.enabled:
+            return NULL_SPAN
+        stack = self._stack()
+        parent_id = stack[-1].span_id if stack else None
+        return Span(self, name, attributes, next(self._ids), parent_id)
+
+    def count(self, name, value=1, **labels):
+        """Incrementa um contador."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """Registra um valor (em milissegundos) em um histograma."""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def latest(self):
+        """
+        Retorna o último valor de cada histograma.
+
+        Returns:
+            dict: ``{nome: valor}``, com os spans como ``span:<nome>``.
+        """
+        with self._lock:
+            return {(f"span:{dict(labels)['span']}" if name == SPAN_METRIC else name): histogram.last
+                    for (name, labels), histogram in self.histograms.items()}
+
+    def render_prometheus(self):
+        """
+        Gera as métricas no formato de texto do Prometheus.
+
+        Returns:
+            str: Exposição das métricas.
+        """
+        lines = []
+        with self._lock:
+            for kind, metrics in (("counter", self.counters), ("histogram", self.histograms)):
+                names = sorted({name for name, _ in metrics})
+                for name in names:
+                    metric = _metric_name(name)
+                    lines.append(f"# TYPE {metric} {kind}")
+                    for (other, labels), value in sorted(metrics.items()):
+                        if other != name:
+                            continue
+                        if kind == "counter":
+                            lines.append(f"{metric}{_format_labels(labels)} {value}")
+                            continue
+                        cumulative = 0
+                        for bound, count in zip(value.buckets + ("+Inf",), value.counts):
+                            cumulative += count
+                            lines.append(f"{metric}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+                        lines.append(f"{metric}_sum{_format_labels(labels)} {value.sum:.3f}")
+                        lines.append(f"{metric}_count{_format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump_metrics(self, path):
+        """Grava as métricas no formato do Prometheus (substituição atômica do arquivo)."""
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(self.render_prometheus())
+        os.replace(temporary, path)
+
+    def serve_metrics(self, port, host="127.0.0.1"):
+        """
+        Serve as métricas em ``http://host:port/metrics`` em uma thread.
+
+        Returns:
+            int: Porta em uso (útil com ``port=0``).
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        telemetry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = telemetry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="telemetry-metrics").start()
+        logging.info(f"Métricas em http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server.server_address[1]
+
+    def close(self):
+        """Fecha o arquivo de trace e o endpoint de métricas."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _push(self, span):
+        self._stack().append(span)
+
+    def _pop(self, span):
+        stack = self._stack()
+        if stack and stack[-1] is span:
+            stack.pop()
+
+    def _finish(self, span):
+        """Registra a duração de um span concluído e o exporta no trace."""
+        self.observe(SPAN_METRIC, span.duration_ms, span=span.name)
+        if self.trace_path is None:
+            return
+        wall, monotonic = self._epoch
+        record = {
+            "name": span.name,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "thread": threading.current_thread().name,
+            "start": round(wall + span.start - monotonic, 6),
+            "duration_ms": round(span.duration_ms, 3),
+            "attributes": span.attributes,
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            try:
+                if self._trace_file is None:
+                    self._trace_file = open(self.trace_path, "a", encoding="utf-8", buffering=1)
+                self._trace_file.write(line)
+            except OSError as e:
+                logging.error(f"Falha ao gravar o trace em {self.trace_path}: {e}")
+                self.trace_path = None
+
+
+# Registro compartilhado pelo processo
+telemetry = Telemetry.from_environment()
+
+
+def start_exporters():
+    """Inicia o endpoint de métricas, se TELEMETRY_METRICS_PORT estiver definido."""
+    port = os.getenv('TELEMETRY_METRICS_PORT')
+    if telemetry.enabled and port:
+        try:
+            telemetry.serve_metrics(int(port))
+        except OSError as e:
+            logging.error(f"Não foi possível servir as métricas na porta {port}: {e}")
+
+
+def shutdown_exporters():
+    """Grava as métricas em TELEMETRY_METRICS (se definido) e fecha os exportadores."""
+    path = os.getenv('TELEMETRY_METRICS')
+    if telemetry.enabled and path:
+        try:
+            telemetry.dump_metrics(path)
+        except OSError as e:
+            logging.error(f"Falha ao gravar as métricas em {path}: {e}")
+    telemetry.close()
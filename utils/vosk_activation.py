@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: vosk_activation
+
+Este módulo implementa a detecção de palavra-chave offline com o reconhecedor em
+streaming do Vosk. O áudio é processado em blocos curtos por um reconhecedor com
+gramática restrita à frase de ativação; como o reconhecedor mantém o contexto entre
+os blocos, uma frase dividida entre dois blocos continua sendo detectada, e o
+resultado parcial permite disparar logo após o fim da frase, sem chamadas de rede.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 16:50 (horário de Zurique)
+"""
+
+import os
+import json
+import logging
+import numpy as np
+from utils.env import load_environment
+
+# Carrega as variáveis de ambiente do arquivo .env
+load_environment()
+
+# Configuração global de logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Configurações de áudio
+RATE = 16000
+# Blocos de 50 ms: a latência de detecção fica em poucos blocos após o fim da frase
+FRAME_LENGTH = 800
+WAKE_WORD = "bom dia"
+
+# Modelo carregado uma única vez (a carga leva alguns segundos)
+_model = None
+
+
+def load_model(model_path=None):
+    """
+    Carrega (uma única vez) o modelo acústico do Vosk.
+
+    Args:
+        model_path (str, optional): Diretório do modelo; padrão é a variável VOSK_MODEL_PATH.
+            Sem caminho, o Vosk baixa o modelo pequeno de português.
+
+    Returns:
+        vosk.Model: Modelo carregado.
+    """
+    global _model
+    if _model is None:
+        import vosk
+        vosk.SetLogLevel(-1)
+        model_path = model_path or os.getenv('VOSK_MODEL_PATH')
+        _model = vosk.Model(model_path) if model_path else vosk.Model(lang="pt")
+    return _model
+
+
+class VoskWakeWordDetector:
+    """
+    Detector de palavra-chave sobre um reconhecedor Vosk em streaming.
+    """
+
+    def __init__(self, model, wake_word=WAKE_WORD, sample_rate=RATE):
+        """
+        Inicializa o detector.
+
+        Args:
+            model (vosk.Model): Modelo acústico carregado.
+            wake_word (str, optional): Frase de ativação. Padrão é "bom dia".
+            sample_rate (int, optional): Taxa de amostragem do áudio. Padrão é 16000.
+        """
+        import vosk
+        self.wake_word = wake_word.lower()
+        # Gramática restrita: apenas a frase de ativação ou "desconhecido"
+        grammar = json.dumps([self.wake_word, "[unk]"])
+        self.recognizer = vosk.KaldiRecognizer(model, sample_rate, grammar)
+
+    def process(self, pcm):
+        """
+        Processa um bloco de áudio.
+
+        Args:
+            pcm (bytes | np.ndarray): Amostras int16 mono.
+
+        Returns:
+            bool: True se a frase de ativação foi reconhecida.
+        """
+        if isinstance(pcm, np.ndarray):
+            pcm = pcm.astype(np.int16, copy=False).tobytes()
+        if self.recognizer.AcceptWaveform(pcm):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+
+        if self.wake_word in text:
+            # Descarta o contexto para não disparar de novo com o mesmo resultado parcial
+            self.recognizer.Reset()
+            return True
+        return False
+
+
+def detect_wake_word(subscription=None):
+    """
+    Escuta o microfone até a frase de ativação ser reconhecida.
+
+    Args:
+        subscription (FrameSubscription, optional): Assinatura do AudioCaptureService;
+            sem ela, um stream próprio é aberto e fechado a cada chamada.
+
+    Returns:
+        bool: True quando a frase foi detectada, False se a assinatura foi encerrada.
+
+    Raises:
+        Exception: Se o modelo não puder ser carregado ou o microfone não puder ser
+            aberto; o chamador decide quando tentar de novo.
+    """
+    pa = None
+    stream = None
+
+    try:
+        if subscription is not None:
+            detector = VoskWakeWordDetector(load_model(), sample_rate=subscription.sample_rate)
+        else:
+            import pyaudio
+            detector = VoskWakeWordDetector(load_model())
+            pa = pyaudio.PyAudio()
+            stream = pa.open(rate=RATE, channels=1, format=pyaudio.paInt16, input=True,
+                             frames_per_buffer=FRAME_LENGTH)
+
+        logging.info("Aguardando a palavra-chave (Vosk)...")
+
+        while True:
+            if subscription is not None:
+                pcm = subscription.read_frame()
+                if pcm is None:
+                    return False
+            else:
+                try:
+                    pcm = stream.read(FRAME_LENGTH, exception_on_overflow=False)
+                except IOError as e:
+                    logging.error(f"Erro de E/S durante leitura do áudio: {e}. Tentando continuar...")
+                    continue
+            if detector.process(pcm):
+                logging.info("Palavra-chave detectada!")
+                return True
+    finally:
+        if stream is not None:
+            stream.stop_stream()
+            stream.close()
+        if pa is not None:
+            pa.terminate()
+
+
+if __name__ == "__main__":
+    detect_wake_word()
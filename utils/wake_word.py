@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Módulo: wake_word
+
+Este módulo seleciona o mecanismo de detecção de palavra-chave pela configuração.
+Todos os mecanismos seguem o mesmo contrato: ``detect_wake_word(subscription=None)``
+bloqueia até a detecção e retorna True, ou retorna False em caso de erro. Com uma
+assinatura do AudioCaptureService, o áudio é lido da captura compartilhada.
+
+Autor: Stefano Gysin - StefanoGysin@hotmail.com
+Data: 17/10/2026 16:50 (horário de Zurique)
+"""
+
+import os
+import importlib
+
+# Módulo de cada mecanismo, importado apenas quando selecionado
+BACKENDS = {
+    "porcupine": "utils.audio_activation",
+    "vosk": "utils.vosk_activation",
+    "openai": "api.openai_audio_activation",
+}
+DEFAULT_BACKEND = "porcupine"
+
+
+def get_wake_word_detector(backend=None):
+    """
+    Retorna a função ``detect_wake_word`` do mecanismo configurado.
+
+    Args:
+        backend (str, optional): "porcupine", "vosk" ou "openai"; padrão é a
+            variável WAKE_WORD_BACKEND (ou "porcupine").
+
+    Returns:
+        callable: Função ``detect_wake_word()`` do mecanismo.
+
+    Raises:
+        ValueError: Se o mecanismo não existir.
+    """
+    backend = (backend or os.getenv('WAKE_WORD_BACKEND') or DEFAULT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Mecanismo de palavra-chave desconhecido: {backend}. "
+                         f"Opções: {', '.join(BACKENDS)}.")
+    return importlib.import_module(BACKENDS[backend]).detect_wake_word